@@ -0,0 +1,303 @@
+import argparse
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+from features import GRADE_NAMES
+from instrumentation import count, span
+
+# ==========================================
+# 🚨 EVENT-DRIVEN ALERT MONITOR
+# ==========================================
+# A background loop over watched locations that only does work when the
+# weather actually changes:
+#
+#   * each poll reads one observation per location (through the cached
+#     WeatherProvider, or a replayed JSON-lines feed)
+#   * a location is rescored only if lat/lon moved by >= COORD_DELTA deg or
+#     pressure by >= PRES_DELTA hPa since it was LAST SCORED (slow drift
+#     still adds up); all rescored locations share one predict_proba call
+#   * an escalation to a grade >= MIN_GRADE fires a trigger_sos-style alert
+#     (SMS + call through SOSDispatcher) to the configured targets
+#   * hysteresis: after an alert the location stays at that level until the
+#     grade has been lower for CLEAR_POLLS polls in a row, so a reading that
+#     flickers across a grade boundary alerts once, not on every flip
+#   * de-duplication: the same (location, grade) alerts at most once per
+#     DEDUPE_S, even if the level was cleared and re-entered in between
+#
+#   python alert_monitor.py --targets +919999999999                  # live, simulated SOS
+#   python alert_monitor.py --demo-feed feed.jsonl                   # write a test feed
+#   python alert_monitor.py --replay feed.jsonl --fake-twilio        # replay it
+
+POLL_S = 300
+PRES_DELTA = 1.0       # hPa
+COORD_DELTA = 0.05     # degrees (~5 km)
+MIN_GRADE = 2          # STORM and above
+CLEAR_POLLS = 3
+DEDUPE_S = 6 * 3600
+
+
+class _State:
+    __slots__ = ('lat', 'lon', 'pres', 'grade', 'confidence', 'level', 'below', 'last_alert')
+
+    def __init__(self):
+        self.lat = self.lon = self.pres = None
+        self.grade, self.confidence = 0, 0.0
+        self.level = 0          # grade we last alerted on (0 = none)
+        self.below = 0          # consecutive polls with grade < level
+        self.last_alert = {}    # grade -> time of the last alert sent for it
+
+
+class AlertMonitor:
+    def __init__(self, model, dispatcher=None, targets=(), pres_delta=PRES_DELTA, coord_delta=COORD_DELTA,
+                 min_grade=MIN_GRADE, clear_polls=CLEAR_POLLS, dedupe_s=DEDUPE_S, on_alert=None):
+        self.model = model
+        self.dispatcher = dispatcher
+        self.targets = list(targets)
+        self.pres_delta = pres_delta
+        self.coord_delta = coord_delta
+        self.min_grade = min_grade
+        self.clear_polls = clear_polls
+        self.dedupe_s = dedupe_s
+        self.on_alert = on_alert
+        self.states = {}
+        self.alerts = []
+        self.stats = {'polls': 0, 'observations': 0, 'scored': 0, 'skipped': 0, 'missing': 0,
+                      'predict_calls': 0, 'alerts': 0, 'suppressed': 0, 'cleared': 0}
+
+    def _changed(self, state, obs):
+        return (state.pres is None
+                or abs(obs['pres'] - state.pres) >= self.pres_delta
+                or abs(obs['lat'] - state.lat) >= self.coord_delta
+                or abs(obs['lon'] - state.lon) >= self.coord_delta)
+
+    def poll(self, observations, now=None):
+        """Process one {location: obs or None} snapshot; returns the alerts it fired."""
+        now = time.time() if now is None else now
+        self.stats['polls'] += 1
+        with span('monitor.poll'):
+            changed, seen = [], 0
+            for name, obs in observations.items():
+                if obs is None:
+                    self.stats['missing'] += 1
+                    continue
+                seen += 1
+                state = self.states.setdefault(name, _State())
+                if self._changed(state, obs):
+                    changed.append((name, obs))
+            self.stats['observations'] += seen
+            self.stats['skipped'] += seen - len(changed)
+            count('monitor_skipped', seen - len(changed))
+            if changed:
+                self._score(changed)
+
+            fired = []
+            for name, obs in observations.items():
+                if obs is not None:
+                    alert = self._update(name, self.states[name], obs, now)
+                    if alert:
+                        fired.append(alert)
+        for alert in fired:
+            self._send(alert)
+        return fired
+
+    def _score(self, changed):
+        X = np.array([[obs['lat'], obs['lon'], obs['pres']] for _, obs in changed], dtype=np.float64)
+        probs = self.model.predict_proba(X)
+        best = np.argmax(probs, axis=1)
+        grades = np.asarray(self.model.classes_).take(best)
+        self.stats['scored'] += len(changed)
+        self.stats['predict_calls'] += 1
+        count('monitor_rescored', len(changed))
+        for (name, obs), grade, conf in zip(changed, grades, probs[np.arange(len(X)), best]):
+            state = self.states[name]
+            state.lat, state.lon, state.pres = obs['lat'], obs['lon'], obs['pres']
+            state.grade, state.confidence = int(grade), float(conf)
+
+    def _update(self, name, state, obs, now):
+        # Hysteresis + de-duplication on the location's current grade
+        grade = state.grade
+        if grade > state.level and grade >= self.min_grade:
+            state.level, state.below = grade, 0
+            last = state.last_alert.get(grade)
+            if last is not None and now - last < self.dedupe_s:
+                self.stats['suppressed'] += 1
+                count('monitor_alerts_suppressed')
+                return None
+            state.last_alert[grade] = now
+            return {'location': name, 'grade': grade, 'label': GRADE_NAMES.get(grade, str(grade)),
+                    'confidence': state.confidence, 'lat': obs['lat'], 'lon': obs['lon'],
+                    'pres': obs['pres'], 'time': now}
+        if grade < state.level:
+            state.below += 1
+            if state.below >= self.clear_polls:
+                state.level, state.below = (grade if grade >= self.min_grade else 0), 0
+                self.stats['cleared'] += 1
+        else:
+            state.below = 0
+        return None
+
+    def _send(self, alert):
+        self.stats['alerts'] += 1
+        count('monitor_alerts', grade=alert['grade'])
+        self.alerts.append(alert)
+        if self.dispatcher is not None and self.targets:
+            t = time.perf_counter()
+            # Earlier sends that failed on every account go out first
+            alert['retried'] = self.dispatcher.retry_pending()
+            alert['results'] = list(self.dispatcher.dispatch(self.targets, alert['location'], alert['pres'],
+                                                             f"{alert['label']} (auto)"))
+            alert['dispatch_s'] = time.perf_counter() - t
+        if self.on_alert:
+            self.on_alert(alert)
+
+    # ---------- loops ----------
+    def run(self, source, interval=POLL_S, stop=None, max_polls=None):
+        """Poll `source.observe()` every `interval` s until `stop` is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set() and (max_polls is None or self.stats['polls'] < max_polls):
+            started = time.monotonic()
+            self.poll(source.observe())
+            stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def replay(self, feed):
+        """Run every frame of a ReplayFeed, using the feed's clock."""
+        for t, frame in feed.frames():
+            self.poll(frame, now=t)
+        return self.alerts
+
+
+# ---------- observation sources ----------
+class ProviderSource:
+    """Live observations for (name, lat, lon) locations from a WeatherProvider."""
+
+    def __init__(self, provider, locations):
+        from watch_mode import fetch_all
+        self._fetch_all = fetch_all
+        self.provider = provider
+        self.locations = list(locations)
+
+    def observe(self):
+        # Scored at the district's own coordinates, like watch_mode
+        observations = self._fetch_all(self.provider, self.locations)
+        return {name: obs and {'lat': lat, 'lon': lon, 'pres': obs['pres']}
+                for (name, lat, lon), obs in zip(self.locations, observations)}
+
+
+class ReplayFeed:
+    """JSON lines of {"t": seconds, "location", "lat", "lon", "pres"}; one frame per t."""
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda r: r['t'])
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for r in self.records:
+                f.write(json.dumps(r) + '\n')
+
+    def frames(self):
+        frame, t = {}, None
+        for r in self.records:
+            if t is not None and r['t'] != t:
+                yield t, frame
+                frame = {}
+            t = r['t']
+            frame[r['location']] = None if r.get('pres') is None else \
+                {'lat': r['lat'], 'lon': r['lon'], 'pres': r['pres']}
+        if frame:
+            yield t, frame
+
+
+def demo_feed(hours=120, step_min=30, seed=0):
+    """Synthetic feed: 3 calm stations, then a storm deepening and filling at Vizag."""
+    rng = np.random.default_rng(seed)
+    stations = [('Visakhapatnam', 17.6868, 83.2185), ('Kakinada', 16.9891, 82.2475), ('Puri', 19.8135, 85.8312)]
+    steps = np.arange(0, hours * 60, step_min) / 60.0
+    records = []
+    for h in steps:
+        for name, lat, lon in stations:
+            pres = 1008.0 + rng.normal(0, 0.25)
+            if name == 'Visakhapatnam':
+                # 48 h deepening to ~955 hPa from hour 36, then filling
+                depth = np.interp(h, [36, 84, 96, 108], [0, 53, 53, 10])
+                pres -= depth
+            records.append({'t': int(h * 3600), 'location': name, 'lat': lat, 'lon': lon,
+                            'pres': round(float(pres), 1)})
+    return ReplayFeed(records)
+
+
+def _print_report(monitor, elapsed):
+    s = monitor.stats
+    print(f"\n📊 {s['polls']:,} polls, {s['observations']:,} observations in {elapsed:.2f}s")
+    print(f"   rescored {s['scored']:,} ({s['scored'] / max(s['observations'], 1):.1%}) in "
+          f"{s['predict_calls']:,} predict calls, skipped {s['skipped']:,}, missing {s['missing']}")
+    print(f"   alerts {s['alerts']}, suppressed {s['suppressed']}, levels cleared {s['cleared']}")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Poll watched locations and auto-alert on grade escalations.')
+    ap.add_argument('--replay', metavar='FEED', help='replay a JSON-lines observation feed instead of polling')
+    ap.add_argument('--demo-feed', metavar='FEED', help='write a synthetic storm feed here and exit')
+    ap.add_argument('--regions', nargs='*', help='watch_mode regions to poll (default: all)')
+    ap.add_argument('--targets', nargs='*', default=[], help='phone numbers to alert')
+    ap.add_argument('--interval', type=float, default=POLL_S)
+    ap.add_argument('--pres-delta', type=float, default=PRES_DELTA)
+    ap.add_argument('--coord-delta', type=float, default=COORD_DELTA)
+    ap.add_argument('--min-grade', type=int, default=MIN_GRADE)
+    ap.add_argument('--clear-polls', type=int, default=CLEAR_POLLS)
+    ap.add_argument('--dedupe-hours', type=float, default=DEDUPE_S / 3600)
+    ap.add_argument('--fake-twilio', action='store_true', help='send through a local FakeTwilio server')
+    ap.add_argument('--live', action='store_true', help='send real SMS/calls with the config.py accounts')
+    args = ap.parse_args()
+
+    if args.demo_feed:
+        feed = demo_feed()
+        feed.save(args.demo_feed)
+        print(f"✅ {len(feed.records):,} observations -> {args.demo_feed}")
+        sys.exit(0)
+
+    from config import ACCOUNTS, WEATHER_API_KEY
+    from model_server import get_model
+    from sos_dispatch import SOSDispatcher
+
+    fake = None
+    if args.fake_twilio:
+        from local_stubs import FakeTwilio
+        fake = FakeTwilio().start()
+        accounts = [dict(a, base_url=fake.url) for a in ACCOUNTS]
+    else:
+        accounts = ACCOUNTS
+    dispatcher = SOSDispatcher(accounts, simulation=not (args.live or args.fake_twilio))
+
+    def show(alert):
+        sent = sum(r['status'] in ('SUCCESS', 'SIMULATION') for r in alert.get('results', []))
+        print(f"🚨 {alert['location']}: {alert['label']} ({alert['confidence']:.0%}, {alert['pres']} hPa) "
+              f"at t={alert['time']:.0f}, sent to {sent}/{len(args.targets)}")
+
+    monitor = AlertMonitor(get_model(flat=True), dispatcher, args.targets, args.pres_delta, args.coord_delta,
+                           args.min_grade, args.clear_polls, args.dedupe_hours * 3600, on_alert=show)
+    start = time.perf_counter()
+    try:
+        if args.replay:
+            monitor.replay(ReplayFeed.load(args.replay))
+        else:
+            from watch_mode import REGIONS, districts_for
+            from weather_provider import get_provider
+            locations = districts_for(args.regions or list(REGIONS))
+            print(f"🛰️ Watching {len(locations)} locations every {args.interval:.0f}s (Ctrl+C to stop)")
+            monitor.run(ProviderSource(get_provider(WEATHER_API_KEY), locations), args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _print_report(monitor, time.perf_counter() - start)
+        dispatcher.close()
+        if fake:
+            fake.stop()
@@ -0,0 +1,253 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# ==========================================
+# 📚 HISTORICAL ANALOGUES (SPATIAL INDEX)
+# ==========================================
+# A KD-tree over every IBTrACS NI track point, built once and saved next to
+# the model. Points are stored as 3-D unit vectors: straight-line (chord)
+# distance orders points exactly like great-circle (haversine) distance,
+# and a Euclidean KD-tree queries ~20x faster than a haversine BallTree.
+# Answers in milliseconds:
+#
+#   * storms_within(lat, lon, R)     every past storm that came within R km
+#   * nearest(lat, lon, pres, k)     the k closest past storms that were at a
+#                                    similar central pressure there
+#
+# Every point also carries the storm's motion and pressure tendency at that
+# fix (features.add_track_features), so an analogue says how the past storm
+# was moving when it passed.
+#
+#   python analogues.py                      # (re)build the index
+#   python analogues.py 17.7 83.3 960        # query it
+
+INDEX_FILE = "cyclone_analogues.joblib"
+EARTH_RADIUS_KM = 6371.0
+PRES_TOL = 10.0   # hPa: "similar pressure"
+COLUMNS = ["SID", "NAME", "SEASON", "ISO_TIME", "LATITUDE", "LONGITUDE", "PRES_WMO", "WIND_WMO"]
+MOTION_COLUMNS = ["MOTION_SPEED_KMH", "MOTION_HEADING_DEG", "PRES_TENDENCY_6H"]
+POINT_COLUMNS = COLUMNS + MOTION_COLUMNS
+COMPASS = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
+
+
+def _unit_xyz(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord, 2.0) / 2)
+
+
+def _km_to_chord(km):
+    return 2 * np.sin(km / EARTH_RADIUS_KM / 2)
+
+
+class AnalogueIndex:
+    def __init__(self, tree, points, version=""):
+        self.tree = tree
+        self.points = points    # dict of column arrays, same order as the tree
+        self.version = version  # ibtracs_store version it was built from
+        self.rebuilt = False    # set by load_index() on the first load after a background rebuild
+
+    @classmethod
+    def build(cls, store=None):
+        from sklearn.neighbors import KDTree
+        from features import add_track_features
+        from ibtracs_store import STORE_ROOT, load_seasons, read_manifest
+
+        store = store or STORE_ROOT
+        df = load_seasons(COLUMNS + ["DIST2LAND"], store=store).dropna(subset=["LATITUDE", "LONGITUDE"])
+        df = add_track_features(df)
+        points = {c: df[c].to_numpy() for c in POINT_COLUMNS}
+        points["SID"] = points["SID"].astype(str)
+        points["NAME"] = points["NAME"].astype(str)
+        tree = KDTree(_unit_xyz(points["LATITUDE"], points["LONGITUDE"]))
+        return cls(tree, points, read_manifest(store)["version"])
+
+    def save(self, path=INDEX_FILE):
+        import joblib
+        tmp = path + ".tmp"
+        joblib.dump({"tree": self.tree, "points": self.points, "version": self.version}, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_FILE):
+        import joblib
+        blob = joblib.load(path)
+        # An index saved before the motion columns existed counts as stale
+        version = blob["version"] if all(c in blob["points"] for c in POINT_COLUMNS) else ""
+        return cls(blob["tree"], blob["points"], version)
+
+    def __len__(self):
+        return len(self.points["SID"])
+
+    # ---------- queries ----------
+    def _rows(self, idx, dist_km):
+        import pandas as pd  # only once there are rows to show: the app imports this module every run
+        out = pd.DataFrame({c: self.points[c][idx] for c in POINT_COLUMNS})
+        out["DIST_KM"] = dist_km
+        return out
+
+    def _summarize(self, rows):
+        # One line per storm: its closest point to the query
+        rows = rows.sort_values("DIST_KM", kind="stable")
+        storms = rows.groupby("SID", sort=False).agg(
+            NAME=("NAME", "first"), SEASON=("SEASON", "first"), ISO_TIME=("ISO_TIME", "first"),
+            LATITUDE=("LATITUDE", "first"), LONGITUDE=("LONGITUDE", "first"),
+            DIST_KM=("DIST_KM", "first"), PRES_AT_CLOSEST=("PRES_WMO", "first"),
+            MIN_PRES=("PRES_WMO", "min"), MAX_WIND=("WIND_WMO", "max"),
+            SPEED_KMH=("MOTION_SPEED_KMH", "first"), HEADING_DEG=("MOTION_HEADING_DEG", "first"),
+            PRES_TENDENCY_6H=("PRES_TENDENCY_6H", "first"),
+        )
+        return storms.reset_index()
+
+    def within(self, lat, lon, radius_km):
+        """Track points within radius_km of (lat, lon), nearest first."""
+        idx, dist = self.tree.query_radius(_unit_xyz([lat], [lon]), r=_km_to_chord(radius_km),
+                                           return_distance=True, sort_results=True)
+        return self._rows(idx[0], _chord_to_km(dist[0]))
+
+    def storms_within(self, lat, lon, radius_km):
+        """One row per storm that passed within radius_km, closest first."""
+        return self._summarize(self.within(lat, lon, radius_km))
+
+    def nearest(self, lat, lon, pres, k=5, pres_tol=PRES_TOL):
+        """The k nearest storms that had pressure within pres_tol hPa of `pres`."""
+        q = _unit_xyz([lat], [lon])
+        n = min(len(self), 256)
+        while True:
+            dist, idx = self.tree.query(q, k=n)
+            rows = self._rows(idx[0], _chord_to_km(dist[0]))
+            rows = rows[np.abs(rows["PRES_WMO"] - pres) <= pres_tol]
+            if rows["SID"].nunique() >= k or n == len(self):
+                return self._summarize(rows).head(k)
+            n = min(len(self), n * 4)
+
+    def nearest_batch(self, X, pres_tol=PRES_TOL, candidates=64):
+        """Closest similar-pressure track point for every (lat, lon, pres) row.
+
+        Looks at the `candidates` nearest points of each row in one tree
+        query; rows with no similar-pressure candidate get the nearest point.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        dist, idx = self.tree.query(_unit_xyz(X[:, 0], X[:, 1]), k=min(candidates, len(self)))
+        ok = np.abs(self.points["PRES_WMO"][idx] - X[:, 2:3]) <= pres_tol
+        pick = np.where(ok.any(axis=1), ok.argmax(axis=1), 0)
+        rows = np.arange(len(X))
+        return self._rows(idx[rows, pick], _chord_to_km(dist[rows, pick]))
+
+
+_index_memo = {}
+_index_lock = threading.Lock()
+_rebuild_thread = None
+_rebuilt_paths = set()   # index files written by a background rebuild, not loaded since
+
+
+def _store_version(store):
+    from ibtracs_store import read_manifest
+    return read_manifest(store)["version"]
+
+
+def _rebuild(path, store):
+    AnalogueIndex.build(store).save(path)
+    with _index_lock:
+        _rebuilt_paths.add(os.path.abspath(path))
+
+
+def rebuilding():
+    """True while load_index(rebuild=True) is rebuilding a stale index in the background."""
+    return _rebuild_thread is not None and _rebuild_thread.is_alive()
+
+
+def load_index(path=INDEX_FILE, store=None, rebuild=False):
+    """Process-wide index for the app; None if it hasn't been built.
+
+    An index built from an older ibtracs_store version is treated as
+    missing. With rebuild=True it is also rebuilt (and saved) in a
+    background thread, so the caller never waits for the build; the first
+    load of the new file has `rebuilt` set.
+    """
+    global _rebuild_thread
+    if rebuild and rebuilding():
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    # ibtracs_store pulls in pandas: not before we know there is an index
+    from ibtracs_store import MANIFEST, STORE_ROOT
+
+    store = store or STORE_ROOT
+    try:
+        store_mtime = os.stat(os.path.join(store, MANIFEST)).st_mtime_ns
+    except OSError:
+        store_mtime = None
+    key = (os.path.abspath(path), mtime, os.path.abspath(store), store_mtime)
+    with _index_lock:
+        if key in _index_memo:
+            return _index_memo[key]
+        index = AnalogueIndex.load(path)
+        version = _store_version(store)
+        if version and index.version != version:
+            if rebuild:
+                _rebuild_thread = threading.Thread(target=_rebuild, args=(path, store), daemon=True,
+                                                   name="analogue-rebuild")
+                _rebuild_thread.start()
+            return None
+        index.rebuilt = key[0] in _rebuilt_paths
+        _rebuilt_paths.discard(key[0])
+        _index_memo.clear()
+        _index_memo[key] = index
+        return index
+
+
+def storm_label(row):
+    name = str(row.NAME).title() if row.NAME not in ("UNNAMED", "NOT_NAMED", "") else "Unnamed"
+    return f"{name} ({row.SEASON})"
+
+
+def motion_label(row):
+    """'moving NW at 14 km/h' at the analogue's closest point ('' at a storm's first fix)."""
+    if np.isnan(row.SPEED_KMH):
+        return ""
+    return f"moving {COMPASS[int((row.HEADING_DEG + 22.5) // 45) % 8]} at {row.SPEED_KMH:.0f} km/h"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build or query the historical analogue index.")
+    ap.add_argument("query", nargs="*", type=float, metavar="LAT LON [PRES]")
+    ap.add_argument("--index", default=INDEX_FILE)
+    ap.add_argument("--radius", type=float, default=150.0, help="km, for storms within")
+    ap.add_argument("-k", type=int, default=5)
+    args = ap.parse_args()
+
+    if not args.query:
+        t = time.perf_counter()
+        index = AnalogueIndex.build()
+        index.save(args.index)
+        print(f"✅ Indexed {len(index):,} track points (store {index.version}) "
+              f"in {time.perf_counter() - t:.2f}s -> {args.index}")
+        sys.exit(0)
+
+    index = load_index(args.index)
+    if index is None:
+        print(f"❌ Error: '{args.index}' is missing or older than the IBTrACS store! "
+              f"Run 'python analogues.py' first.")
+        sys.exit(1)
+    lat, lon = args.query[:2]
+    t = time.perf_counter()
+    near = index.storms_within(lat, lon, args.radius)
+    print(f"🌀 {len(near)} storms within {args.radius:.0f} km ({(time.perf_counter() - t) * 1e3:.1f} ms)")
+    print(near.head(10).to_string(index=False))
+    if len(args.query) > 2:
+        t = time.perf_counter()
+        best = index.nearest(lat, lon, args.query[2], k=args.k)
+        print(f"\n📚 {len(best)} nearest analogues near {args.query[2]:.0f} hPa "
+              f"({(time.perf_counter() - t) * 1e3:.1f} ms)")
+        print(best.to_string(index=False))
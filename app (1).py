@@ -1,33 +1,24 @@
 import streamlit as st
-import joblib
 import numpy as np
-import pandas as pd
-import requests
 import os
-from twilio.rest import Client
-import folium
-from streamlit_folium import st_folium
+import time
 from datetime import datetime
+from model_server import get_model
+from risk_grid import load_grid
+from sos_dispatch import get_dispatcher
+from config import WEATHER_API_KEY, ACCOUNTS, SIMULATION_MODE
+from weather_provider import get_provider
+import instrumentation
+from instrumentation import span
+# Only what the prediction needs is imported up here. folium, pandas and the
+# historical-data layers are imported where they're used (python caches
+# them after the first run), so a cold start shows the status first.
 
 # ==========================================
-# 🔑 CONFIGURATION (2 TWILIO ACCOUNTS)
+# 🔑 CONFIGURATION (see config.py)
 # ==========================================
-WEATHER_API_KEY = "22223eb27d4a61523a6bbad9f42a14a7"
-
-# Account 1 Credentials
-TWILIO_SID_1 = "ACc9b9941c778de30e2ed7ba57f87cdfbc" 
-TWILIO_AUTH_1 = "3cb1dfcb6a9a3cae88f4eff47e9458df"
-TWILIO_PHONE_1 = "+15075195618"
-
-# Account 2 Credentials (Backup)
-TWILIO_SID_2 = "ACa12e602647785572ebaf765659d26d23"
-TWILIO_AUTH_2 = "26210979738809eaf59a678e98fe2c0f"
-TWILIO_PHONE_2 = "+14176076960"
-
 MODEL_FILE = "cyclone_model.joblib"
-
-# Check if at least one account is configured
-SIMULATION_MODE = "YOUR_PRIMARY" in TWILIO_SID_1
+GRID_DIR = "cyclone_grid"
 
 st.set_page_config(page_title="Cyclone Predictor & SOS", page_icon="🌪️", layout="wide")
 
@@ -39,48 +30,16 @@ if "loc_name" not in st.session_state:
 if "cur_pres" not in st.session_state:
     st.session_state.cur_pres = 1012
 
-# ==========================================
-# 🆘 SOS FUNCTION (DUAL ACCOUNT FAILOVER)
-# ==========================================
-def trigger_sos(target_phone, location, pressure, label):
-    if SIMULATION_MODE:
-        return "SIMULATION"
-    
-    accounts = [
-        {"sid": TWILIO_SID_1, "token": TWILIO_AUTH_1, "from": TWILIO_PHONE_1},
-        {"sid": TWILIO_SID_2, "token": TWILIO_AUTH_2, "from": TWILIO_PHONE_2}
-    ]
-    
-    last_error = ""
-    for acc in accounts:
-        try:
-            client = Client(acc["sid"], acc["token"])
-            
-            # 1. SMS Alert (English)
-            client.messages.create(
-                body=f"🚨 SOS: Cyclone Risk Detected!\nStatus: {label}\nLocation: {location}\nPressure: {pressure} hPa",
-                from_=acc["from"],
-                to=target_phone
-            )
-            
-            # 2. Voice Alert (Hindi)
-            call_content = f'<Response><Say language="hi-IN">Saavdhan! {location} mein chakravaat ka khatra hai. Kripya surakshit sthaan par jaye.</Say></Response>'
-            client.calls.create(twiml=call_content, to=target_phone, from_=acc["from"])
-            
-            return "SUCCESS" 
-        except Exception as e:
-            last_error = str(e)
-            continue 
-            
-    return last_error
-
 # ==========================================
 # 🌪️ MAIN APP CONTENT
 # ==========================================
 st.title("🌪️ North Indian Ocean Cyclone Predictor")
 
 try:
-    model = joblib.load(MODEL_FILE)
+    # Shared across reruns and sessions; reloads only when the file changes.
+    # Compiled to flat arrays: single-point predictions skip sklearn overhead.
+    with span("app.model_load"):
+        model = get_model(MODEL_FILE, flat=True)
 except Exception as e:
     st.error(f"Failed to load model: {e}")
     st.stop()
@@ -89,13 +48,22 @@ except Exception as e:
 # 📊 SIDEBAR (SOS Button & Contacts)
 # ==========================================
 st.sidebar.header("Data Source")
-mode = st.sidebar.radio("Input Mode", ["📡 Live Weather (API)", "🎛️ Manual Simulation"])
+mode = st.sidebar.radio("Input Mode", ["📡 Live Weather (API)", "🎛️ Manual Simulation", "🛰️ Regional Watch"])
 
 st.sidebar.divider()
 st.sidebar.header("🚨 Emergency Contacts")
 p1 = st.sidebar.text_input("Primary Contact", "+919999999999")
 p2 = st.sidebar.text_input("Family Contact", "+91XXXXXXXXXX")
 
+st.sidebar.divider()
+show_density = st.sidebar.checkbox("🔥 Show Storm Density (2000+)")
+show_tracks = st.sidebar.checkbox("🌀 Show Historical Tracks")
+if show_tracks:
+    from ibtracs_store import seasons
+    last_season = max(seasons() or [2024])
+    track_seasons = st.sidebar.slider("Seasons", 1980, last_season, (last_season - 9, last_season))
+    track_name = st.sidebar.text_input("Storm Name (optional)", "")
+
 # --- INTERACTIVE CHECKLIST ---
 st.sidebar.divider()
 st.sidebar.subheader("✅ Readiness Checklist")
@@ -104,19 +72,57 @@ charge = st.sidebar.checkbox("Phone/Powerbank Charged")
 if kit and charge:
     st.sidebar.success("Preparedness Level: High")
 
+# --- METRICS (only with CYCLONE_METRICS set) ---
+if instrumentation.enabled():
+    import pandas as pd
+    with st.sidebar.expander("📈 Metrics"):
+        snap = instrumentation.snapshot()
+        st.dataframe(pd.DataFrame(snap["spans"]).T, use_container_width=True)
+        if snap["counters"]:
+            st.json(snap["counters"])
+
 # --- WEATHER LOGIC ---
 lat, lon, pres = 17.7, 83.3, 1012
 loc_display = "Visakhapatnam"
 
 if mode == "📡 Live Weather (API)":
     city = st.sidebar.text_input("Enter City", "Visakhapatnam")
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={WEATHER_API_KEY}"
-    try:
-        res = requests.get(url).json()
-        if res.get("cod") == 200:
-            lat, lon, pres = res["coord"]["lat"], res["coord"]["lon"], res["main"]["pressure"]
-            loc_display = res["name"]
-    except: pass
+    # Pooled session + TTL cache: reruns for the same city don't refetch
+    with span("app.weather_fetch"):
+        obs = get_provider(WEATHER_API_KEY).by_city(city)
+    if obs:
+        lat, lon, pres = obs["lat"], obs["lon"], obs["pres"]
+        loc_display = obs["name"]
+elif mode == "🛰️ Regional Watch":
+    from watch_mode import REGIONS, districts_for, watch_cycle, watch_layer
+    regions = st.sidebar.multiselect("Watched Regions", list(REGIONS), default=list(REGIONS))
+    refresh_s = st.sidebar.select_slider("Refresh Every", options=[60, 300, 600, 900], value=300,
+                                         format_func=lambda s: f"{s // 60} min")
+    watch_districts = districts_for(regions)
+
+    # Concurrent fetch + one batched prediction, once per refresh cycle. The
+    # cycle lives in session_state so the status, the SOS button and the map
+    # fragment all read the same one; whichever runs first after it expires
+    # fetches the next.
+    def refresh_watch():
+        watch = st.session_state.get("watch")
+        if watch is None or watch["regions"] != regions or time.monotonic() - watch["at"] >= refresh_s:
+            at = time.monotonic()
+            with span("app.watch_cycle"):
+                scored, timing = watch_cycle(get_provider(WEATHER_API_KEY), model, watch_districts)
+            worst = None
+            if not scored.empty:
+                worst = {k: scored.iloc[0][k] for k in ("district", "lat", "lon", "pres", "grade")}
+            watch = st.session_state.watch = {"regions": regions, "at": at, "time": datetime.now(),
+                                              "scored": scored, "timing": timing, "worst": worst}
+        return watch
+
+    # The worst district drives the status and SOS
+    worst = refresh_watch()["worst"]
+    st.session_state.watch_shown = worst
+    if worst is not None:
+        lat, lon, pres = worst["lat"], worst["lon"], worst["pres"]
+        loc_display = worst["district"]
 else:
     lat = st.sidebar.slider("Latitude", 0.0, 30.0, 17.7)
     lon = st.sidebar.slider("Longitude", 50.0, 100.0, 83.3)
@@ -128,7 +134,13 @@ st.session_state.cur_pres = pres
 
 # Run Prediction
 labels = ["🟢 SAFE", "🟡 DEPRESSION", "🟠 STORM", "🔴 CYCLONE"]
-prediction_idx = model.predict(np.array([[lat, lon, pres]]))[0]
+# Slider drags hit the precomputed lookup grid (if built with risk_grid.py)
+grid = load_grid(GRID_DIR, MODEL_FILE) if mode == "🎛️ Manual Simulation" else None
+with span("app.predict"):
+    if grid is not None and grid.covers(lat, lon, pres):
+        prediction_idx = grid.predict([[lat, lon, pres]])[0]
+    else:
+        prediction_idx = model.predict(np.array([[lat, lon, pres]]))[0]
 current_status = labels[prediction_idx]
 
 # --- SOS BUTTON IN SIDEBAR ---
@@ -138,15 +150,23 @@ if st.sidebar.button("🚨 TRIGGER SOS NOW", use_container_width=True, type="pri
     if not targets:
         st.sidebar.warning("Please enter a phone number.")
     else:
-        for t in targets:
-            with st.sidebar.spinner(f"Sending to {t}..."):
-                status = trigger_sos(t, loc_display, pres, current_status)
-                if status == "SUCCESS": st.sidebar.success(f"✅ Sent to {t}")
-                else: st.sidebar.error(f"Error {t}: {status}")
+        # All contacts in parallel; each result is shown as soon as it lands
+        dispatcher = get_dispatcher(ACCOUNTS, simulation=SIMULATION_MODE)
+        # Alerts that failed on every account last time go out first
+        for res in dispatcher.retry_pending():
+            if res["status"] == "SUCCESS": st.sidebar.success(f"✅ Queued alert re-sent to {res['target']}")
+            else: st.sidebar.error(f"Still failing {res['target']}: {res['error'] or res['status']}")
+        with st.sidebar.spinner(f"Sending to {len(targets)} contact(s)..."), span("app.sos_dispatch"):
+            for res in dispatcher.dispatch(targets, loc_display, pres, current_status):
+                t = res["target"]
+                if res["status"] == "SUCCESS": st.sidebar.success(f"✅ Sent to {t}")
+                else: st.sidebar.error(f"Error {t}: {res['error'] or res['status']}")
 
 # ==========================================
 # 🌍 DASHBOARD DISPLAY
 # ==========================================
+analogues = None
+
 col1, col2 = st.columns([1, 2])
 with col1:
     st.subheader(f"📍 {loc_display}")
@@ -157,23 +177,96 @@ with col1:
     elif prediction_idx == 1:
         st.warning("⚠️ ALERT: High winds expected. Be prepared.")
 
+    # How stable is that grade if the reading or position is a little off?
+    # Batched Monte Carlo + per-tree votes, cached on rounded inputs
+    from uncertainty import COORD_SD, PRES_SD, get_estimator
+    with st.expander(f"🎲 Uncertainty (±{PRES_SD:g} hPa, ±{COORD_SD:g}°)"):
+        with span("app.uncertainty"):
+            unc = get_estimator(model).estimate(lat, lon, pres)
+        for grade, share in unc["mc_share"].items():
+            lo, hi = unc["mc_interval"][grade]
+            st.write(f"**{grade}**: {share:.0%} of noisy readings · probability {lo:.0%}–{hi:.0%}")
+        st.caption(f"{unc['agreement']:.0%} of the forest's trees vote for the top grade.")
+
+    # Past storms around this point (only once the index is built: python analogues.py)
+    from analogues import load_index, motion_label, rebuilding, storm_label
+    # A stale index (the store ingested a newer release) is rebuilt in the background
+    analogue_index = load_index(rebuild=True)
+    if analogue_index is None and rebuilding():
+        st.caption("📚 Updating historical analogues for the latest IBTrACS data...")
+    if analogue_index is not None:
+        analogues = analogue_index.nearest(lat, lon, pres, k=5)
+        nearby = analogue_index.storms_within(lat, lon, 150)
+        st.markdown("#### 📚 Historical Analogues")
+        st.caption(f"{len(nearby)} recorded storms passed within 150 km of this point.")
+        if analogue_index.rebuilt:
+            st.caption(f"Index rebuilt for the latest IBTrACS data (store {analogue_index.version}).")
+            analogue_index.rebuilt = False  # shown once
+        for row in analogues.itertuples(index=False):
+            motion = motion_label(row)
+            st.write(f"🌀 **{storm_label(row)}**: {row.DIST_KM:.0f} km away at {row.PRES_AT_CLOSEST:.0f} hPa"
+                     + (f", {motion}" if motion else ""))
+
 with col2:
-    hex_colors = ["#00FF00", "#FFFF00", "#FFA500", "#FF0000"]
-    active_color = hex_colors[prediction_idx]
+    import folium
+    from streamlit_folium import st_folium
+
+    if mode == "🛰️ Regional Watch":
+        # Only this block reruns on the timer. st_folium keeps the map (same
+        # key) and just swaps the district markers layer; if the worst
+        # district changed, the whole page reruns so status and SOS follow.
+        @st.fragment(run_every=refresh_s)
+        def regional_watch():
+            watch = refresh_watch()
+            if watch["worst"] != st.session_state.get("watch_shown"):
+                st.rerun()
+            scored, timing = watch["scored"], watch["timing"]
+            with span("app.map_render", map="regional_watch"):
+                m = folium.Map(location=[18.5, 84.0], zoom_start=6)
+                st_folium(m, feature_group_to_add=watch_layer(scored), key="regional_watch_map",
+                          width=700, height=450, returned_objects=[])
+            st.caption(f"{len(scored)} districts · fetch {timing['fetch_s'] * 1000:.0f} ms · "
+                       f"scoring {timing['score_s'] * 1000:.1f} ms · {watch['time']:%H:%M:%S}")
+            st.dataframe(scored, hide_index=True, use_container_width=True)
+
+        regional_watch()
+    else:
+        hex_colors = ["#00FF00", "#FFFF00", "#FFA500", "#FF0000"]
+        active_color = hex_colors[prediction_idx]
     
-    m = folium.Map(location=[lat, lon], zoom_start=8)
-    folium.Marker([lat, lon], popup=loc_display).add_to(m)
+        m = folium.Map(location=[lat, lon], zoom_start=8)
+        folium.Marker([lat, lon], popup=loc_display).add_to(m)
     
-    # Highlight the search area with a colored boundary
-    folium.Circle(
-        location=[lat, lon],
-        radius=15000, # 15km
-        color=active_color,
-        fill=True,
-        fill_opacity=0.4
-    ).add_to(m)
+        # Highlight the search area with a colored boundary
+        folium.Circle(
+            location=[lat, lon],
+            radius=15000, # 15km
+            color=active_color,
+            fill=True,
+            fill_opacity=0.4
+        ).add_to(m)
+
+        if show_density:
+            from heatmap_tiles import density, folium_overlay
+            # Cached density grid, sent as one small raster instead of thousands of points
+            folium_overlay(density(min_season=2000)).add_to(m)
+
+        if analogues is not None:
+            for row in analogues.itertuples(index=False):
+                folium.CircleMarker([row.LATITUDE, row.LONGITUDE], radius=5, color="#555555", fill=True,
+                                    tooltip=f"{storm_label(row)}, {row.PRES_AT_CLOSEST:.0f} hPa").add_to(m)
     
-    st_folium(m, width=700, height=450)
+        # Tracks are simplified for the current zoom and cached per filter, so
+        # the layer only changes when the filter or the zoom tier does
+        tracks = None
+        if show_tracks:
+            zoom = (st.session_state.get("main_map") or {}).get("zoom") or 8
+            from track_layer import track_layer
+            with span("app.track_layer"):
+                tracks = track_layer(*track_seasons, track_name, zoom)
+
+        with span("app.map_render", map="main"):
+            st_folium(m, key="main_map", feature_group_to_add=tracks, width=700, height=450)
 
 # ==========================================
 # 📋 COMPREHENSIVE SURVIVAL GUIDE
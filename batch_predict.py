@@ -0,0 +1,179 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from features import GRADE_NAMES
+
+# ==========================================
+# 📦 BATCH / BULK SCORING
+# ==========================================
+# Streams (lat, lon, pressure) rows from CSV, Parquet, .npy or stdin in
+# fixed-size chunks, runs ONE predict_proba per chunk (grade = argmax,
+# confidence = max) and writes each scored chunk out before reading the
+# next one, so memory stays bounded no matter how big the input is.
+#
+#   python batch_predict.py grid.parquet -o scored.csv
+#   cat feed.csv | python batch_predict.py - > scored.csv
+
+MODEL_FILE = 'cyclone_model.joblib'
+CHUNK_ROWS = 100_000
+FEATURES = ['lat', 'lon', 'pres']
+
+
+def _detect_format(path):
+    if path == '-':
+        return 'csv'
+    ext = os.path.splitext(path)[1].lower()
+    return {'.parquet': 'parquet', '.pq': 'parquet', '.npy': 'npy'}.get(ext, 'csv')
+
+
+def iter_chunks(path, columns=FEATURES, chunk_size=CHUNK_ROWS, fmt=None, header=True):
+    """Yield float64 arrays of shape (n, 3) read lazily from `path`."""
+    fmt = fmt or _detect_format(path)
+
+    if fmt == 'npy':
+        # Memory-mapped: only the slice being scored is paged in
+        arr = np.load(path, mmap_mode='r')
+        for start in range(0, len(arr), chunk_size):
+            yield np.asarray(arr[start:start + chunk_size, :3], dtype=np.float64)
+
+    elif fmt == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(columns)):
+            yield np.column_stack([batch.column(c).to_numpy(zero_copy_only=False) for c in columns]).astype(np.float64)
+
+    else:
+        cols = list(columns) if header else [0, 1, 2]
+        reader = pd.read_csv(
+            sys.stdin if path == '-' else path,
+            usecols=cols,
+            header=0 if header else None,
+            dtype='float64',
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            yield chunk[cols].to_numpy()
+
+
+def score(model, X, index=None):
+    """Grade, confidence and class probabilities from a single predict_proba pass.
+
+    With an analogues.AnalogueIndex, also the closest past storm seen at a
+    similar pressure (one batched tree query per chunk).
+    """
+    probs = model.predict_proba(X)
+    best = np.argmax(probs, axis=1)
+    grades = model.classes_.take(best)
+
+    out = pd.DataFrame(X, columns=FEATURES)
+    out['grade'] = grades
+    out['grade_name'] = pd.Series(grades).map(GRADE_NAMES).to_numpy()
+    out['confidence'] = probs[np.arange(len(probs)), best]
+    for i, cls in enumerate(model.classes_):
+        out[f'p_{GRADE_NAMES.get(cls, cls).lower()}'] = probs[:, i]
+    if index is not None:
+        from analogues import storm_label
+        near = index.nearest_batch(X)
+        out['analogue'] = [storm_label(r) for r in near.itertuples(index=False)]
+        out['analogue_km'] = near['DIST_KM'].to_numpy()
+    return out
+
+
+class _CsvSink:
+    def __init__(self, path):
+        self.f = sys.stdout if path == '-' else open(path, 'w', newline='')
+        self.first = True
+
+    def write(self, df):
+        df.to_csv(self.f, header=self.first, index=False, float_format='%.6g')
+        self.first = False
+
+    def close(self):
+        if self.f is not sys.stdout:
+            self.f.close()
+
+
+class _ParquetSink:
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def score_file(model, src, dst='-', columns=FEATURES, chunk_size=CHUNK_ROWS,
+               in_fmt=None, header=True, progress=None, index=None):
+    """Score `src` chunk by chunk into `dst` (csv or parquet). Returns rows written."""
+    sink = _ParquetSink(dst) if dst != '-' and _detect_format(dst) == 'parquet' else _CsvSink(dst)
+    rows = 0
+    try:
+        for X in iter_chunks(src, columns, chunk_size, in_fmt, header):
+            sink.write(score(model, X, index))
+            rows += len(X)
+            if progress:
+                progress(rows)
+    finally:
+        sink.close()
+    return rows
+
+
+# ==========================================
+# 🖥️ CLI
+# ==========================================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Bulk cyclone grade scoring.')
+    ap.add_argument('input', help="CSV / Parquet / .npy file, or '-' for CSV on stdin")
+    ap.add_argument('-o', '--output', default='-', help="CSV or .parquet output (default: stdout)")
+    ap.add_argument('--model', default=MODEL_FILE)
+    ap.add_argument('--chunk-size', type=int, default=CHUNK_ROWS)
+    ap.add_argument('--format', choices=['csv', 'parquet', 'npy'], help='input format (default: by extension)')
+    ap.add_argument('--columns', nargs=3, default=FEATURES, metavar=('LAT', 'LON', 'PRES'),
+                    help='input column names for latitude, longitude and pressure')
+    ap.add_argument('--no-header', action='store_true', help='CSV has no header; use the first 3 columns')
+    ap.add_argument('--analogues', action='store_true',
+                    help='add the nearest similar-pressure historical storm (needs analogues.py index)')
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.model):
+        print(f"❌ Error: '{args.model}' not found! Run model.py first.", file=sys.stderr)
+        return 1
+
+    import joblib
+    model = joblib.load(args.model)
+
+    index = None
+    if args.analogues:
+        from analogues import load_index
+        index = load_index()
+        if index is None:
+            print("❌ Error: analogue index not found! Run analogues.py first.", file=sys.stderr)
+            return 1
+
+    start = time.perf_counter()
+
+    def progress(rows):
+        print(f"\r   scored {rows:,} rows", end='', file=sys.stderr)
+
+    rows = score_file(model, args.input, args.output, args.columns, args.chunk_size,
+                      args.format, not args.no_header, progress, index)
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ {rows:,} rows in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
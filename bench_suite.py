@@ -0,0 +1,348 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+warnings.filterwarnings('ignore')
+
+# ==========================================
+# ⏱️ BENCHMARK & REGRESSION SUITE
+# ==========================================
+# Times the hot paths end to end and records their peak memory, then
+# compares both against bench_baselines.json:
+#
+#   parse_zip        raw release CSV parsed straight out of the zip
+#   store_ingest     full ingest into an empty season-partitioned store
+#   clean            dropna + 17-200 kt filter on the stored columns
+#   grade            cyclone_grade over every wind value
+#   train            the model.py forest (100 trees, depth 10)
+#   predict_single   one predict_proba row, sklearn and flat forest
+#   predict_bulk     100k rows, sklearn and flat forest
+#   app_rerun        a full warm rerun of app (1).py through AppTest
+#
+# Time is the median of --repeat runs (after a warm-up for the cheap cases).
+# Memory never slows the timed runs:
+#
+#   peak_mb      tracemalloc peak of one extra run (Python + NumPy buffers)
+#   max_rss_mb   how far one run lifts the peak RSS above the RSS it
+#                started at, in a fresh subprocess that sets the case up
+#                first; unlike tracemalloc it sees native allocations such
+#                as sklearn's tree builder
+#
+# A case regresses when it is more than --tolerance slower, or bigger on
+# either memory metric, than its baseline. max_rss_mb reads the kernel's
+# peak (VmHWM, what ru_maxrss reports for a single-threaded process) and
+# resets it after setup through /proc/self/clear_refs, so it is Linux
+# only; elsewhere it is skipped. ru_maxrss itself can't be used: it also
+# keeps the peak of every thread that has exited, i.e. the setup's.
+# Baselines are machine specific: re-record them with --update on the
+# machine that runs the checks.
+#
+#   python bench_suite.py                    # run + compare (exit 1 on regression)
+#   python bench_suite.py --only predict     # cases whose name contains "predict"
+#   python bench_suite.py --update           # store new baselines
+
+BASELINE_FILE = 'bench_baselines.json'
+MODEL_FILE = 'cyclone_model.joblib'
+APP_FILE = 'app (1).py'
+TOLERANCE = 0.25
+MIN_SLACK_S = 0.002    # ignore time changes smaller than this (timer noise)
+MIN_SLACK_MB = 1.0     # ... and tracemalloc changes smaller than this
+MIN_SLACK_RSS_MB = 5.0   # ... and peak RSS changes smaller than this (allocator noise)
+BULK_ROWS = 100_000
+SINGLE_CALLS = 200
+TRAIN_PARAMS = {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 5}
+
+
+class Case:
+    """A named benchmark: setup() -> (run, calls). Reported time is per call."""
+
+    def __init__(self, name, setup, repeat=None, warmup=True):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat    # overrides --repeat for slow cases
+        self.warmup = warmup
+
+
+# ---------- cases ----------
+def _parse_zip():
+    from ibtracs_data import ZIP_PATH, read_release
+    return lambda: read_release(ZIP_PATH), 1
+
+
+def _store_ingest():
+    from ibtracs_data import ZIP_PATH
+    from ibtracs_store import ingest
+
+    def run():
+        tmp = tempfile.mkdtemp(prefix='bench_store_')
+        try:
+            ingest(ZIP_PATH, store=tmp)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return run, 1
+
+
+def _stored_columns():
+    from ibtracs_store import ingest, load_seasons
+    ingest()
+    return load_seasons(['SEASON', 'LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO'], path=None)
+
+
+def _clean():
+    df = _stored_columns()
+    return lambda: df[df['SEASON'] >= 2000].dropna().query('17 <= WIND_WMO <= 200'), 1
+
+
+def _grade():
+    from features import cyclone_grade
+    wind = np.nan_to_num(_stored_columns()['WIND_WMO'].to_numpy())
+    return lambda: cyclone_grade(wind), 1
+
+
+def _train():
+    from train_pipeline import build_dataset, train
+    X, y = build_dataset('storms', min_season=2000)
+    return lambda: train(X, y, TRAIN_PARAMS), 1
+
+
+def _load_models():
+    import joblib
+    from forest_engine import FlatForest
+    if not os.path.exists(MODEL_FILE):
+        raise FileNotFoundError(f"'{MODEL_FILE}' not found, run model.py first")
+    model = joblib.load(MODEL_FILE)
+    return model, FlatForest.from_sklearn(model)
+
+
+def _rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(5, 25, n), rng.uniform(60, 100, n), rng.uniform(940, 1015, n)])
+
+
+def _predict_single(flat):
+    def setup():
+        model = _load_models()[1 if flat else 0]
+        x = np.array([[17.7, 83.3, 960.0]])
+
+        def run():
+            for _ in range(SINGLE_CALLS):
+                model.predict_proba(x)
+        return run, SINGLE_CALLS
+    return setup
+
+
+def _predict_bulk(flat):
+    def setup():
+        model = _load_models()[1 if flat else 0]
+        X = _rows(BULK_ROWS)
+        return lambda: model.predict_proba(X), 1
+    return setup
+
+
+def _app_rerun():
+    import logging
+    from streamlit.testing.v1 import AppTest
+    # AppTest runs the script on this thread; the bare-mode warning is noise here
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+    if not os.path.exists(MODEL_FILE):
+        raise FileNotFoundError(f"'{MODEL_FILE}' not found, run model.py first")
+    at = AppTest.from_file(APP_FILE, default_timeout=90)
+    at.run()  # cold start: imports, model load, caches
+
+    def run():
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+    return run, 1
+
+
+CASES = [
+    Case('parse_zip', _parse_zip, repeat=3, warmup=False),
+    Case('store_ingest', _store_ingest, repeat=1, warmup=False),
+    Case('clean', _clean),
+    Case('grade', _grade),
+    Case('train', _train, repeat=3, warmup=False),
+    Case('predict_single_sklearn', _predict_single(flat=False)),
+    Case('predict_single_flat', _predict_single(flat=True)),
+    Case('predict_bulk_sklearn', _predict_bulk(flat=False)),
+    Case('predict_bulk_flat', _predict_bulk(flat=True)),
+    Case('app_rerun', _app_rerun, repeat=3),
+]
+
+
+# ---------- measuring ----------
+def _peak_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 2**10  # kB
+
+
+def _reset_peak_rss():
+    # Writing 5 to clear_refs resets the peak to the current RSS (Linux >= 4.0)
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _rss_child(name):
+    # Runs in the subprocess started by max_rss(): set up, reset the peak, run once
+    case = next(c for c in CASES if c.name == name)
+    run, _ = case.setup()
+    if not _reset_peak_rss():
+        print(json.dumps({'max_rss_mb': None}))
+        return
+    start = _peak_rss_mb()
+    run()
+    print(json.dumps({'max_rss_mb': _peak_rss_mb() - start}))
+
+
+def max_rss(case):
+    """Peak RSS growth (MB) of one run of `case`, in a fresh interpreter; None off Linux."""
+    if not sys.platform.startswith('linux'):
+        return None
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--rss-child', case.name],
+                          capture_output=True, text=True, cwd=here)
+    if proc.returncode:
+        raise RuntimeError(f"{case.name} failed in the RSS subprocess:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])['max_rss_mb']
+
+
+def measure(case, repeat=5):
+    """{'seconds': median per call, 'min_seconds', 'peak_mb', 'max_rss_mb', 'runs'} for one case."""
+    run, calls = case.setup()
+    if case.warmup:
+        run()
+    times = []
+    for _ in range(case.repeat or repeat):
+        t = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - t) / calls)
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'min_seconds': min(times),
+            'peak_mb': peak / 2**20, 'max_rss_mb': max_rss(case), 'runs': len(times)}
+
+
+def environment():
+    import pandas
+    import sklearn
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pandas.__version__,
+            'sklearn': sklearn.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def compare(results, baselines, tolerance=TOLERANCE):
+    """List of (case, metric, baseline, now) that got worse than the tolerance allows."""
+    regressions = []
+    for name, now in results.items():
+        base = baselines.get(name)
+        if not base:
+            continue
+        for metric, slack in (('seconds', MIN_SLACK_S), ('peak_mb', MIN_SLACK_MB),
+                              ('max_rss_mb', MIN_SLACK_RSS_MB)):
+            if base.get(metric) is None or now.get(metric) is None:
+                continue
+            if now[metric] > base[metric] * (1 + tolerance) and now[metric] - base[metric] > slack:
+                regressions.append((name, metric, base[metric], now[metric]))
+    return regressions
+
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {'environment': {}, 'cases': {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results, path=BASELINE_FILE):
+    blob = load_baselines(path)
+    blob['environment'] = environment()
+    blob['recorded'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    keep = ('seconds', 'peak_mb', 'max_rss_mb')
+    blob['cases'].update({name: {k: None if r[k] is None else round(r[k], 6) for k in keep}
+                          for name, r in results.items()})
+    with open(path + '.tmp', 'w') as f:
+        json.dump(blob, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def _fmt_time(s):
+    return f"{s * 1e3:.3f}ms" if s < 0.1 else f"{s:.2f}s"
+
+
+def _fmt_mb(mb):
+    return '-' if mb is None else f"{mb:.1f}MB"
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Benchmark the load / train / predict hot paths.')
+    ap.add_argument('--only', action='append', help='run cases whose name contains this (repeatable)')
+    ap.add_argument('--repeat', type=int, default=5)
+    ap.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown / growth (0.25 = 25%%)')
+    ap.add_argument('--baselines', default=BASELINE_FILE)
+    ap.add_argument('--update', action='store_true', help='store the results as the new baselines')
+    ap.add_argument('--json', help='also write the results here')
+    ap.add_argument('--rss-child', help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.rss_child:
+        _rss_child(args.rss_child)
+        sys.exit(0)
+
+    cases = [c for c in CASES if not args.only or any(o in c.name for o in args.only)]
+    baselines = load_baselines(args.baselines)
+    if baselines['environment'] and baselines['environment'] != environment():
+        print(f"⚠️ Baselines were recorded on {baselines['environment']}, comparisons may be off")
+
+    print(f"{'case':<24} {'median':>11} {'min':>11} {'peak mem':>10} {'max rss':>10} {'baseline':>11} {'change':>8}")
+    results = {}
+    for case in cases:
+        try:
+            r = measure(case, args.repeat)
+        except FileNotFoundError as e:
+            print(f"{case.name:<24} skipped: {e}")
+            continue
+        results[case.name] = r
+        base = baselines['cases'].get(case.name)
+        change = f"{(r['seconds'] / base['seconds'] - 1) * 100:+.0f}%" if base else 'new'
+        print(f"{case.name:<24} {_fmt_time(r['seconds']):>11} {_fmt_time(r['min_seconds']):>11} "
+              f"{r['peak_mb']:>8.1f}MB {_fmt_mb(r['max_rss_mb']):>10} {_fmt_time(base['seconds']) if base else '-':>11} {change:>8}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': environment(), 'cases': results}, f, indent=2)
+
+    if args.update:
+        save_baselines(results, args.baselines)
+        print(f"\n✅ Baselines for {len(results)} cases saved to {args.baselines}")
+        sys.exit(0)
+
+    regressions = compare(results, baselines['cases'], args.tolerance)
+    if not regressions:
+        print(f"\n✅ No regressions (tolerance {args.tolerance:.0%})")
+        sys.exit(0)
+    print(f"\n❌ {len(regressions)} regression(s) (tolerance {args.tolerance:.0%}):")
+    for name, metric, base, now in regressions:
+        fmt = _fmt_time if metric == 'seconds' else (lambda v: f"{v:.1f}MB")
+        print(f"   {name}: {metric} {fmt(base)} -> {fmt(now)} ({(now / base - 1) * 100:+.0f}%)")
+    sys.exit(1)
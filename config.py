@@ -0,0 +1,23 @@
+# ==========================================
+# 🔑 CONFIGURATION (2 TWILIO ACCOUNTS)
+# ==========================================
+WEATHER_API_KEY = "22223eb27d4a61523a6bbad9f42a14a7"
+
+# Account 1 Credentials
+TWILIO_SID_1 = "ACc9b9941c778de30e2ed7ba57f87cdfbc" 
+TWILIO_AUTH_1 = "3cb1dfcb6a9a3cae88f4eff47e9458df"
+TWILIO_PHONE_1 = "+15075195618"
+
+# Account 2 Credentials (Backup)
+TWILIO_SID_2 = "ACa12e602647785572ebaf765659d26d23"
+TWILIO_AUTH_2 = "26210979738809eaf59a678e98fe2c0f"
+TWILIO_PHONE_2 = "+14176076960"
+
+# Failover order used by every SOS / broadcast path
+ACCOUNTS = [
+    {"sid": TWILIO_SID_1, "token": TWILIO_AUTH_1, "from": TWILIO_PHONE_1},
+    {"sid": TWILIO_SID_2, "token": TWILIO_AUTH_2, "from": TWILIO_PHONE_2}
+]
+
+# Check if at least one account is configured
+SIMULATION_MODE = "YOUR_PRIMARY" in TWILIO_SID_1
@@ -0,0 +1,314 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import GroupKFold, StratifiedKFold
+
+from features import GRADE_NAMES, cyclone_grade
+from ibtracs_data import ZIP_PATH
+from ibtracs_store import STORE_ROOT, ingest, load_seasons, read_manifest
+from instrumentation import print_summary, span
+from train_pipeline import CACHE_DIR, FEATURES, synthetic_safe
+
+warnings.filterwarnings('ignore')
+
+# ==========================================
+# 🧪 SPATIO-TEMPORAL CROSS-VALIDATION
+# ==========================================
+# model.py scores on a random train_test_split, so neighbouring 3-hourly
+# points of the SAME storm land on both sides and the accuracy is
+# optimistic. Here every row is predicted by a forest that never saw its
+# storm (or its season):
+#
+#   storm    GroupKFold by SID
+#   season   leave-one-season-out
+#   random   stratified k-fold, the leaky baseline, for comparison
+#
+# The dataset is written once to EVAL_DIR/<key>/ as .npy files and every
+# fold runs in a separate worker process that memory-maps them, so nothing
+# but a path and a fold number is pickled. Workers also write their
+# out-of-fold probabilities straight into a shared memory-mapped array.
+# From those we report:
+#
+#   * accuracy, per-grade precision / recall and the confusion matrix
+#   * calibration per grade (reliability bins, ECE) and the Brier score
+#   * lead time by grade: for storms that made landfall, how long before
+#     landfall the predicted grade first reached each level, vs IBTrACS
+#
+#   python evaluation.py                              # storm + season + random, seasons 2000+
+#   python evaluation.py --scheme storm --min-season 0 --json eval.json
+
+EVAL_DIR = os.path.join(CACHE_DIR, 'eval')
+SCHEMES = ('storm', 'season', 'random')
+PARAMS = {'n_estimators': 100, 'max_depth': 10, 'min_samples_split': 5}  # model.py's forest
+N_FOLDS = 5
+N_BINS = 10
+ARRAYS = ('X', 'y', 'group', 'season', 'hours', 'landfall_h')
+
+
+# ---------- data ----------
+def prepare(kind='storms', min_season=2000, n_safe=1000, seed=42, path=ZIP_PATH, store=STORE_ROOT):
+    """Write the evaluation arrays once per dataset options / store version; returns their directory."""
+    ingest(path, store)
+    version = read_manifest(store)['version']
+    key = hashlib.sha1(json.dumps([kind, min_season, n_safe, seed, version]).encode()).hexdigest()[:16]
+    out = os.path.join(EVAL_DIR, key)
+    if os.path.exists(os.path.join(out, 'y.npy')):
+        return out
+
+    df = load_seasons(['SID', 'SEASON', 'ISO_TIME', 'LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO', 'DIST2LAND'],
+                      min_season=min_season, store=store, path=None)
+    hours = df['ISO_TIME'].to_numpy().astype('datetime64[s]').astype(np.float64) / 3600
+    df = df.assign(HOURS=hours)
+    # Landfall from the full track: the first point on land often has no WMO wind
+    landfall = df[df['DIST2LAND'] <= 0].groupby('SID')['HOURS'].min()
+    df = df.dropna(subset=['SEASON', 'WIND_WMO'] + FEATURES)
+    df = df[df['WIND_WMO'].between(17, 200)] if kind == 'storms' else df[df['WIND_WMO'] >= 17]
+
+    arrays = {
+        'X': df[FEATURES].to_numpy(dtype=np.float64),
+        'y': cyclone_grade(df['WIND_WMO'].to_numpy()),
+        'group': pd.factorize(df['SID'])[0].astype(np.int64),
+        'season': df['SEASON'].to_numpy(dtype=np.int64),
+        'hours': df['HOURS'].to_numpy(),
+        'landfall_h': df['SID'].map(landfall).to_numpy(dtype=np.float64),
+    }
+    if kind == 'with-safe':
+        safe = synthetic_safe(n_safe, seed)
+        # Every synthetic point is its own "storm" with no track
+        extra = {'X': safe[FEATURES].to_numpy(), 'y': cyclone_grade(safe['WIND_WMO'].to_numpy()),
+                 'group': -1 - np.arange(len(safe)), 'season': safe['SEASON'].to_numpy(dtype=np.int64),
+                 'hours': np.full(len(safe), np.nan), 'landfall_h': np.full(len(safe), np.nan)}
+        arrays = {k: np.concatenate([v, extra[k]]) for k, v in arrays.items()}
+    elif kind != 'storms':
+        raise ValueError(f"unknown dataset kind: {kind}")
+
+    tmp = out + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, f'{name}.npy'), np.ascontiguousarray(arr))
+    shutil.rmtree(out, ignore_errors=True)
+    os.replace(tmp, out)
+    return out
+
+
+def load(data_dir, mmap=True):
+    return {name: np.load(os.path.join(data_dir, f'{name}.npy'), mmap_mode='r' if mmap else None)
+            for name in ARRAYS}
+
+
+def make_folds(data_dir, scheme, n_folds=N_FOLDS, seed=42):
+    """Fold id of every row, saved next to the data; returns (path, number of folds)."""
+    d = load(data_dir)
+    if scheme == 'storm':
+        folds = np.empty(len(d['y']), dtype=np.int64)
+        for i, (_, test) in enumerate(GroupKFold(n_folds).split(d['X'], d['y'], d['group'])):
+            folds[test] = i
+    elif scheme == 'season':
+        folds = np.unique(d['season'], return_inverse=True)[1].astype(np.int64)
+    elif scheme == 'random':
+        folds = np.empty(len(d['y']), dtype=np.int64)
+        for i, (_, test) in enumerate(StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(d['X'], d['y'])):
+            folds[test] = i
+    else:
+        raise ValueError(f"unknown scheme: {scheme}")
+    path = os.path.join(data_dir, f'folds_{scheme}_{n_folds}_{seed}.npy')
+    np.save(path, folds)
+    return path, int(folds.max()) + 1
+
+
+# ---------- workers ----------
+def _fit_fold(data_dir, folds_path, oof_path, fold, classes, params, seed):
+    d = load(data_dir)
+    test = np.load(folds_path, mmap_mode='r') == fold
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    t = time.perf_counter()
+    model.fit(d['X'][~test], d['y'][~test])
+    fit_s = time.perf_counter() - t
+
+    # A fold can miss a grade entirely; its column stays 0
+    cols = np.searchsorted(classes, model.classes_)
+    rows = np.flatnonzero(test)
+    oof = np.load(oof_path, mmap_mode='r+')
+    oof[rows[:, None], cols[None, :]] = model.predict_proba(d['X'][test])
+    oof.flush()
+    return {'fold': fold, 'test_rows': len(rows), 'train_rows': int((~test).sum()), 'fit_s': fit_s}
+
+
+def cross_validate(data_dir, scheme, n_folds=N_FOLDS, params=PARAMS, n_jobs=-1, seed=42):
+    """Out-of-fold probabilities (n, n_classes), the classes, and per-fold stats."""
+    folds_path, n = make_folds(data_dir, scheme, n_folds, seed)
+    classes = np.unique(load(data_dir)['y'])
+    oof_path = os.path.join(data_dir, f'oof_{scheme}.npy')
+    np.lib.format.open_memmap(oof_path, mode='w+', dtype=np.float64,
+                              shape=(len(np.load(folds_path, mmap_mode='r')), len(classes))).flush()
+    with span('eval.cross_validate', scheme=scheme):
+        stats = Parallel(n_jobs=n_jobs, backend='loky')(
+            delayed(_fit_fold)(data_dir, folds_path, oof_path, f, classes, params, seed) for f in range(n)
+        )
+    return np.load(oof_path), classes, stats
+
+
+# ---------- reports ----------
+def confusion(y, pred, classes):
+    """Counts, rows = IBTrACS grade, columns = predicted grade."""
+    m = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    np.add.at(m, (np.searchsorted(classes, y), np.searchsorted(classes, pred)), 1)
+    return m
+
+
+def per_grade(matrix):
+    tp = np.diag(matrix).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.nan_to_num(tp / matrix.sum(axis=0))
+        recall = np.nan_to_num(tp / matrix.sum(axis=1))
+        f1 = np.nan_to_num(2 * precision * recall / (precision + recall))
+    return precision, recall, f1
+
+
+def calibration(y, proba, classes, n_bins=N_BINS):
+    """Per grade: reliability bins (count, mean predicted, observed rate) and ECE."""
+    out = {}
+    for c, grade in enumerate(classes):
+        p, hit = proba[:, c], (y == grade).astype(np.float64)
+        b = np.minimum((p * n_bins).astype(np.int64), n_bins - 1)
+        count = np.bincount(b, minlength=n_bins)
+        with np.errstate(invalid='ignore'):
+            mean_p = np.bincount(b, p, n_bins) / count
+            rate = np.bincount(b, hit, n_bins) / count
+        used = count > 0
+        out[int(grade)] = {'count': count.tolist(),
+                           'mean_predicted': [float(v) if u else None for v, u in zip(mean_p, used)],
+                           'observed': [float(v) if u else None for v, u in zip(rate, used)],
+                           'ece': float(np.sum(count[used] / len(y) * np.abs(mean_p[used] - rate[used])))}
+    return out
+
+
+def lead_times(d, pred, classes):
+    """Per grade, over storms that made landfall: detections and lead time before landfall (hours)."""
+    on_track = (d['group'] >= 0) & ~np.isnan(d['landfall_h'])
+    df = pd.DataFrame({'group': d['group'][on_track], 'hours': d['hours'][on_track],
+                       'landfall': d['landfall_h'][on_track], 'y': d['y'][on_track], 'pred': pred[on_track]})
+    landfall = df.groupby('group')['landfall'].first()
+    out = {}
+    for grade in classes[classes > 0]:
+        # First time each storm reached this grade, according to IBTrACS / the model
+        seen = df[(df['y'] >= grade) & (df['hours'] <= df['landfall'])].groupby('group')['hours'].min()
+        hit = df[(df['pred'] >= grade) & (df['hours'] <= df['landfall'])].groupby('group')['hours'].min()
+        both = seen.index.intersection(hit.index)
+        lead = landfall[hit.index] - hit
+        out[int(grade)] = {
+            'storms': int(len(seen)),
+            'detected': int(len(both)),
+            'false_alarms': int(len(hit.index.difference(seen.index))),
+            'median_lead_h': float(np.median(lead[both])) if len(both) else None,
+            'median_observed_lead_h': float(np.median(landfall[seen.index] - seen)) if len(seen) else None,
+            'median_delay_h': float(np.median(hit[both] - seen[both])) if len(both) else None,
+        }
+    return out
+
+
+def evaluate(data_dir, scheme, n_folds=N_FOLDS, params=PARAMS, n_jobs=-1, seed=42, n_bins=N_BINS):
+    t = time.perf_counter()
+    proba, classes, stats = cross_validate(data_dir, scheme, n_folds, params, n_jobs, seed)
+    d = load(data_dir, mmap=False)
+    y = d['y']
+    pred = classes.take(proba.argmax(axis=1))
+    matrix = confusion(y, pred, classes)
+    precision, recall, f1 = per_grade(matrix)
+    onehot = (y[:, None] == classes[None, :]).astype(np.float64)
+    return {
+        'scheme': scheme, 'folds': len(stats), 'rows': len(y), 'classes': classes.tolist(),
+        'accuracy': float((pred == y).mean()), 'macro_f1': float(f1.mean()),
+        'brier': float(np.mean(np.sum((proba - onehot) ** 2, axis=1))),
+        'confusion': matrix.tolist(),
+        'per_grade': {int(g): {'precision': float(p), 'recall': float(r), 'f1': float(f), 'support': int(s)}
+                      for g, p, r, f, s in zip(classes, precision, recall, f1, matrix.sum(axis=1))},
+        'calibration': calibration(y, proba, classes, n_bins),
+        'lead_time': lead_times(d, pred, classes),
+        'fit_s': sum(s['fit_s'] for s in stats), 'wall_s': time.perf_counter() - t,
+    }
+
+
+def _name(grade):
+    return GRADE_NAMES.get(grade, str(grade))
+
+
+def report(r):
+    print(f"\n🧪 {r['scheme']}: {r['folds']} folds, {r['rows']:,} rows in {r['wall_s']:.1f}s "
+          f"({r['fit_s']:.1f}s of fitting)")
+    print(f"   accuracy {r['accuracy']:.2%}  macro F1 {r['macro_f1']:.3f}  Brier {r['brier']:.3f}")
+    names = [_name(g) for g in r['classes']]
+    print(f"   {'IBTrACS / predicted':<20}" + ''.join(f"{n:>12}" for n in names) +
+          f"{'recall':>9}{'precision':>11}{'ECE':>7}")
+    for g, row in zip(r['classes'], r['confusion']):
+        s = r['per_grade'][g]
+        print(f"   {_name(g):<20}" + ''.join(f"{v:>12,}" for v in row) +
+              f"{s['recall']:>9.1%}{s['precision']:>11.1%}{r['calibration'][g]['ece']:>7.3f}")
+    print("   lead time before landfall (median hours, storms that made landfall):")
+    for g, lt in r['lead_time'].items():
+        if lt['storms'] or lt['false_alarms']:
+            lead = f"{lt['median_lead_h']:.0f}h" if lt['median_lead_h'] is not None else '-'
+            obs = f"{lt['median_observed_lead_h']:.0f}h" if lt['median_observed_lead_h'] is not None else '-'
+            delay = f"{lt['median_delay_h']:+.0f}h" if lt['median_delay_h'] is not None else '-'
+            print(f"   {_name(g):<20} detected {lt['detected']}/{lt['storms']} storms, lead {lead} "
+                  f"(IBTrACS {obs}, delay {delay}), {lt['false_alarms']} false alarms")
+
+
+def report_calibration(r):
+    print(f"\n📐 {r['scheme']} reliability (predicted -> observed, rows per bin):")
+    for g, cal in r['calibration'].items():
+        bins = [f"{p:.2f}->{o:.2f} ({n})" for p, o, n in zip(cal['mean_predicted'], cal['observed'], cal['count']) if n]
+        print(f"   {_name(g):<12} " + '  '.join(bins))
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Grouped cross-validation and evaluation reports.')
+    ap.add_argument('--scheme', action='append', choices=SCHEMES, help='repeatable (default: all)')
+    ap.add_argument('--dataset', choices=['storms', 'with-safe'], default='storms')
+    ap.add_argument('--min-season', type=int, default=2000)
+    ap.add_argument('--folds', type=int, default=N_FOLDS, help='folds for storm / random')
+    ap.add_argument('--params', type=json.loads, default=PARAMS, help='forest parameters as JSON')
+    ap.add_argument('--jobs', type=int, default=-1)
+    ap.add_argument('--bins', type=int, default=N_BINS)
+    ap.add_argument('--calibration', action='store_true', help='print the reliability bins')
+    ap.add_argument('--json', help='write the full reports here')
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("NORTH INDIAN OCEAN CYCLONE MODEL - GROUPED CROSS-VALIDATION")
+    print("=" * 80)
+    t = time.perf_counter()
+    data_dir = prepare(args.dataset, args.min_season)
+    d = load(data_dir)
+    print(f"\n📦 '{args.dataset}' since {args.min_season}: {len(d['y']):,} rows, "
+          f"{len(np.unique(d['group'][d['group'] >= 0]))} storms, {len(np.unique(d['season']))} seasons "
+          f"({time.perf_counter() - t:.2f}s) -> {data_dir}")
+
+    results = []
+    for scheme in args.scheme or SCHEMES:
+        r = evaluate(data_dir, scheme, args.folds, args.params, args.jobs, n_bins=args.bins)
+        report(r)
+        if args.calibration:
+            report_calibration(r)
+        results.append(r)
+
+    by_scheme = {r['scheme']: r['accuracy'] for r in results}
+    if 'random' in by_scheme and len(by_scheme) > 1:
+        worst = min((s for s in by_scheme if s != 'random'), key=by_scheme.get)
+        print(f"\n⚠️ The random split overstates accuracy by {(by_scheme['random'] - by_scheme[worst]) * 100:.1f} "
+              f"points vs {worst} folds ({by_scheme['random']:.2%} vs {by_scheme[worst]:.2%})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    print_summary()
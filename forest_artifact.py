@@ -0,0 +1,239 @@
+import hashlib
+import json
+import os
+import struct
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from forest_engine import FlatForest
+
+# ==========================================
+# 📦 COMPACT FOREST ARTIFACT (NO SKLEARN)
+# ==========================================
+# cyclone_model.joblib is a pickled RandomForestClassifier: loading it
+# imports sklearn (~1.5 s cold) and carries impurity / sample-count arrays
+# that prediction never reads. export() writes just what FlatForest needs
+# into ONE binary file that numpy can memory-map:
+#
+#   [ magic | format version | header length ][ JSON header ][ arrays... ]
+#
+#   * thresholds as float32, rounded DOWN to the nearest float32. Inputs
+#     are compared as float32 anyway, and for a float32 x, x <= t holds
+#     exactly when x <= round_down32(t), so every split goes the same way
+#   * child / root indices as int32, feature ids in the smallest int type
+#   * class values for leaves only (float64, so sums match bit for bit)
+#
+# Every array starts on a 64-byte boundary and load() maps it read-only.
+# export() refuses to write an artifact whose predict_proba differs from
+# the sklearn model's. The header records the sha256 of the joblib it came
+# from, so load_forest() can tell a stale artifact after a retrain.
+#
+#   python forest_artifact.py                       # export + validate + timings
+#   python forest_artifact.py model.joblib -o model.forest
+
+ARTIFACT_FILE = 'cyclone_model.forest'
+MAGIC = b'CYCFRST\x00'
+FORMAT_VERSION = 1
+ALIGN = 64
+_PREFIX = struct.Struct('<8sII')  # magic, format version, header length
+
+
+def artifact_path(model_path):
+    """Artifact that goes with a joblib model file."""
+    return os.path.splitext(model_path)[0] + '.forest'
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _round_down32(t):
+    t32 = t.astype(np.float32)
+    over = t32.astype(np.float64) > t
+    t32[over] = np.nextafter(t32[over], np.float32(-np.inf))
+    return t32
+
+
+def compact(flat):
+    """FlatForest with float32 thresholds, int32 links and leaf-only values."""
+    n = len(flat.left)
+    leaf = flat.left == np.arange(n)
+    leaf_index = np.zeros(n, dtype=np.int32)
+    leaf_index[leaf] = np.arange(leaf.sum(), dtype=np.int32)
+    n_features = int(flat.feature.max()) + 1 if n else 1
+    feature_dtype = np.uint8 if n_features <= 256 else np.int16 if n_features <= 32768 else np.int32
+    return FlatForest(
+        feature=flat.feature.astype(feature_dtype),
+        threshold=_round_down32(np.asarray(flat.threshold, dtype=np.float64)),
+        left=flat.left.astype(np.int32),
+        missing_left=flat.missing_left.astype(bool),
+        value=np.ascontiguousarray(flat.value[leaf], dtype=np.float64),
+        roots=flat.roots.astype(np.int32),
+        classes=np.asarray(flat.classes_),
+        max_depth=flat.max_depth,
+        leaf_index=leaf_index,
+    )
+
+
+def validate(model, forest, n=200_000, seed=0):
+    """Compare predict_proba on random rows (plus NaNs); returns a report dict."""
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.uniform(-5, 35, n), rng.uniform(45, 105, n), rng.uniform(880, 1030, n)])
+    X[rng.random(X.shape) < 0.01] = np.nan
+    # One thread: sklearn then adds the trees up in a fixed order
+    n_jobs = model.n_jobs
+    model.set_params(n_jobs=1)
+    try:
+        expected = model.predict_proba(X)
+    finally:
+        model.set_params(n_jobs=n_jobs)
+    got = forest.predict_proba(X)
+    return {'rows': n, 'identical': bool(np.array_equal(expected, got)),
+            'max_abs_diff': float(np.max(np.abs(expected - got))),
+            'label_mismatches': int((expected.argmax(1) != got.argmax(1)).sum())}
+
+
+def save(forest, path=ARTIFACT_FILE, source_sha256=None):
+    arrays = {'feature': forest.feature, 'threshold': forest.threshold, 'left': forest.left,
+              'missing_left': forest.missing_left, 'value': forest.value, 'roots': forest.roots,
+              'leaf_index': forest.leaf_index}
+    header = {'format': FORMAT_VERSION, 'n_trees': forest.n_trees, 'max_depth': forest.max_depth,
+              'classes': forest.classes_.tolist(), 'classes_dtype': forest.classes_.dtype.str,
+              'source_sha256': source_sha256, 'arrays': {}}
+
+    # Offsets depend on the header size, which depends on the offsets: lay
+    # the arrays out after a generously padded header
+    def layout(header_room):
+        offset, out = header_room, {}
+        for name, arr in arrays.items():
+            offset = -(-offset // ALIGN) * ALIGN
+            out[name] = {'dtype': arr.dtype.str, 'shape': list(arr.shape), 'offset': offset}
+            offset += arr.nbytes
+        return out
+
+    room = ALIGN * 8
+    while True:
+        header['arrays'] = layout(room)
+        blob = json.dumps(header).encode()
+        if _PREFIX.size + len(blob) <= room:
+            break
+        room *= 2
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(blob)))
+        f.write(blob)
+        for name, arr in arrays.items():
+            f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(arr).tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        magic, version, size = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a forest artifact")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version}, this code reads {FORMAT_VERSION}")
+        return json.loads(f.read(size))
+
+
+def load(path=ARTIFACT_FILE, mmap=True):
+    """FlatForest backed by the artifact (read-only memory map by default)."""
+    header = read_header(path)
+    if mmap:
+        # Plain ndarray views over the map: np.memmap's subclass hooks cost
+        # more than a single-row prediction
+        raw = np.asarray(np.memmap(path, dtype=np.uint8, mode='r'))
+    else:
+        with open(path, 'rb') as f:
+            raw = np.frombuffer(f.read(), dtype=np.uint8)
+    arrays = {}
+    for name, meta in header['arrays'].items():
+        dtype = np.dtype(meta['dtype'])
+        count = int(np.prod(meta['shape'], dtype=np.int64))
+        start = meta['offset']
+        arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(meta['shape'])
+    forest = FlatForest(classes=np.array(header['classes'], dtype=header['classes_dtype']),
+                        max_depth=header['max_depth'], **arrays)
+    forest.source_sha256 = header['source_sha256']
+    return forest
+
+
+def export(model, path=ARTIFACT_FILE, source_path=None, check=True):
+    """Compact + validate + save a fitted RandomForestClassifier."""
+    forest = compact(FlatForest.from_sklearn(model))
+    if check:
+        report = validate(model, forest)
+        if not report['identical']:
+            raise ValueError(f"compact forest disagrees with sklearn: {report}")
+    return save(forest, path, file_sha256(source_path) if source_path else None)
+
+
+def load_forest(model_path, mmap=True):
+    """Fastest correct FlatForest for a joblib model file.
+
+    Uses the .forest artifact next to it when that was exported from this
+    exact file; otherwise unpickles the joblib (imports sklearn) and flattens it.
+    """
+    art = artifact_path(model_path)
+    if model_path.endswith('.forest'):
+        return load(model_path, mmap)
+    if os.path.exists(art):
+        try:
+            forest = load(art, mmap)
+            if forest.source_sha256 == file_sha256(model_path):
+                return forest
+        except (ValueError, OSError, KeyError):
+            pass
+    import joblib
+    return FlatForest.from_sklearn(joblib.load(model_path))
+
+
+def _cold_start(code):
+    # Fresh interpreter, so imports are paid like in a new worker
+    t = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - t
+
+
+if __name__ == '__main__':
+    import argparse
+
+    ap = argparse.ArgumentParser(description='Export the forest to a compact, sklearn-free artifact.')
+    ap.add_argument('model', nargs='?', default='cyclone_model.joblib')
+    ap.add_argument('-o', '--out')
+    args = ap.parse_args()
+    out = args.out or artifact_path(args.model)
+
+    if not os.path.exists(args.model):
+        print(f"❌ Error: '{args.model}' not found! Run model.py first.")
+        sys.exit(1)
+
+    import joblib
+    model = joblib.load(args.model)
+    forest = compact(FlatForest.from_sklearn(model))
+    report = validate(model, forest)
+    print(f"🔎 {report['rows']:,} rows: identical={report['identical']} "
+          f"max diff {report['max_abs_diff']:.1e}, {report['label_mismatches']} label mismatches")
+    if not report['identical']:
+        print("❌ Not exported: predictions changed")
+        sys.exit(1)
+    save(forest, out, file_sha256(args.model))
+    print(f"✅ {forest.n_trees} trees / {len(forest.left):,} nodes -> {out}")
+
+    size_joblib, size_out = os.path.getsize(args.model), os.path.getsize(out)
+    print(f"   size: {size_joblib / 1e6:.2f} MB joblib -> {size_out / 1e6:.2f} MB ({size_joblib / size_out:.1f}x smaller)")
+    x = '[[17.7, 83.3, 960.0]]'
+    t_joblib = _cold_start(f"import joblib; joblib.load({args.model!r}).predict_proba({x})")
+    t_out = _cold_start(f"import forest_artifact as fa; fa.load({out!r}).predict_proba({x})")
+    print(f"   cold start + 1 prediction: {t_joblib:.2f}s joblib/sklearn -> {t_out:.2f}s artifact")
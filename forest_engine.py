@@ -0,0 +1,181 @@
+import sys
+import time
+
+import numpy as np
+
+# ==========================================
+# ⚡ FLAT-ARRAY FOREST ENGINE
+# ==========================================
+# The RandomForest is exported into a handful of contiguous node arrays
+# (all trees concatenated, one root offset per tree) and evaluated with
+# plain NumPy: every row walks every tree at once, one tree level per step.
+#
+# Nodes are renumbered breadth-first so both children of a split sit next
+# to each other: next = left[node] + went_right. Leaves point back at
+# themselves with an +inf threshold, so we can simply run max_depth steps
+# without masking rows that already finished.
+#
+# Results are bit-identical to sklearn's predict_proba as long as we follow
+# the same arithmetic: inputs compared as float32 against float64
+# thresholds, NaNs routed by missing_go_to_left, per-tree leaf values
+# summed in tree order and divided by the number of trees at the end.
+
+FLAT_FILE = "cyclone_model.flat.npz"
+CHUNK_ROWS = 4096
+
+
+def _flatten_tree(tree):
+    # Breadth-first renumbering: children of every split get adjacent ids
+    n = tree.node_count
+    order = np.empty(n, dtype=np.int64)
+    new_id = np.empty(n, dtype=np.int64)
+    order[0], new_id[0] = 0, 0
+    head, tail = 0, 1
+    while head < tail:
+        node = order[head]
+        head += 1
+        if tree.children_left[node] != -1:
+            for child in (tree.children_left[node], tree.children_right[node]):
+                order[tail], new_id[child] = child, tail
+                tail += 1
+
+    old_left = tree.children_left[order]
+    leaf = old_left == -1
+    left = np.where(leaf, np.arange(n), new_id[np.maximum(old_left, 0)])
+    feature = np.where(leaf, 0, tree.feature[order])
+    threshold = np.where(leaf, np.inf, tree.threshold[order])
+    missing_left = np.where(leaf, True, tree.missing_go_to_left[order].astype(bool))
+    value = tree.value[order, 0, :]
+    return feature, threshold, left, missing_left, value
+
+
+class FlatForest:
+    def __init__(self, feature, threshold, left, missing_left, value, roots, classes, max_depth, leaf_index=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.missing_left = missing_left
+        self.value = value
+        # Compact forests (forest_artifact.py) keep values for leaves only;
+        # leaf_index maps a node id to its row in `value`
+        self.leaf_index = leaf_index
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_trees = len(roots)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted RandomForestClassifier."""
+        parts = [_flatten_tree(est.tree_) for est in model.estimators_]
+        sizes = [len(p[0]) for p in parts]
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        return cls(
+            feature=np.concatenate([p[0] for p in parts]).astype(np.int32),
+            threshold=np.concatenate([p[1] for p in parts]).astype(np.float64),
+            left=np.concatenate([p[2] + r for p, r in zip(parts, roots)]).astype(np.int32),
+            missing_left=np.concatenate([p[3] for p in parts]),
+            value=np.ascontiguousarray(np.concatenate([p[4] for p in parts]), dtype=np.float64),
+            roots=roots.astype(np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max(est.tree_.max_depth for est in model.estimators_),
+        )
+
+    def save(self, path=FLAT_FILE):
+        extra = {} if self.leaf_index is None else {"leaf_index": self.leaf_index}
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left,
+            missing_left=self.missing_left, value=self.value, roots=self.roots,
+            classes=self.classes_, max_depth=self.max_depth, **extra,
+        )
+
+    @classmethod
+    def load(cls, path=FLAT_FILE):
+        with np.load(path) as f:
+            return cls(**{k: f[k] for k in f.files})
+
+    def apply(self, X):
+        """Leaf index (global) of every row in every tree, shape (n, n_trees)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat_x = X.ravel()
+        row_base = (np.arange(len(X)) * X.shape[1])[:, None]
+        has_nan = np.isnan(flat_x).any()
+
+        idx = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = flat_x.take(row_base + self.feature.take(idx))
+            went_right = x > self.threshold.take(idx)
+            if has_nan:
+                went_right = np.where(np.isnan(x), ~self.missing_left.take(idx), went_right)
+            idx = self.left.take(idx) + went_right
+        return idx
+
+    def tree_proba(self, X):
+        """Class distribution of every tree's leaf, shape (n_trees, n, n_classes)."""
+        leaves = self.apply(X).T
+        if self.leaf_index is not None:
+            leaves = self.leaf_index.take(leaves)
+        return self.value.take(leaves, axis=0)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((len(X), len(self.classes_)), dtype=np.float64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            # Reducing over the tree axis adds the trees one after another,
+            # same order as sklearn
+            out[start:start + len(chunk)] = np.add.reduce(self.tree_proba(chunk), axis=0)
+        out /= self.n_trees
+        return out
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+# ==========================================
+# ⏱️ MICRO-BENCHMARK (sklearn vs flat)
+# ==========================================
+def _best_of(fn, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def benchmark(model, flat, sizes=(1, 1_000, 1_000_000), seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in sizes:
+        X = np.column_stack([
+            rng.uniform(0, 30, n),      # latitude
+            rng.uniform(50, 100, n),    # longitude
+            rng.uniform(900, 1020, n),  # pressure
+        ])
+        repeats = 50 if n <= 1_000 else 1
+        t_sk = _best_of(lambda: model.predict_proba(X), repeats)
+        t_flat = _best_of(lambda: flat.predict_proba(X), repeats)
+        identical = np.array_equal(model.predict_proba(X), flat.predict_proba(X))
+        results.append((n, t_sk, t_flat, identical))
+    return results
+
+
+if __name__ == "__main__":
+    import joblib
+
+    model_file = sys.argv[1] if len(sys.argv) > 1 else "cyclone_model.joblib"
+    model = joblib.load(model_file)
+    # Sum trees in a fixed order so the comparison is deterministic
+    model.set_params(n_jobs=1)
+
+    flat = FlatForest.from_sklearn(model)
+    flat.save(FLAT_FILE)
+    print(f"Exported {flat.n_trees} trees / {len(flat.feature):,} nodes -> {FLAT_FILE}")
+
+    print(f"\n{'rows':>10} {'sklearn':>12} {'flat':>12} {'speedup':>8}  identical")
+    for n, t_sk, t_flat, identical in benchmark(model, flat):
+        print(f"{n:>10,} {t_sk*1e3:>10.3f}ms {t_flat*1e3:>10.3f}ms {t_sk/t_flat:>7.1f}x  {identical}")
@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# ==========================================
+# 🔥 STORM DENSITY HEATMAP (HEADLESS)
+# ==========================================
+# Instead of scattering every track point, points are binned into a
+# lat/lon density grid with np.histogram2d. Grids are cached (memory + .npz
+# on disk) per season range, wind threshold and resolution, and rendered:
+#
+#   * render_png()      static PNG with the bundled coastline (Agg, no
+#                       display, no downloads)
+#   * folium_overlay()  transparent raster layer for the dashboard map
+#
+#   python heatmap_tiles.py --min-season 2000 -o cyclone_heatmap.png
+
+CACHE_DIR = '.heatmap_cache'
+COASTLINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'ni_coastline.geojson')
+EXTENT = (50.0, 100.0, 0.0, 30.0)   # lon min, lon max, lat min, lat max (same view as visualize.py)
+RESOLUTION = 0.25                    # degrees per cell
+MIN_WIND = 17                        # knots: only actual storms
+
+_memo = {}
+_memo_lock = threading.Lock()
+_coastline = None
+
+
+def _store_version(store):
+    from ibtracs_store import read_manifest
+    return read_manifest(store)['version']
+
+
+def density(min_season=None, max_season=None, min_wind=MIN_WIND, resolution=RESOLUTION,
+            extent=EXTENT, store=None, cache_dir=CACHE_DIR):
+    """Track-point counts per cell, shape (n_lat, n_lon), row 0 = southernmost."""
+    from ibtracs_store import STORE_ROOT, ingest, load_seasons
+
+    store = store or STORE_ROOT
+    ingest(store=store)  # picks up a new release, if any
+    key = (min_season, max_season, min_wind, resolution, tuple(extent), _store_version(store))
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+
+    path = os.path.join(cache_dir, hashlib.sha1(repr(key).encode()).hexdigest()[:16] + '.npz')
+    if os.path.exists(path):
+        grid = np.load(path)['counts']
+    else:
+        df = load_seasons(['LATITUDE', 'LONGITUDE', 'WIND_WMO'], min_season=min_season,
+                          max_season=max_season, store=store, path=None)
+        keep = df['WIND_WMO'].to_numpy() >= min_wind if min_wind else np.ones(len(df), bool)
+        w, e, s, n = extent
+        lat_edges = np.linspace(s, n, int(round((n - s) / resolution)) + 1)
+        lon_edges = np.linspace(w, e, int(round((e - w) / resolution)) + 1)
+        grid, _, _ = np.histogram2d(df['LATITUDE'].to_numpy()[keep], df['LONGITUDE'].to_numpy()[keep],
+                                    bins=[lat_edges, lon_edges])
+        grid = grid.astype(np.float32)
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(path + '.tmp.npz', counts=grid)
+        os.replace(path + '.tmp.npz', path)
+
+    with _memo_lock:
+        _memo[key] = grid
+    return grid
+
+
+def colorize(grid, cmap='YlOrRd', sigma=1.5):
+    """RGBA uint8 image (north up) of log-scaled density; empty cells are transparent."""
+    from matplotlib import colormaps
+
+    if sigma:
+        grid = _blur(grid, sigma)
+    scaled = np.log1p(grid)
+    top = scaled.max()
+    norm = scaled / top if top > 0 else scaled
+    rgba = colormaps[cmap](norm, bytes=True)
+    rgba[..., 3] = (255 * np.clip(norm * 1.5, 0, 1)).astype(np.uint8)  # fade out, no hard edge
+    return rgba[::-1]
+
+
+def _blur(grid, sigma):
+    # Separable Gaussian smoothing, so the heatmap doesn't look like pixels
+    radius = max(1, int(3 * sigma))
+    k = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    k /= k.sum()
+    out = np.apply_along_axis(np.convolve, 0, grid, k, mode='same')
+    return np.apply_along_axis(np.convolve, 1, out, k, mode='same')
+
+
+def coastline():
+    """Bundled Natural Earth coastline as a list of (n, 2) lon/lat arrays."""
+    global _coastline
+    if _coastline is None:
+        with open(COASTLINE) as f:
+            geom = json.load(f)['features'][0]['geometry']
+        _coastline = [np.asarray(line) for line in geom['coordinates']]
+    return _coastline
+
+
+def render_png(grid, out, extent=EXTENT, title=None, markers=(), dpi=100, size=(14, 8)):
+    """Write a PNG (path or file object) of the density grid over the coastline."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=size, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_facecolor('#eaf2f8')
+    ax.imshow(colorize(grid), extent=extent, origin='upper', interpolation='bilinear', zorder=1)
+    ax.add_collection(LineCollection(coastline(), colors='#333333', linewidths=0.8, zorder=2))
+    for lon, lat, label in markers:
+        ax.plot(lon, lat, 'k*', markersize=15, zorder=3)
+        ax.text(lon + 0.5, lat - 0.3, label, fontsize=12, fontweight='bold', zorder=3)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.set_xlabel('Longitude')
+    ax.set_ylabel('Latitude')
+    ax.grid(True, linestyle='--', alpha=0.3)
+    if title:
+        ax.set_title(title, fontsize=16, fontweight='bold')
+    # Low zlib effort: encoding dominates the render time otherwise
+    fig.savefig(out, format='png', pil_kwargs={'compress_level': 1})
+
+
+def folium_overlay(grid, extent=EXTENT, name='Storm density', opacity=0.7):
+    """folium raster layer for the density grid (projected to web mercator)."""
+    import folium
+
+    w, e, s, n = extent
+    return folium.raster_layers.ImageOverlay(colorize(grid), bounds=[[s, w], [n, e]], name=name,
+                                             opacity=opacity, mercator_project=True)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Render the NI storm-density heatmap (headless).')
+    ap.add_argument('--min-season', type=int)
+    ap.add_argument('--max-season', type=int)
+    ap.add_argument('--min-wind', type=float, default=MIN_WIND)
+    ap.add_argument('--resolution', type=float, default=RESOLUTION)
+    ap.add_argument('-o', '--out', default='cyclone_heatmap.png')
+    args = ap.parse_args()
+
+    # Imports timed on their own: a long-running server pays them once
+    t = time.perf_counter()
+    import ibtracs_store, matplotlib.figure, matplotlib.backends.backend_agg  # noqa: E401,F401
+    from matplotlib import colormaps  # noqa: F401
+    t_import = time.perf_counter() - t
+
+    t = time.perf_counter()
+    grid = density(args.min_season, args.max_season, args.min_wind, args.resolution)
+    t_grid = time.perf_counter() - t
+    t = time.perf_counter()
+    render_png(grid, args.out, title='North Indian Ocean Storm Density', markers=[(83.3, 17.7, 'Vizag')])
+    t_render = time.perf_counter() - t
+    print(f"✅ {int(grid.sum()):,} points binned in {t_grid * 1e3:.0f} ms, rendered in {t_render * 1e3:.0f} ms "
+          f"(+{t_import * 1e3:.0f} ms imports) -> {args.out}")
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import shutil
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 📦 IBTRACS NI ARCHIVE (SHARED LOADER)
+# ==========================================
+# The release ships as a zip holding one 27 MB CSV. We stream that CSV
+# straight out of the zip exactly once, parse it with proper dtypes and keep
+# every column as a memory-mapped .npy file under CACHE_ROOT/<zip hash>/.
+# Later runs just np.load(..., mmap_mode='r') the columns they need.
+
+ZIP_PATH = 'ibtracs.NI.list.v04r01.zip'
+CSV_NAME = 'ibtracs.NI.list.v04r01.csv'
+CACHE_ROOT = '.ibtracs_cache'
+
+# Raw IBTrACS column -> (name used by our scripts, dtype stored in the cache)
+COLUMNS = {
+    'SID': ('SID', 'U13'),
+    'SEASON': ('SEASON', 'int16'),
+    'NAME': ('NAME', 'U'),
+    'ISO_TIME': ('ISO_TIME', 'datetime64[s]'),
+    'LAT': ('LATITUDE', 'float64'),
+    'LON': ('LONGITUDE', 'float64'),
+    'WMO_WIND': ('WIND_WMO', 'float64'),
+    'WMO_PRES': ('PRES_WMO', 'float64'),
+    'DIST2LAND': ('DIST2LAND', 'float64'),
+    'LANDFALL': ('LANDFALL', 'float64'),
+}
+
+_hash_memo = {}
+
+
+def source_hash(path=ZIP_PATH):
+    """SHA-256 of the release file (memoized per size/mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if key not in _hash_memo:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        _hash_memo[key] = h.hexdigest()
+    return _hash_memo[key]
+
+
+def _find_source(path):
+    # Prefer the zip; fall back to an already-extracted CSV next to it.
+    if os.path.exists(path):
+        return path
+    csv_path = os.path.join(os.path.dirname(path), CSV_NAME)
+    if os.path.exists(csv_path):
+        return csv_path
+    raise FileNotFoundError(path)
+
+
+def _open_csv(path):
+    if not zipfile.is_zipfile(path):
+        return open(path, 'rb')
+    zf = zipfile.ZipFile(path)
+    member = next(n for n in zf.namelist() if n.endswith('.csv'))
+    return zf.open(member)
+
+
+def read_release(path=ZIP_PATH):
+    """Parse a raw IBTrACS release (zip or csv) into a typed DataFrame."""
+    numeric = [src for src, (_, dtype) in COLUMNS.items() if dtype.startswith('float')]
+    with _open_csv(path) as f:
+        raw = pd.read_csv(
+            f,
+            usecols=list(COLUMNS),
+            skiprows=[1],  # second line holds the units
+            keep_default_na=False,
+            na_values=['', ' '],
+            dtype={col: 'float64' if col in numeric else str for col in COLUMNS},
+        )
+
+    df = pd.DataFrame({
+        'SID': raw['SID'].to_numpy(dtype='U13'),
+        'SEASON': raw['SEASON'].astype('int16').to_numpy(),
+        'NAME': raw['NAME'].to_numpy(dtype=str),
+        'ISO_TIME': pd.to_datetime(raw['ISO_TIME'], format='%Y-%m-%d %H:%M:%S')
+                      .to_numpy(dtype='datetime64[s]'),
+    })
+    for src in numeric:
+        df[COLUMNS[src][0]] = raw[src].to_numpy()
+    return df
+
+
+def _write_cache(df, cache_dir, digest):
+    tmp_dir = cache_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    for name, dtype in COLUMNS.values():
+        arr = df[name].to_numpy()
+        if dtype.startswith('U'):
+            arr = arr.astype(str)
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(arr))
+
+    meta = {'source_sha256': digest, 'rows': len(df), 'columns': [v[0] for v in COLUMNS.values()]}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    # Swap in atomically so a crashed build never leaves a half-written cache
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+def cache_dir_for(path=ZIP_PATH, cache_root=CACHE_ROOT):
+    """Return the cache directory for this release, building it if needed."""
+    path = _find_source(path)
+    digest = source_hash(path)
+    cache_dir = os.path.join(cache_root, digest[:16])
+    if not os.path.exists(os.path.join(cache_dir, 'meta.json')):
+        os.makedirs(cache_root, exist_ok=True)
+        _write_cache(read_release(path), cache_dir, digest)
+    return cache_dir
+
+
+def load_columns(columns=None, path=ZIP_PATH, cache_root=CACHE_ROOT):
+    """Dict of read-only memory-mapped column arrays (zero-copy)."""
+    cache_dir = cache_dir_for(path, cache_root)
+    names = columns or [v[0] for v in COLUMNS.values()]
+    return {
+        name: np.load(os.path.join(cache_dir, f'{name}.npy'), mmap_mode='r')
+        for name in names
+    }
+
+
+def load_ibtracs(columns=None, min_season=None, path=ZIP_PATH, cache_root=CACHE_ROOT):
+    """Typed DataFrame of the NI archive, optionally limited to SEASON >= min_season."""
+    names = list(columns or [v[0] for v in COLUMNS.values()])
+    wanted = names if min_season is None or 'SEASON' in names else names + ['SEASON']
+    cols = load_columns(wanted, path, cache_root)
+
+    if min_season is not None:
+        keep = np.flatnonzero(cols['SEASON'] >= min_season)
+        cols = {name: arr[keep] for name, arr in cols.items()}
+
+    return pd.DataFrame({name: cols[name] for name in names}, copy=False)
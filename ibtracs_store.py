@@ -0,0 +1,216 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from ibtracs_data import COLUMNS, ZIP_PATH, _find_source, read_release, source_hash
+
+# ==========================================
+# 🗄️ IBTRACS STORE (INCREMENTAL, PARTITIONED BY SEASON)
+# ==========================================
+# New IBTrACS releases mostly append or revise recent seasons, so instead of
+# re-reading the whole archive every time we keep a store on disk:
+#
+#   ibtracs_store/
+#       manifest.json         storms (SID -> season, fingerprint, rows),
+#                             rows per season, releases already ingested
+#       SEASON=2019/*.npy     one .npy per column (+ _ROWHASH) per season
+#
+# ingest() diffs a release against the manifest storm by storm; only storms
+# whose fingerprint changed are compared row by row (SID + ISO_TIME), and
+# only the seasons holding them are rewritten. Storms missing from a newer
+# release are kept. load_seasons() reads just the partitions that pass the
+# season filter, memory-mapped.
+#
+#   python ibtracs_store.py ibtracs.NI.list.v04r01.zip
+
+STORE_ROOT = 'ibtracs_store'
+MANIFEST = 'manifest.json'
+ROWHASH = '_ROWHASH'
+NAMES = [name for name, _ in COLUMNS.values()]
+DTYPES = {name: ('U1' if dtype == 'U' else dtype) for name, dtype in COLUMNS.values()}
+
+
+def _partition_dir(store, season):
+    return os.path.join(store, f'SEASON={int(season)}')
+
+
+def read_manifest(store=STORE_ROOT):
+    try:
+        with open(os.path.join(store, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'sources': [], 'storms': {}, 'seasons': {}, 'version': ''}
+
+
+def _write_manifest(store, manifest):
+    # Fingerprint of the whole store, for downstream caches to key on
+    blob = json.dumps(manifest['storms'], sort_keys=True).encode()
+    manifest['version'] = hashlib.sha1(blob).hexdigest()[:16]
+    tmp = os.path.join(store, MANIFEST + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(store, MANIFEST))
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df[NAMES], index=False).to_numpy()
+
+
+def _read_partition(store, season, empty):
+    part = _partition_dir(store, season)
+    if not os.path.exists(part):
+        return empty
+    return pd.DataFrame({name: np.load(os.path.join(part, f'{name}.npy'))
+                         for name in NAMES + [ROWHASH]})
+
+
+def _write_partition(store, season, df):
+    part = _partition_dir(store, season)
+    tmp = part + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    if df.empty:
+        shutil.rmtree(part, ignore_errors=True)
+        return
+    os.makedirs(tmp)
+    for name in NAMES + [ROWHASH]:
+        arr = df[name].to_numpy()
+        if arr.dtype == object:
+            arr = arr.astype(str)
+        np.save(os.path.join(tmp, f'{name}.npy'), np.ascontiguousarray(arr))
+    shutil.rmtree(part, ignore_errors=True)
+    os.replace(tmp, part)
+
+
+def _diff_rows(old, new):
+    """(inserted, updated, deleted) row counts for one storm, keyed by ISO_TIME."""
+    old_h = dict(zip(old['ISO_TIME'].to_numpy(), old[ROWHASH].to_numpy()))
+    new_h = dict(zip(new['ISO_TIME'].to_numpy(), new[ROWHASH].to_numpy()))
+    inserted = sum(t not in old_h for t in new_h)
+    deleted = sum(t not in new_h for t in old_h)
+    updated = sum(old_h[t] != h for t, h in new_h.items() if t in old_h)
+    return int(inserted), int(updated), int(deleted)  # numpy bools sum to np.int64
+
+
+def ingest(path=ZIP_PATH, store=STORE_ROOT, force=False):
+    """Upsert the storms of one release into the store; returns what it touched."""
+    t0 = time.perf_counter()
+    path = _find_source(path)
+    digest = source_hash(path)
+    manifest = read_manifest(store)
+    counts = {'storms_new': 0, 'storms_changed': 0, 'storms_unchanged': 0,
+              'rows_inserted': 0, 'rows_updated': 0, 'rows_deleted': 0,
+              'seasons_rewritten': [], 'skipped': False}
+    if digest in manifest['sources'] and not force:
+        counts['skipped'] = True
+        counts['elapsed_s'] = time.perf_counter() - t0
+        return counts
+
+    df = read_release(path).sort_values(['SID', 'ISO_TIME'], kind='stable', ignore_index=True)
+    df[ROWHASH] = _row_hashes(df)
+
+    # Which storms differ from what we hold?
+    changed = {}  # SID -> rows of the new release
+    for sid, rows in df.groupby('SID', sort=False):
+        fp = hashlib.sha1(rows[ROWHASH].to_numpy().tobytes()).hexdigest()[:16]
+        old = manifest['storms'].get(sid)
+        if old is not None and old[1] == fp:
+            counts['storms_unchanged'] += 1
+            continue
+        counts['storms_changed' if old else 'storms_new'] += 1
+        changed[sid] = (rows, fp)
+
+    # Seasons holding a changed storm, before or after the release
+    by_season = {}
+    for sid, (rows, _) in changed.items():
+        by_season.setdefault(int(rows['SEASON'].iloc[0]), []).append(sid)
+        old = manifest['storms'].get(sid)
+        if old is not None:
+            by_season.setdefault(int(old[0]), [])
+
+    os.makedirs(store, exist_ok=True)
+    changed_sids, diffed = set(changed), set()
+    for season in sorted(by_season):
+        stored = _read_partition(store, season, df.iloc[:0])
+        drop = stored['SID'].isin(changed_sids).to_numpy()
+        for sid, old_rows in stored[drop].groupby('SID', sort=False):
+            ins, upd, dele = _diff_rows(old_rows, changed[sid][0])
+            counts['rows_inserted'] += ins
+            counts['rows_updated'] += upd
+            counts['rows_deleted'] += dele
+            diffed.add(sid)
+
+        incoming = [changed[sid][0] for sid in by_season[season]]
+        merged = pd.concat([stored[~drop]] + incoming, ignore_index=True)
+        merged = merged.sort_values(['SID', 'ISO_TIME'], kind='stable', ignore_index=True)
+        _write_partition(store, season, merged)
+        manifest['seasons'][str(season)] = len(merged)
+        if merged.empty:
+            manifest['seasons'].pop(str(season))
+        counts['seasons_rewritten'].append(season)
+
+    for sid, (rows, fp) in changed.items():
+        if sid not in diffed:  # storm not held before: all of its rows are new
+            counts['rows_inserted'] += len(rows)
+        manifest['storms'][sid] = [int(rows['SEASON'].iloc[0]), fp, len(rows)]
+
+    # A forced re-ingest of a release already listed must not list it twice
+    if digest not in manifest['sources']:
+        manifest['sources'].append(digest)
+    _write_manifest(store, manifest)
+    counts['elapsed_s'] = time.perf_counter() - t0
+    return counts
+
+
+def seasons(store=STORE_ROOT):
+    return sorted(int(s) for s in read_manifest(store)['seasons'])
+
+
+def load_seasons(columns=None, min_season=None, max_season=None, store=STORE_ROOT, path=ZIP_PATH):
+    """Typed DataFrame of the seasons in [min_season, max_season].
+
+    Only partitions passing the filter are opened (memory-mapped). `path`
+    is ingested first, which is a no-op once that release is in the store;
+    pass path=None to read the store as it is.
+    """
+    if path is not None:
+        ingest(path, store)
+    names = list(columns or NAMES)
+    wanted = [s for s in seasons(store)
+              if (min_season is None or s >= min_season) and (max_season is None or s <= max_season)]
+
+    parts = {name: [] for name in names}
+    for season in wanted:
+        part = _partition_dir(store, season)
+        for name in names:
+            parts[name].append(np.load(os.path.join(part, f'{name}.npy'), mmap_mode='r'))
+
+    if not wanted:
+        return pd.DataFrame({name: np.empty(0, dtype=DTYPES[name]) for name in names})
+    return pd.DataFrame({name: np.concatenate(parts[name]) for name in names}, copy=False)
+
+
+def print_counts(counts):
+    if counts['skipped']:
+        print("✅ Release already ingested, nothing to do.")
+        return
+    print(f"📥 Storms: {counts['storms_new']} new, {counts['storms_changed']} changed, "
+          f"{counts['storms_unchanged']} unchanged")
+    print(f"   Rows: {counts['rows_inserted']:,} inserted, {counts['rows_updated']:,} updated, "
+          f"{counts['rows_deleted']:,} deleted")
+    print(f"   Seasons rewritten: {len(counts['seasons_rewritten'])} "
+          f"({counts['elapsed_s']:.2f}s)")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Ingest an IBTrACS NI release into the season store.')
+    ap.add_argument('release', nargs='?', default=ZIP_PATH, help='release zip or csv')
+    ap.add_argument('--store', default=STORE_ROOT)
+    ap.add_argument('--force', action='store_true', help='re-diff even if this release was ingested')
+    args = ap.parse_args()
+    print_counts(ingest(args.release, args.store, force=args.force))
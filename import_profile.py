@@ -0,0 +1,145 @@
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================
+# 🚀 IMPORT-TIME / COLD-START PROFILE
+# ==========================================
+# Every entry point's module-level imports are replayed in a fresh
+# interpreter under `python -X importtime`, so the numbers are what a new
+# container pays before it can answer anything:
+#
+#   * import wall time (interpreter start-up itself subtracted)
+#   * the heaviest top-level imports (cumulative, incl. their dependencies)
+#   * which heavy packages got pulled in; the app's start-up path must not
+#     load any of NOT_ON_APP_PATH (they are imported lazily where used)
+#
+# --run-app also times a whole first run of app (1).py through AppTest and
+# lists the heavy packages that run imported on demand.
+#
+#   python import_profile.py                 # all entry points
+#   python import_profile.py app --run-app
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_POINTS = {
+    'app': 'app (1).py',
+    'predictor': 'tempCodeRunnerFile (1).py',
+    'prediction_service': 'prediction_service.py',
+    'batch_predict': 'batch_predict.py',
+    'alerting': 'mass_alert.py',
+}
+HEAVY = ('pandas', 'sklearn', 'scipy', 'joblib', 'folium', 'streamlit_folium', 'twilio',
+         'matplotlib', 'pyarrow', 'requests')
+NOT_ON_APP_PATH = ('pandas', 'sklearn', 'scipy', 'joblib', 'folium', 'streamlit_folium', 'twilio', 'matplotlib')
+
+
+def top_level_imports(path):
+    """Source of the module-level import statements of a script."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def _run(code, importtime=True):
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    t = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - t
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'failed')
+    return wall, proc.stdout, proc.stderr
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cum_us), depth))
+    return rows
+
+
+def profile(code, repeat=3):
+    """Import profile of `code`: best-of wall time minus bare start-up, plus module rows."""
+    baseline = min(_run('pass', importtime=False)[0] for _ in range(repeat))
+    wall = min(_run(code, importtime=False)[0] for _ in range(repeat))
+    # Drop what every interpreter imports anyway (site, encodings, ...)
+    startup = {name for name, *_ in parse_importtime(_run('pass')[2])}
+    rows = [r for r in parse_importtime(_run(code)[2]) if r[0] not in startup]
+    loaded = {name.split('.')[0] for name, *_ in rows}
+    return {'import_s': max(wall - baseline, 0.0), 'startup_s': baseline, 'rows': rows,
+            'heavy': sorted(p for p in HEAVY if p in loaded)}
+
+
+def profile_app_run():
+    """Wall time of a whole first AppTest run, and heavy packages it imported."""
+    code = f"""
+import json, sys, time, logging
+from streamlit.testing.v1 import AppTest
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+before = set(sys.modules)
+t = time.perf_counter()
+at = AppTest.from_file({os.path.join(ROOT, ENTRY_POINTS['app'])!r}, default_timeout=120)
+at.run()
+elapsed = time.perf_counter() - t
+new = {{m.split('.')[0] for m in set(sys.modules) - before}}
+print(json.dumps({{'run_s': elapsed, 'imported': sorted(new), 'exceptions': [e.message for e in at.exception]}}))
+"""
+    _, stdout, _ = _run(code, importtime=False)
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def report(name, result, top=8):
+    print(f"\n🚀 {name}: {result['import_s'] * 1e3:.0f} ms of imports "
+          f"(+{result['startup_s'] * 1e3:.0f} ms interpreter start-up)")
+    direct = sorted((r for r in result['rows'] if r[3] == 0), key=lambda r: -r[2])[:top]
+    for module, _, cum_us, _ in direct:
+        print(f"   {cum_us / 1e3:8.1f} ms  {module}")
+    print(f"   heavy packages loaded: {', '.join(result['heavy']) or 'none'}")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Cold-start import profile of the app and CLIs.')
+    ap.add_argument('targets', nargs='*', help=f"entry points to profile: {', '.join(ENTRY_POINTS)} (default: all)")
+    ap.add_argument('--top', type=int, default=8)
+    ap.add_argument('--run-app', action='store_true', help='also time a full first run of the app')
+    ap.add_argument('--json', help='write the results here')
+    args = ap.parse_args()
+
+    unknown = [t for t in args.targets if t not in ENTRY_POINTS]
+    if unknown:
+        ap.error(f"unknown target(s): {', '.join(unknown)}")
+
+    results, failed = {}, False
+    for name in args.targets or list(ENTRY_POINTS):
+        result = profile(top_level_imports(os.path.join(ROOT, ENTRY_POINTS[name])))
+        report(name, result, args.top)
+        results[name] = {k: v for k, v in result.items() if k != 'rows'}
+        if name == 'app':
+            leaked = [p for p in result['heavy'] if p in NOT_ON_APP_PATH]
+            if leaked:
+                failed = True
+                print(f"   ❌ start-up path imports {', '.join(leaked)}")
+            else:
+                print("   ✅ no pandas / sklearn / folium / twilio before the first prediction")
+
+    if args.run_app:
+        run = profile_app_run()
+        results['app_first_run'] = run
+        lazy = [p for p in HEAVY if p in run['imported']]
+        print(f"\n🌪️ app first run: {run['run_s']:.2f}s, imported on demand: {', '.join(lazy) or 'none'}")
+        if run['exceptions']:
+            failed = True
+            print(f"   ❌ {run['exceptions']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if failed else 0)
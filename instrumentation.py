@@ -0,0 +1,206 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+# ==========================================
+# 📈 HOT-PATH INSTRUMENTATION (OPT-IN)
+# ==========================================
+# Timers and counters for live events: where does a rerun, a training run
+# or an SOS send spend its time? Off unless CYCLONE_METRICS is set:
+#
+#   CYCLONE_METRICS=1              collect in memory (app sidebar, /metrics)
+#   CYCLONE_METRICS=metrics.json   ... and dump JSON at exit
+#   CYCLONE_METRICS=metrics.prom   ... and dump Prometheus text at exit
+#
+#   with span('app.predict'):           # duration histogram per span name
+#       ...
+#   count('sos_failovers', account=0)   # labelled counter
+#
+# When disabled, span() hands back one shared no-op context manager and
+# count() returns straight away, so instrumented code pays a function call.
+
+ENV_VAR = 'CYCLONE_METRICS'
+SPAN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (thread-safe)."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[next((i for i, b in enumerate(self.buckets) if value <= b), len(self.buckets))] += 1
+            self._series[key] = (counts, total + value)
+
+    def series(self):
+        with self._lock:
+            return {k: (list(c), t) for k, (c, t) in self._series.items()}
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self.series().items()):
+            labels = ",".join(f'{k}="{v}"' for k, v in key)
+            sep = "," if labels else ""
+            running = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                running += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{le}"}} {running}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {running}")
+        return "\n".join(lines)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Span:
+    __slots__ = ('name', 'labels', 'start')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        elapsed = time.perf_counter() - self.start
+        labels = dict(self.labels, span=self.name)
+        if exc_type is not None:
+            labels['error'] = exc_type.__name__
+        _spans.observe(elapsed, **labels)
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            _max[key] = max(_max.get(key, 0.0), elapsed)
+        return False
+
+
+_NOOP = _NoopSpan()
+_spans = Histogram('cyclone_span_seconds', 'Time spent in instrumented stages.', SPAN_BUCKETS)
+_counters = {}
+_max = {}
+_lock = threading.Lock()
+_target = os.environ.get(ENV_VAR, '').strip()
+_enabled = _target not in ('', '0', 'false', 'no')
+
+
+def enabled():
+    return _enabled
+
+
+def enable(on=True):
+    """Switch collection on/off at runtime (tests, benchmarks)."""
+    global _enabled
+    _enabled = on
+
+
+def span(name, **labels):
+    """Context manager timing a stage under `name`; a no-op when disabled."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, labels)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        inner.__name__, inner.__doc__, inner.__wrapped__ = fn.__name__, fn.__doc__, fn
+        return inner
+    return wrap
+
+
+def count(name, n=1, **labels):
+    """Add n to the counter `name` (exported as cyclone_<name>_total)."""
+    if not _enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _max.clear()
+    with _spans._lock:
+        _spans._series.clear()
+
+
+# ---------- export ----------
+def snapshot():
+    """JSON-able dict: per-span count / total / mean / max seconds, and counters."""
+    spans = {}
+    for key, (counts, total) in _spans.series().items():
+        labels = dict(key)
+        name = labels.pop('span')
+        label = name + ''.join(f' {k}={v}' for k, v in sorted(labels.items()))
+        n = sum(counts)
+        spans[label] = {'count': n, 'total_s': total, 'mean_s': total / n if n else 0.0,
+                        'max_s': _max.get(key, 0.0)}
+    with _lock:
+        counters = {name + ''.join(f' {k}={v}' for k, v in labels): value
+                    for (name, labels), value in sorted(_counters.items())}
+    return {'spans': dict(sorted(spans.items())), 'counters': counters}
+
+
+def render_prometheus():
+    with _lock:
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        metric = f"cyclone_{name}_total"
+        lines += [f"# TYPE {metric} counter"]
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{metric}{{{text}}} {value}" if text else f"{metric} {value}")
+    return "\n".join(lines + [_spans.render()]) + "\n"
+
+
+def dump(path):
+    """Write the metrics to `path`: JSON for *.json, Prometheus text otherwise."""
+    body = json.dumps(snapshot(), indent=2) if path.endswith('.json') else render_prometheus()
+    with open(path + '.tmp', 'w') as f:
+        f.write(body)
+    os.replace(path + '.tmp', path)
+
+
+def print_summary(title='⏱️ Stage timings'):
+    """Per-span timings for the CLIs (prints nothing when disabled)."""
+    if not _enabled:
+        return
+    snap = snapshot()
+    print(f"\n{title}")
+    for name, s in snap['spans'].items():
+        print(f"   {name:<32} {s['count']:>5}x  total {s['total_s']:8.3f}s  mean {s['mean_s'] * 1e3:9.2f}ms")
+    for name, value in snap['counters'].items():
+        print(f"   {name:<32} {value:>5}")
+
+
+if _enabled and _target not in ('1', 'true', 'yes'):
+    atexit.register(dump, _target)
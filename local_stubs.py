@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# ==========================================
+# 🧪 LOCAL STUB SERVERS
+# ==========================================
+# Small in-process HTTP servers that stand in for external APIs, so the SOS
+# path can be exercised and benchmarked without real credentials, phones
+# or network:
+#
+#   with FakeTwilio(latency=0.2, failing={"AC_PRIMARY"}) as tw:
+#       accounts = [{..., "base_url": tw.url}]
+#
+#   with FakeOpenWeather(latency=0.05) as owm:
+#       provider = WeatherProvider("key", base_url=owm.url)
+
+
+class _StubServer:
+    handler = None
+
+    def __init__(self, host="127.0.0.1", port=0):
+        server = self
+
+        class Handler(self.handler):
+            stub = server
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+            # Headers and body go out as separate writes; with Nagle on, the
+            # body waits ~40 ms for the client's delayed ACK on every request
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 256  # bursts of concurrent clients
+
+        self.httpd = Server((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------- Twilio ----------
+_TWILIO_PATH = re.compile(r"^/2010-04-01/Accounts/(?P<sid>[^/]+)/(?P<kind>Messages|Calls)\.json$")
+
+
+class _TwilioHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.stub
+        m = _TWILIO_PATH.match(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        if not m:
+            return self._reply(404, {"code": 20404, "message": "Not found", "status": 404})
+        sid, kind = m.group("sid"), m.group("kind")
+        if sid in stub.failing:
+            return self._reply(401, {"code": 20003, "message": "Authenticate", "status": 401})
+
+        record = {"account": sid, "kind": kind, "to": form.get("To"), "from": form.get("From"),
+                  "body": form.get("Body") or form.get("Twiml"), "at": time.time()}
+        with stub.lock:
+            stub.requests.append(record)
+
+        prefix = "SM" if kind == "Messages" else "CA"
+        self._reply(201, {"sid": prefix + uuid.uuid4().hex, "account_sid": sid, "status": "queued",
+                          "to": record["to"], "from": record["from"]})
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeTwilio(_StubServer):
+    """Accepts Messages/Calls create requests like api.twilio.com does.
+
+    `failing` is a set of account SIDs that get 401s (to exercise failover);
+    every accepted request is appended to `requests`.
+    """
+    handler = _TwilioHandler
+
+    def __init__(self, latency=0.0, failing=(), **kw):
+        super().__init__(**kw)
+        self.latency = latency
+        self.failing = set(failing)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def sent(self, kind="Messages"):
+        with self.lock:
+            return [r for r in self.requests if r["kind"] == kind]
+
+
+# ---------- OpenWeatherMap ----------
+DEFAULT_CITIES = {
+    "Visakhapatnam": (17.6868, 83.2185, 1008),
+    "Kakinada": (16.9891, 82.2475, 1008),
+    "Machilipatnam": (16.1875, 81.1389, 1009),
+    "Srikakulam": (18.2949, 83.8938, 1008),
+    "Puri": (19.8135, 85.8312, 1007),
+    "Bhubaneswar": (20.2961, 85.8245, 1007),
+    "Chennai": (13.0827, 80.2707, 1010),
+}
+
+
+class _WeatherHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.stub
+        url = urlsplit(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        with stub.lock:
+            stub.requests.append(q)
+        if stub.latency:
+            time.sleep(stub.latency)
+        if stub.fail_next > 0:
+            with stub.lock:
+                stub.fail_next -= 1
+            return self._reply(503, {"cod": 503, "message": "unavailable"})
+        if url.path != "/data/2.5/weather":
+            return self._reply(404, {"cod": "404", "message": "not found"})
+
+        with stub.lock:
+            if "q" in q:
+                match = next(((n, c) for n, c in stub.cities.items() if n.lower() == q["q"].lower()), None)
+            else:
+                lat, lon = float(q.get("lat", 0)), float(q.get("lon", 0))
+                match = min(stub.cities.items(), default=None,
+                            key=lambda item: (item[1][0] - lat) ** 2 + (item[1][1] - lon) ** 2)
+                if match is not None:
+                    match = (match[0], (lat, lon, match[1][2]))
+        if match is None:
+            return self._reply(404, {"cod": "404", "message": "city not found"})
+
+        name, (lat, lon, pres) = match
+        self._reply(200, {"cod": 200, "name": name, "coord": {"lat": lat, "lon": lon},
+                          "main": {"pressure": pres}})
+
+    _reply = _TwilioHandler._reply
+
+
+class FakeOpenWeather(_StubServer):
+    """Answers /data/2.5/weather by city name (q=) or by coordinates.
+
+    Coordinates get the pressure of the nearest known city. set_city()
+    changes a reading on the fly (e.g. to replay a storm); fail_next makes
+    the next N requests return 503.
+    """
+    handler = _WeatherHandler
+
+    def __init__(self, cities=None, latency=0.0, **kw):
+        super().__init__(**kw)
+        self.cities = dict(cities or DEFAULT_CITIES)
+        self.latency = latency
+        self.fail_next = 0
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def set_city(self, name, lat, lon, pres):
+        with self.lock:
+            self.cities[name] = (lat, lon, pres)
@@ -0,0 +1,306 @@
+import argparse
+import csv
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from sos_dispatch import make_client, sms_body, voice_twiml
+
+# ==========================================
+# 📢 MASS ALERTING (BROADCAST ENGINE)
+# ==========================================
+# Alerts every registered resident in the predicted impact zone:
+#
+#   * rosters come from CSV or SQLite (phone, optional name/lat/lon)
+#   * contacts are sharded across the configured Twilio accounts by a
+#     stable hash of the phone number; each account has its own worker
+#     threads and a token bucket so we stay under its send rate
+#   * like trigger_sos, a contact whose account fails is retried on the
+#     other accounts (through their buckets); an account that fails
+#     BREAKER_FAILURES times in a row is skipped for BREAKER_COOLDOWN
+#     seconds, so its shard flows straight to the healthy accounts
+#   * the SMS and the call fail over separately: a call that fails after
+#     its SMS went out is retried on the next account without re-texting
+#   * every send is checkpointed in SQLite before moving on (SMS_SENT when
+#     only the text got through), so a crashed or restarted campaign
+#     resumes without re-alerting anyone and only places the missing calls
+#   * run() returns throughput and latency percentiles
+#
+#   python mass_alert.py roster.csv --campaign hudhud-1 --zone 17.7 83.3 150
+#   python mass_alert.py --bench 2000      # against local_stubs.FakeTwilio
+
+CHECKPOINT_DB = 'broadcast_checkpoint.db'
+ROSTER_TABLES = ('contacts', 'residents')  # SQLite tables a roster may be read from
+BREAKER_FAILURES = 3
+BREAKER_COOLDOWN = 30.0
+EARTH_RADIUS_KM = 6371.0
+
+
+# ---------- rosters ----------
+def load_roster(path, table='contacts'):
+    """List of contact dicts from a CSV file or a SQLite database table."""
+    if path.endswith(('.db', '.sqlite', '.sqlite3')):
+        # Table names can't be bound as parameters: only known names get in
+        if table not in ROSTER_TABLES:
+            raise ValueError(f"unknown roster table {table!r} (expected one of {', '.join(ROSTER_TABLES)})")
+        con = sqlite3.connect(path)
+        con.row_factory = sqlite3.Row
+        try:
+            return [dict(r) for r in con.execute(f'SELECT * FROM "{table}"')]
+        finally:
+            con.close()
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def in_zone(contacts, lat, lon, radius_km):
+    """Contacts within radius_km of (lat, lon); rows without coordinates are kept."""
+    def coord(c, key):
+        try:
+            return float(c.get(key))
+        except (TypeError, ValueError):
+            return np.nan
+
+    clat = np.radians([coord(c, 'lat') for c in contacts])
+    clon = np.radians([coord(c, 'lon') for c in contacts])
+    lat0, lon0 = np.radians(lat), np.radians(lon)
+    a = np.sin((clat - lat0) / 2) ** 2 + np.cos(lat0) * np.cos(clat) * np.sin((clon - lon0) / 2) ** 2
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+    keep = np.isnan(dist) | (dist <= radius_km)
+    return [c for c, k in zip(contacts, keep) if k]
+
+
+def shard_of(phone, n_accounts):
+    return zlib.crc32(phone.encode()) % n_accounts
+
+
+# ---------- rate limiting ----------
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n=1):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# ---------- checkpoint ----------
+class Checkpoint:
+    def __init__(self, path, campaign):
+        self.campaign = campaign
+        self.lock = threading.Lock()
+        self.con = sqlite3.connect(path, check_same_thread=False)
+        self.con.execute('PRAGMA journal_mode=WAL')
+        self.con.execute('PRAGMA synchronous=NORMAL')
+        self.con.execute('''CREATE TABLE IF NOT EXISTS sends (
+            campaign TEXT, phone TEXT, status TEXT, account INTEGER,
+            latency REAL, error TEXT, at REAL, PRIMARY KEY (campaign, phone))''')
+        self.con.commit()
+
+    def sent(self, status='SENT'):
+        """Phones with this status: SENT (done) or SMS_SENT (text delivered, call still owed)."""
+        with self.lock:
+            rows = self.con.execute('SELECT phone FROM sends WHERE campaign=? AND status=?',
+                                    (self.campaign, status))
+            return {r[0] for r in rows}
+
+    def mark(self, phone, status, account, latency, error=''):
+        with self.lock:
+            self.con.execute('INSERT OR REPLACE INTO sends VALUES (?,?,?,?,?,?,?)',
+                             (self.campaign, phone, status, account, latency, error, time.time()))
+            self.con.commit()
+
+    def close(self):
+        with self.lock:
+            self.con.close()
+
+
+# ---------- broadcast ----------
+class Broadcaster:
+    def __init__(self, accounts, rate=1.0, burst=None, workers_per_account=4,
+                 checkpoint_path=CHECKPOINT_DB, voice=True, client_factory=make_client):
+        self.accounts = list(accounts)
+        self.buckets = [TokenBucket(acc.get('rate', rate), burst) for acc in self.accounts]
+        self.workers_per_account = workers_per_account
+        self.checkpoint_path = checkpoint_path
+        self.voice = voice
+        self.clients = [client_factory(acc) for acc in self.accounts]
+        self.failures = [0] * len(self.accounts)
+        self.down_until = [0.0] * len(self.accounts)
+        self.health_lock = threading.Lock()
+
+    def _order(self, shard):
+        # Assigned account first, then the others; tripped accounts go last
+        order = [shard] + [i for i in range(len(self.accounts)) if i != shard]
+        now = time.monotonic()
+        return sorted(order, key=lambda i: self.down_until[i] > now)
+
+    def _record(self, i, ok):
+        with self.health_lock:
+            if ok:
+                self.failures[i] = 0
+                return
+            self.failures[i] += 1
+            if self.failures[i] >= BREAKER_FAILURES:
+                self.down_until[i] = time.monotonic() + BREAKER_COOLDOWN
+
+    def _send(self, phone, shard, text, twiml, sms_sent=False):
+        """(account that finished, error, sms_sent). Only the leg that failed moves
+        to the next account, so a failed call never re-sends the text."""
+        error = ''
+        for i in self._order(shard):
+            acc, client = self.accounts[i], self.clients[i]
+            try:
+                if not sms_sent:
+                    self.buckets[i].acquire()
+                    client.messages.create(body=text, from_=acc['from'], to=phone)
+                    sms_sent = True
+                if self.voice:
+                    self.buckets[i].acquire()
+                    client.calls.create(twiml=twiml, to=phone, from_=acc['from'])
+                self._record(i, True)
+                return i, '', True
+            except Exception as e:
+                self._record(i, False)
+                error = str(e)
+        return None, error, sms_sent
+
+    def run(self, contacts, campaign, location, pressure, label, progress=None):
+        ckpt = Checkpoint(self.checkpoint_path, campaign)
+        done = ckpt.sent()
+        # Texted on an earlier run but the call failed: only the call is retried
+        texted = ckpt.sent('SMS_SENT')
+        phones = list(dict.fromkeys(c['phone'] for c in contacts if c.get('phone')))
+        todo = [p for p in phones if p not in done]
+
+        shards = [queue.Queue() for _ in self.accounts]
+        for p in todo:
+            shards[shard_of(p, len(self.accounts))].put(p)
+
+        text, twiml = sms_body(location, pressure, label), voice_twiml(location)
+        latencies, per_account = [], [0] * len(self.accounts)
+        stats = {'contacts': len(phones), 'skipped': len(phones) - len(todo),
+                 'sent': 0, 'failed': 0, 'sms_only': 0, 'failovers': 0}
+        lock = threading.Lock()
+
+        def worker(shard):
+            q = shards[shard]
+            while True:
+                try:
+                    phone = q.get_nowait()
+                except queue.Empty:
+                    return
+                t = time.perf_counter()
+                account, error, sms_sent = self._send(phone, shard, text, twiml, phone in texted)
+                latency = time.perf_counter() - t
+                status = 'SENT' if account is not None else 'SMS_SENT' if sms_sent else 'FAILED'
+                ckpt.mark(phone, status, account, latency, error)
+                with lock:
+                    latencies.append(latency)
+                    if account is None:
+                        stats['failed'] += 1
+                        stats['sms_only'] += sms_sent
+                    else:
+                        stats['sent'] += 1
+                        per_account[account] += 1
+                        stats['failovers'] += account != shard
+                    if progress:
+                        progress(stats)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,), daemon=True)
+                   for i in range(len(self.accounts)) for _ in range(self.workers_per_account)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        elapsed = time.perf_counter() - start
+        ckpt.close()
+
+        lat_ms = np.array(latencies) * 1e3
+        stats.update({
+            'elapsed_s': elapsed,
+            'throughput_per_s': stats['sent'] / elapsed if elapsed > 0 else 0.0,
+            'per_account': per_account,
+        })
+        for q in (50, 95, 99):
+            stats[f'p{q}_ms'] = float(np.percentile(lat_ms, q)) if len(lat_ms) else 0.0
+        return stats
+
+
+def print_stats(stats):
+    print(f"\n📊 {stats['sent']:,} sent, {stats['failed']:,} failed ({stats['sms_only']:,} texted, call owed), "
+          f"{stats['skipped']:,} already alerted (of {stats['contacts']:,})")
+    print(f"   {stats['elapsed_s']:.2f}s, {stats['throughput_per_s']:.1f} contacts/s, "
+          f"{stats['failovers']} failovers, per account {stats['per_account']}")
+    print(f"   latency p50 {stats['p50_ms']:.1f}ms  p95 {stats['p95_ms']:.1f}ms  p99 {stats['p99_ms']:.1f}ms")
+
+
+def _bench(n, rate, latency):
+    import tempfile
+    from local_stubs import FakeTwilio
+
+    contacts = [{'phone': f'+9190000{i:05d}'} for i in range(n)]
+    with FakeTwilio(latency=latency, failing={'AC_BENCH_1'}) as tw, tempfile.TemporaryDirectory() as tmp:
+        accounts = [{'sid': f'AC_BENCH_{i}', 'token': 'x', 'from': f'+1000000000{i}', 'base_url': tw.url}
+                    for i in range(3)]
+        b = Broadcaster(accounts, rate=rate, burst=rate, workers_per_account=8,
+                        checkpoint_path=os.path.join(tmp, 'bench.db'))
+        print(f"Benchmark: {n:,} contacts, 3 accounts (one failing), {rate}/s per account, "
+              f"{latency*1e3:.0f}ms server latency")
+        print_stats(b.run(contacts, 'bench', 'Visakhapatnam', 960, 'CYCLONE'))
+        # Second run of the same campaign must not send anything again
+        again = b.run(contacts, 'bench', 'Visakhapatnam', 960, 'CYCLONE')
+        print(f"   resume check: {again['sent']} re-sent, {again['skipped']:,} skipped")
+        print(f"   server saw {len(tw.sent()):,} SMS, {len(tw.sent('Calls')):,} calls")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Broadcast cyclone alerts to a contact roster.')
+    ap.add_argument('roster', nargs='?', help='CSV file or SQLite database with a phone column')
+    ap.add_argument('--campaign', help='campaign id used for checkpointing / resume')
+    ap.add_argument('--table', default='contacts', choices=ROSTER_TABLES, help='SQLite table name')
+    ap.add_argument('--zone', nargs=3, type=float, metavar=('LAT', 'LON', 'RADIUS_KM'))
+    ap.add_argument('--location', default='Visakhapatnam')
+    ap.add_argument('--pressure', type=float, default=980)
+    ap.add_argument('--label', default='🔴 CYCLONE')
+    ap.add_argument('--rate', type=float, default=1.0, help='messages per second per account')
+    ap.add_argument('--sms-only', action='store_true')
+    ap.add_argument('--bench', type=int, metavar='N', help='benchmark N contacts against a local fake Twilio')
+    ap.add_argument('--bench-latency', type=float, default=0.05)
+    args = ap.parse_args()
+
+    if args.bench:
+        _bench(args.bench, rate=max(args.rate, 200.0), latency=args.bench_latency)
+        sys.exit(0)
+    if not args.roster or not args.campaign:
+        ap.error('roster and --campaign are required (or use --bench)')
+
+    # Same accounts as the dashboard's SOS button
+    from config import ACCOUNTS
+
+    contacts = load_roster(args.roster, args.table)
+    if args.zone:
+        contacts = in_zone(contacts, *args.zone)
+    print(f"📢 Alerting {len(contacts):,} contacts (campaign '{args.campaign}')...")
+
+    b = Broadcaster(ACCOUNTS, rate=args.rate, voice=not args.sms_only)
+    print_stats(b.run(contacts, args.campaign, args.location, args.pressure, args.label))
@@ -0,0 +1,74 @@
+import os
+import threading
+
+from forest_artifact import load_forest
+
+# ==========================================
+# 🧠 SHARED MODEL SERVER
+# ==========================================
+# One loaded model per process and per file. Streamlit keeps imported modules
+# alive between reruns and sessions, so every rerun/user gets the same warm
+# object instead of unpickling the forest again. The file's mtime is checked
+# on each access and the model is reloaded when it changes (e.g. after
+# model.py retrains it).
+#
+# With flat=True the server hands out a FlatForest, which answers single-row
+# predictions much faster than sklearn. It comes from the compact .forest
+# artifact next to the joblib when that matches the file (no sklearn import,
+# memory-mapped), otherwise the joblib is unpickled and flattened.
+
+MODEL_FILE = "cyclone_model.joblib"
+
+
+class ModelServer:
+    def __init__(self, path=MODEL_FILE, mmap_mode="r", flat=False):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.flat = flat
+        self._lock = threading.Lock()
+        self._model = None
+        self._mtime = None
+        self.reloads = 0
+
+    def get(self):
+        """Return the current model, reloading it if the file changed."""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._load(mtime)
+        return self._model
+
+    def _load(self, mtime):
+        try:
+            if self.flat:
+                model = load_forest(self.path)
+            else:
+                import joblib
+                # Uncompressed joblib dumps memory-map their numpy arrays
+                model = joblib.load(self.path, mmap_mode=self.mmap_mode)
+        except Exception:
+            # File may be mid-write by a retrain; keep serving the old model
+            if self._model is None:
+                raise
+            return
+        self._model = model
+        self._mtime = mtime
+        self.reloads += 1
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def get_server(path=MODEL_FILE, flat=False):
+    key = (os.path.abspath(path), flat)
+    with _servers_lock:
+        if key not in _servers:
+            _servers[key] = ModelServer(path, flat=flat)
+        return _servers[key]
+
+
+def get_model(path=MODEL_FILE, flat=False):
+    """Process-wide shared model for `path` (hot-reloads on mtime change)."""
+    return get_server(path, flat).get()
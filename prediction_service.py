@@ -0,0 +1,345 @@
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+import instrumentation
+from features import GRADE_NAMES
+from instrumentation import Histogram
+from model_server import MODEL_FILE, get_model
+
+# ==========================================
+# 🛰️ HTTP PREDICTION SERVICE (MICRO-BATCHING)
+# ==========================================
+# JSON scoring over plain HTTP for the alerting systems, no Streamlit:
+#
+#   POST /predict   {"lat": 17.7, "lon": 83.3, "pres": 960}
+#                   or {"instances": [[lat, lon, pres], ...]}
+#   GET  /healthz   process is up
+#   GET  /readyz    model loaded and batcher running (503 otherwise)
+#   GET  /metrics   Prometheus text: request latency / batch size histograms
+#
+# Every request thread hands its rows to one batcher thread, which waits at
+# most MAX_WAIT_MS for more to arrive and then scores everything it has in
+# ONE predict_proba call (up to MAX_BATCH rows). It only waits while other
+# requests are still being read, so a lone request is never held back. The
+# model comes from model_server (flat forest, hot-reloaded when the file
+# changes).
+#
+#   python prediction_service.py --port 8080
+#   python prediction_service.py --bench 5000 --concurrency 32
+
+MAX_BATCH = 256
+MAX_WAIT_MS = 2.0
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+# ---------- batching ----------
+class MicroBatcher:
+    def __init__(self, model_path=MODEL_FILE, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, batch_hist=None):
+        self.model_path = model_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.batch_hist = batch_hist
+        self.batches = 0
+        self._active = 0  # requests between arrival and getting their result
+        self._active_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="batcher", daemon=True)
+
+    def start(self):
+        get_model(self.model_path, flat=True)  # load before taking traffic
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def arrived(self):
+        with self._active_lock:
+            self._active += 1
+
+    def done(self):
+        with self._active_lock:
+            self._active -= 1
+
+    def submit(self, rows):
+        """Queue an (n, 3) array; the Future resolves to (classes, probs)."""
+        fut = Future()
+        self._queue.put((rows, fut))
+        return fut
+
+    def _collect(self, first):
+        items, n = [first], len(first[0])
+        deadline = time.monotonic() + self.max_wait
+        while n < self.max_batch and self._active > len(items):
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # stop after this batch
+                break
+            items.append(item)
+            n += len(item[0])
+        return items
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            items = self._collect(first)
+            X = np.concatenate([rows for rows, _ in items])
+            try:
+                model = get_model(self.model_path, flat=True)
+                probs = model.predict_proba(X)
+            except Exception as e:
+                for _, fut in items:
+                    fut.set_exception(e)
+                continue
+            self.batches += 1
+            if self.batch_hist:
+                self.batch_hist.observe(len(X))
+            start = 0
+            for rows, fut in items:
+                fut.set_result((model.classes_, probs[start:start + len(rows)]))
+                start += len(rows)
+
+
+def _parse(payload):
+    """(n, 3) float array from a request body; ValueError if malformed."""
+    if "instances" in payload:
+        rows = [[r["lat"], r["lon"], r["pres"]] if isinstance(r, dict) else r for r in payload["instances"]]
+    else:
+        rows = [[payload["lat"], payload["lon"], payload["pres"]]]
+    X = np.asarray(rows, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != 3 or not len(X) or not np.isfinite(X).all():
+        raise ValueError("expected finite [lat, lon, pres] rows")
+    return X
+
+
+def _result(classes, probs):
+    out = []
+    for p in probs:
+        best = int(np.argmax(p))
+        grade = int(classes[best])
+        out.append({
+            "grade": grade,
+            "grade_name": GRADE_NAMES.get(grade, str(grade)),
+            "confidence": float(p[best]),
+            "probabilities": {GRADE_NAMES.get(int(c), str(c)): float(q) for c, q in zip(classes, p)},
+        })
+    return out
+
+
+# ---------- HTTP ----------
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers + body leave in one segment; otherwise Nagle and delayed ACKs
+    # add ~40 ms to every keep-alive response
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    service = None
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, body, content_type="application/json"):
+        data = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        return code
+
+    def do_GET(self):
+        svc = self.service
+        start = time.perf_counter()
+        if self.path == "/healthz":
+            code = self._reply(200, {"status": "ok"})
+        elif self.path == "/readyz":
+            ready = svc.batcher.alive
+            code = self._reply(200 if ready else 503, {"ready": ready})
+        elif self.path == "/metrics":
+            code = self._reply(200, svc.metrics(), "text/plain; version=0.0.4")
+        else:
+            code = self._reply(404, {"error": "not found"})
+        svc.observe(self.path, code, time.perf_counter() - start)
+
+    def _predict(self, svc):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            X = _parse(payload)
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"bad request: {e}"}
+        try:
+            classes, probs = svc.batcher.submit(X).result(timeout=svc.timeout)
+        except Exception as e:
+            return 503, {"error": str(e)}
+        results = _result(classes, probs)
+        return 200, {"predictions": results} if "instances" in payload else results[0]
+
+    def do_POST(self):
+        svc = self.service
+        start = time.perf_counter()
+        if self.path != "/predict":
+            code = self._reply(404, {"error": "not found"})
+        else:
+            svc.batcher.arrived()
+            try:
+                code, body = self._predict(svc)
+            finally:
+                svc.batcher.done()
+            code = self._reply(code, body)
+        svc.observe(self.path, code, time.perf_counter() - start)
+
+
+class PredictionService:
+    def __init__(self, host="127.0.0.1", port=8080, model_path=MODEL_FILE,
+                 max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, timeout=5.0):
+        self.latency = Histogram("cyclone_request_latency_seconds", "HTTP request latency.", LATENCY_BUCKETS)
+        self.batch_size = Histogram("cyclone_batch_size", "Rows per predict_proba call.", BATCH_BUCKETS)
+        self.requests = {}
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self.batcher = MicroBatcher(model_path, max_batch, max_wait_ms, self.batch_size)
+
+        handler = type("Handler", (_Handler,), {"service": self})
+
+        class Server(ThreadingHTTPServer):
+            request_queue_size = 256
+
+        self.httpd = Server((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def observe(self, path, code, seconds):
+        path = path if path in ("/predict", "/healthz", "/readyz", "/metrics") else "other"
+        self.latency.observe(seconds, path=path)
+        with self._lock:
+            self.requests[(path, code)] = self.requests.get((path, code), 0) + 1
+
+    def metrics(self):
+        with self._lock:
+            reqs = dict(self.requests)
+        lines = ["# HELP cyclone_requests_total HTTP requests by path and status.",
+                 "# TYPE cyclone_requests_total counter"]
+        lines += [f'cyclone_requests_total{{path="{p}",code="{c}"}} {n}' for (p, c), n in sorted(reqs.items())]
+        lines += ["# HELP cyclone_batches_total predict_proba calls.", "# TYPE cyclone_batches_total counter",
+                  f"cyclone_batches_total {self.batcher.batches}"]
+        text = "\n".join(lines + [self.latency.render(), self.batch_size.render()]) + "\n"
+        # Span timings / counters from the rest of the process (CYCLONE_METRICS)
+        return text + instrumentation.render_prometheus() if instrumentation.enabled() else text
+
+    def start(self, background=True):
+        self.batcher.start()
+        if not background:
+            self.httpd.serve_forever()
+            return self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.batcher.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# ---------- load test ----------
+def bench(url, n_requests=5000, concurrency=32):
+    """Single-point POSTs from `concurrency` keep-alive clients; returns stats."""
+    import http.client
+    from urllib.parse import urlsplit
+
+    host, port = urlsplit(url).hostname, urlsplit(url).port
+    rng = np.random.default_rng(0)
+    points = np.column_stack([rng.uniform(5, 25, n_requests), rng.uniform(60, 100, n_requests),
+                              rng.uniform(940, 1015, n_requests)])
+    latencies, errors = [], []
+    lock = threading.Lock()
+    counter = iter(range(n_requests))
+
+    def client():
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        mine = []
+        for i in counter:
+            body = json.dumps({"lat": points[i, 0], "lon": points[i, 1], "pres": points[i, 2]})
+            t = time.perf_counter()
+            conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+            res = conn.getresponse()
+            res.read()
+            mine.append(time.perf_counter() - t)
+            if res.status != 200:
+                errors.append(res.status)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - start
+    lat_ms = np.array(latencies) * 1e3
+    return {"requests": len(latencies), "errors": len(errors), "elapsed_s": elapsed,
+            "qps": len(latencies) / elapsed,
+            **{f"p{q}_ms": float(np.percentile(lat_ms, q)) for q in (50, 95, 99)}}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="HTTP/JSON cyclone grade scoring with micro-batching.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--model", default=MODEL_FILE)
+    ap.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    ap.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    ap.add_argument("--bench", type=int, metavar="N", help="load-test N requests against an in-process server")
+    ap.add_argument("--concurrency", type=int, default=32)
+    args = ap.parse_args()
+
+    import os
+    if not os.path.exists(args.model):
+        print(f"❌ Error: '{args.model}' not found! Run model.py first.")
+        sys.exit(1)
+
+    if args.bench:
+        with PredictionService(args.host, 0, args.model, args.max_batch, args.max_wait_ms) as svc:
+            stats = bench(svc.url, args.bench, args.concurrency)
+            print(f"📊 {stats['requests']:,} requests ({stats['errors']} errors) in {stats['elapsed_s']:.2f}s: "
+                  f"{stats['qps']:,.0f} req/s, {args.concurrency} clients")
+            print(f"   latency p50 {stats['p50_ms']:.1f}ms  p95 {stats['p95_ms']:.1f}ms  p99 {stats['p99_ms']:.1f}ms")
+            print(f"   {svc.batcher.batches:,} predict_proba calls "
+                  f"(avg {stats['requests'] / max(svc.batcher.batches, 1):.1f} rows per batch)")
+        sys.exit(0)
+
+    svc = PredictionService(args.host, args.port, args.model, args.max_batch, args.max_wait_ms)
+    print(f"🛰️ Serving {args.model} on {svc.url} (batch <= {args.max_batch}, wait <= {args.max_wait_ms} ms)")
+    try:
+        svc.start(background=False)
+    except KeyboardInterrupt:
+        svc.stop()
@@ -0,0 +1,211 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+# ==========================================
+# 🧊 PRECOMPUTED RISK-GRADE LOOKUP GRID
+# ==========================================
+# The manual-simulation sliders in the app only cover a fixed box:
+# latitude 0-30, longitude 50-100, pressure 900-1020 hPa. We evaluate the
+# forest once on a regular grid over that box and store the class
+# probabilities (float32) and the grade per cell as memory-mapped .npy
+# files. A slider drag then becomes an O(1) array lookup (nearest cell) or
+# an 8-corner trilinear blend instead of a forest traversal.
+#
+#   python risk_grid.py --step 0.25 0.25 2
+
+MODEL_FILE = "cyclone_model.joblib"
+GRID_DIR = "cyclone_grid"
+
+# (min, max) per feature, same order as the model input [lat, lon, pres]
+DOMAIN = ((0.0, 30.0), (50.0, 100.0), (900.0, 1020.0))
+DEFAULT_STEP = (0.25, 0.25, 2.0)
+
+
+def _axes(domain, step):
+    # The requested step is rounded so the axis ends exactly on the domain
+    # edge; the grid's real spacing is (hi - lo) / (n - 1), so every axis
+    # needs at least 2 points
+    counts = [int(round((hi - lo) / s)) + 1 if s > 0 else 0 for (lo, hi), s in zip(domain, step)]
+    for (lo, hi), s, n in zip(domain, step, counts):
+        if s <= 0 or n < 2:
+            raise ValueError(f"step {s:g} gives {max(n, 0)} point(s) over {lo:g}-{hi:g}; "
+                             f"use a positive step of at most {(hi - lo) / 2:g}")
+    return [np.linspace(lo, hi, n) for (lo, hi), n in zip(domain, counts)]
+
+
+def _model_stamp(model_path):
+    st = os.stat(model_path)
+    return {"model_size": st.st_size, "model_mtime_ns": st.st_mtime_ns}
+
+
+class RiskGrid:
+    def __init__(self, probs, grade, classes, domain, meta=None):
+        self.probs = probs        # (n_lat, n_lon, n_pres, n_classes) float32
+        self.grade = grade        # (n_lat, n_lon, n_pres) class labels
+        self.classes_ = classes
+        self.lo = np.array([d[0] for d in domain])
+        self.hi = np.array([d[1] for d in domain])
+        self.shape = np.array(grade.shape)
+        # Actual cell spacing, taken from the stored grid, not the requested step
+        self.step = (self.hi - self.lo) / (self.shape - 1)
+        self.meta = meta or {}
+
+    # ---------- build ----------
+    @classmethod
+    def build(cls, model, domain=DOMAIN, step=DEFAULT_STEP, batch=200_000):
+        axes = _axes(domain, step)
+        shape = tuple(len(a) for a in axes)
+        probs = np.empty(shape + (len(model.classes_),), dtype=np.float32)
+        flat_probs = probs.reshape(-1, len(model.classes_))
+
+        # Score the grid slab by slab (C order: lat, lon, pres)
+        n = int(np.prod(shape))
+        for start in range(0, n, batch):
+            ids = np.arange(start, min(start + batch, n))
+            i, j, k = np.unravel_index(ids, shape)
+            X = np.column_stack([axes[0][i], axes[1][j], axes[2][k]])
+            flat_probs[start:start + len(ids)] = model.predict_proba(X)
+
+        grade = np.asarray(model.classes_).take(np.argmax(probs, axis=-1))
+        return cls(probs, grade, np.asarray(model.classes_), domain, {"requested_step": [float(s) for s in step]})
+
+    def save(self, path=GRID_DIR, extra_meta=None):
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "probs.npy"), self.probs)
+        np.save(os.path.join(tmp, "grade.npy"), self.grade)
+        meta = dict(self.meta)
+        meta.update(extra_meta or {})
+        meta.update({
+            "classes": self.classes_.tolist(),
+            "domain": [[float(a), float(b)] for a, b in zip(self.lo, self.hi)],
+            "step": self.step.tolist(),
+        })
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+        self.meta = meta
+
+    @classmethod
+    def load(cls, path=GRID_DIR):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(
+            np.load(os.path.join(path, "probs.npy"), mmap_mode="r"),
+            np.load(os.path.join(path, "grade.npy"), mmap_mode="r"),
+            np.asarray(meta["classes"]),
+            meta["domain"], meta,
+        )
+
+    # ---------- queries ----------
+    def _position(self, X):
+        # Fractional cell coordinates, clamped to the grid
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        pos = (X - self.lo) / self.step
+        return np.clip(pos, 0, self.shape - 1)
+
+    def predict_nearest(self, X):
+        i, j, k = np.rint(self._position(X)).astype(np.intp).T
+        return np.asarray(self.grade[i, j, k]), np.asarray(self.probs[i, j, k], dtype=np.float64)
+
+    def predict_proba_trilinear(self, X):
+        pos = self._position(X)
+        base = np.minimum(np.floor(pos).astype(np.intp), self.shape - 2)
+        frac = pos - base
+        out = np.zeros((len(pos), len(self.classes_)))
+        for corner in range(8):
+            offs = np.array([(corner >> 2) & 1, (corner >> 1) & 1, corner & 1])
+            w = np.prod(np.where(offs, frac, 1 - frac), axis=1)
+            i, j, k = (base + offs).T
+            out += w[:, None] * self.probs[i, j, k]
+        return out
+
+    def predict_proba(self, X, method="nearest"):
+        if method == "trilinear":
+            return self.predict_proba_trilinear(X)
+        return self.predict_nearest(X)[1]
+
+    def predict(self, X, method="nearest"):
+        if method == "trilinear":
+            return self.classes_.take(np.argmax(self.predict_proba_trilinear(X), axis=1))
+        return self.predict_nearest(X)[0]
+
+    def covers(self, lat, lon, pres):
+        x = np.array([lat, lon, pres])
+        return bool(np.all((x >= self.lo) & (x <= self.hi)))
+
+    # ---------- accuracy ----------
+    def disagreement(self, model, n=100_000, seed=0):
+        """Compare against the forest at random in-domain points."""
+        rng = np.random.default_rng(seed)
+        X = rng.uniform(self.lo, self.hi, size=(n, 3))
+        ref = model.predict_proba(X)
+        ref_grade = np.asarray(model.classes_).take(np.argmax(ref, axis=1))
+        report = {"samples": n}
+        for method in ("nearest", "trilinear"):
+            p = self.predict_proba(X, method)
+            report[method] = {
+                "grade_mismatch_rate": float(np.mean(self.predict(X, method) != ref_grade)),
+                "max_abs_prob_diff": float(np.max(np.abs(p - ref))),
+            }
+        return report
+
+
+_grid_memo = {}
+
+
+def load_grid(path=GRID_DIR, model_path=MODEL_FILE):
+    """Memoized grid for the app; None if missing or built from another model."""
+    try:
+        meta_mtime = os.stat(os.path.join(path, "meta.json")).st_mtime_ns
+        stamp = _model_stamp(model_path)
+    except OSError:
+        return None
+    key = (os.path.abspath(path), meta_mtime)
+    if key not in _grid_memo:
+        _grid_memo.clear()
+        _grid_memo[key] = RiskGrid.load(path)
+    grid = _grid_memo[key]
+    if any(grid.meta.get(k) != v for k, v in stamp.items()):
+        return None
+    return grid
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build the precomputed risk-grade lookup grid.")
+    ap.add_argument("--model", default=MODEL_FILE)
+    ap.add_argument("--out", default=GRID_DIR)
+    ap.add_argument("--step", nargs=3, type=float, default=DEFAULT_STEP,
+                    metavar=("LAT", "LON", "PRES"), help="grid spacing (deg, deg, hPa)")
+    args = ap.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"❌ Error: '{args.model}' not found! Run model.py first.")
+        sys.exit(1)
+
+    import joblib
+    model = joblib.load(args.model)
+
+    t = time.perf_counter()
+    try:
+        grid = RiskGrid.build(model, step=args.step)
+    except ValueError as e:
+        ap.error(str(e))
+    print(f"Built {'x'.join(map(str, grid.grade.shape))} grid in {time.perf_counter() - t:.1f}s "
+          f"(spacing {', '.join(f'{s:g}' for s in grid.step.round(4))})")
+
+    report = grid.disagreement(model)
+    grid.save(args.out, {**_model_stamp(args.model), "disagreement": report})
+    for method in ("nearest", "trilinear"):
+        r = report[method]
+        print(f"   {method:>9}: grade mismatch {r['grade_mismatch_rate']*100:.2f}%, "
+              f"max |Δp| {r['max_abs_prob_diff']:.3f}")
+    print(f"✅ Saved to {args.out}/")
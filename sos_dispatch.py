@@ -0,0 +1,164 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from instrumentation import count, span
+
+# ==========================================
+# 🆘 SOS DISPATCH (CONCURRENT, WITH FAILOVER)
+# ==========================================
+# Sends the SMS + voice alert to every target concurrently from a thread
+# pool. One Twilio Client is built per account and reused for every send
+# (it keeps its HTTP connection pool). Each target tries the accounts in
+# order, like the old trigger_sos, except that the account that last
+# worked is tried first, so a dead primary costs one failed request and
+# not one per target. Only the leg that failed moves to the next account:
+# a call that fails after its SMS went out never re-sends the SMS.
+# Targets that fail on every account go to a
+# JSON-lines retry queue on disk; retry_pending() drains it at the start
+# of the next SOS (app and alert_monitor).
+#
+# An account dict may carry "base_url" to point the client at a local fake
+# (see local_stubs.FakeTwilio) instead of api.twilio.com.
+
+QUEUE_FILE = "sos_retry_queue.jsonl"
+MAX_WORKERS = 8
+
+
+def sms_body(location, pressure, label):
+    return f"🚨 SOS: Cyclone Risk Detected!\nStatus: {label}\nLocation: {location}\nPressure: {pressure} hPa"
+
+
+def voice_twiml(location):
+    return (f'<Response><Say language="hi-IN">Saavdhan! {location} mein chakravaat ka khatra hai. '
+            f'Kripya surakshit sthaan par jaye.</Say></Response>')
+
+
+def make_client(acc):
+    from twilio.rest import Client  # only needed once an SOS actually fires
+    client = Client(acc["sid"], acc["token"])
+    if acc.get("base_url"):
+        client.api.base_url = acc["base_url"]
+    return client
+
+
+class SOSDispatcher:
+    def __init__(self, accounts, max_workers=MAX_WORKERS, queue_path=QUEUE_FILE,
+                 simulation=False, client_factory=None):
+        self.accounts = list(accounts)
+        self.simulation = simulation
+        self.queue_path = queue_path
+        self._client_factory = client_factory or make_client
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        self._preferred = 0
+        self._queue_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sos")
+
+    # ---------- clients ----------
+    def client(self, i):
+        with self._clients_lock:
+            if i not in self._clients:
+                self._clients[i] = self._client_factory(self.accounts[i])
+            return self._clients[i]
+
+    # ---------- sending ----------
+    def send_one(self, target, location, pressure, label, sms_sent=False):
+        """SMS + call to one target with account failover. Returns a status dict.
+
+        sms_sent=True (a queued target whose SMS already went out) only places the call.
+        """
+        result = {"target": target, "status": "FAILED", "account": None, "error": "", "attempts": 0,
+                  "sms_sent": sms_sent}
+        start = time.perf_counter()
+        if self.simulation:
+            result["status"] = "SIMULATION"
+            count("sos_sends", status="SIMULATION")
+            return result
+
+        first = self._preferred
+        order = [first] + [i for i in range(len(self.accounts)) if i != first]
+        for i in order:
+            acc = self.accounts[i]
+            result["attempts"] += 1
+            try:
+                client = self.client(i)
+                # 1. SMS Alert (English), unless an earlier account already sent it
+                if not result["sms_sent"]:
+                    with span("sos.sms", account=i):
+                        client.messages.create(body=sms_body(location, pressure, label), from_=acc["from"], to=target)
+                    result["sms_sent"] = True
+                # 2. Voice Alert (Hindi)
+                with span("sos.call", account=i):
+                    client.calls.create(twiml=voice_twiml(location), to=target, from_=acc["from"])
+                result.update(status="SUCCESS", account=i, error="")
+                self._preferred = i
+                break
+            except Exception as e:
+                result["error"] = str(e)
+                count("twilio_errors", account=i)
+                if result["attempts"] < len(order):
+                    count("twilio_failovers", from_account=i)
+                continue
+
+        result["elapsed"] = time.perf_counter() - start
+        count("sos_sends", status=result["status"])
+        # Queued here, in the worker, so it doesn't depend on the caller
+        # consuming dispatch() (a Streamlit rerun stops that loop early)
+        if result["status"] == "FAILED":
+            self._enqueue({"target": target, "location": location, "pressure": pressure, "label": label,
+                           "sms_sent": result["sms_sent"], "error": result["error"], "queued_at": time.time()})
+        return result
+
+    def dispatch(self, targets, location, pressure, label):
+        """Fan out to all targets; yields each target's result as it completes."""
+        futures = [self._pool.submit(self.send_one, t, location, pressure, label) for t in targets]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+    # ---------- retry queue ----------
+    def _enqueue(self, item):
+        with self._queue_lock, open(self.queue_path, "a") as f:
+            f.write(json.dumps(item) + "\n")
+
+    def _read_queue(self):
+        if not os.path.exists(self.queue_path):
+            return []
+        with open(self.queue_path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def pending(self):
+        with self._queue_lock:
+            return self._read_queue()
+
+    def retry_pending(self):
+        """Resend everything in the retry queue and wait for it; returns the results.
+
+        Failures are queued again by send_one.
+        """
+        with self._queue_lock:
+            items = self._read_queue()
+            if items:
+                os.remove(self.queue_path)
+        futures = [self._pool.submit(self.send_one, it["target"], it["location"], it["pressure"], it["label"],
+                                     it.get("sms_sent", False))
+                   for it in items]
+        return [fut.result() for fut in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(accounts, simulation=False):
+    """Process-wide dispatcher per account set, so clients are reused across reruns."""
+    key = (tuple((a["sid"], a.get("base_url")) for a in accounts), simulation)
+    with _dispatchers_lock:
+        if key not in _dispatchers:
+            _dispatchers[key] = SOSDispatcher(accounts, simulation=simulation)
+        return _dispatchers[key]
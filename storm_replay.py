@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# ==========================================
+# 🌀 HISTORICAL STORM REPLAY (END-TO-END)
+# ==========================================
+# Feeds a real Bay of Bengal storm from the IBTrACS NI store through the
+# same path the app takes for a live city, with both APIs replaced by
+# local_stubs:
+#
+#   track point -> FakeOpenWeather -> WeatherProvider.by_city()   (weather)
+#               -> model.predict() on the flat forest             (predict)
+#               -> SOSDispatcher.dispatch() -> FakeTwilio         (sos)
+#
+# Every point with a pressure reading is replayed in order, either as fast
+# as possible or at --speed x real time (3600 = one 3-hourly point every
+# 3 s). An SOS goes out the first time the predicted grade reaches STORM
+# and again when it escalates, like a watcher pressing the button.
+# Reported per storm:
+#
+#   * p50 / p95 / max latency per stage, and end to end for alert points
+#   * throughput (points/s over busy time) and SMS/calls actually received
+#   * first-alert lead time against landfall (first point with DIST2LAND 0)
+#   * how often the predicted grade matches the IBTrACS wind grade
+#
+#   python storm_replay.py                          # HUDHUD 2014, MICHAUNG 2023
+#   python storm_replay.py PHAILIN:2013 FANI --speed 3600 --fail-primary
+
+MODEL_FILE = 'cyclone_model.joblib'
+DEFAULT_STORMS = ['HUDHUD:2014', 'MICHAUNG:2023']
+TARGETS = ['+910000000001', '+910000000002']
+MIN_GRADE = 2
+COLUMNS = ['SID', 'SEASON', 'NAME', 'ISO_TIME', 'LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO', 'DIST2LAND']
+
+
+def load_storm(spec):
+    """Track of 'NAME' or 'NAME:YEAR' with a pressure at every point (latest storm if ambiguous)."""
+    from ibtracs_store import load_seasons
+    name, _, year = spec.partition(':')
+    year = int(year) if year else None
+    df = load_seasons(COLUMNS, min_season=year, max_season=year)
+    df = df[df['NAME'] == name.strip().upper()]
+    if df.empty:
+        raise ValueError(f"no storm named {spec!r} in the IBTrACS store")
+    sid = df.sort_values('ISO_TIME')['SID'].iloc[-1]
+    track = df[df['SID'] == sid].dropna(subset=['LATITUDE', 'LONGITUDE', 'PRES_WMO'])
+    return track.sort_values('ISO_TIME', kind='stable', ignore_index=True)
+
+
+def landfall(track):
+    """(time, lat, lon) of the first point on land, or None for storms that stay at sea."""
+    hit = track[track['DIST2LAND'] <= 0]
+    if hit.empty:
+        return None
+    row = hit.iloc[0]
+    return row['ISO_TIME'], row['LATITUDE'], row['LONGITUDE']
+
+
+class ReplayRig:
+    """Local weather + Twilio stubs and the app's provider/dispatcher pointed at them."""
+
+    def __init__(self, weather_latency=0.0, twilio_latency=0.0, fail_primary=False):
+        from local_stubs import FakeOpenWeather, FakeTwilio
+        from sos_dispatch import SOSDispatcher
+        from weather_provider import WeatherProvider
+
+        self.owm = FakeOpenWeather(cities={}, latency=weather_latency).start()
+        self.twilio = FakeTwilio(latency=twilio_latency, failing={'AC_REPLAY_0'} if fail_primary else ()).start()
+        # ttl=0: every track point is a new reading, nothing may come from the cache
+        self.provider = WeatherProvider('replay', base_url=self.owm.url, ttl=0, stale_ttl=0)
+        accounts = [{'sid': f'AC_REPLAY_{i}', 'token': 'x', 'from': f'+1000000000{i}', 'base_url': self.twilio.url}
+                    for i in range(2)]
+        self._tmp = tempfile.mkdtemp(prefix='replay_')
+        self.dispatcher = SOSDispatcher(accounts, queue_path=os.path.join(self._tmp, 'retry.jsonl'))
+
+    def close(self):
+        self.dispatcher.close()
+        self.owm.stop()
+        self.twilio.stop()
+        if os.path.exists(self.dispatcher.queue_path):
+            os.remove(self.dispatcher.queue_path)
+        os.rmdir(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def replay(track, model, rig, targets=TARGETS, speed=0.0, min_grade=MIN_GRADE):
+    """Run one storm through the rig; returns (per-point records, alerts, (SMS, calls) received)."""
+    from features import cyclone_grade
+    from watch_mode import GRADE_LABELS
+
+    city = str(track['NAME'].iloc[0]).title()
+    times = track['ISO_TIME'].to_numpy()
+    points = track[['LATITUDE', 'LONGITUDE', 'PRES_WMO']].to_numpy(dtype=np.float64)
+    wind = track['WIND_WMO'].to_numpy(dtype=np.float64)
+    observed = np.where(np.isnan(wind), -1, cyclone_grade(np.nan_to_num(wind)))
+
+    records, alerts, level = [], [], 0
+    sent_before = len(rig.twilio.sent()), len(rig.twilio.sent('Calls'))
+    clock = time.monotonic()
+    for i, (lat, lon, pres) in enumerate(points):
+        if speed:
+            due = clock + (times[i] - times[0]) / np.timedelta64(1, 's') / speed
+            time.sleep(max(0.0, due - time.monotonic()))
+
+        t0 = time.perf_counter()
+        rig.owm.set_city(city, lat, lon, pres)
+        obs = rig.provider.by_city(city)
+        t1 = time.perf_counter()
+        grade = int(model.predict(np.array([[obs['lat'], obs['lon'], obs['pres']]]))[0])
+        t2 = time.perf_counter()
+        rec = {'time': str(times[i]), 'lat': lat, 'lon': lon, 'pres': pres, 'observed': int(observed[i]),
+               'predicted': grade, 'weather_s': t1 - t0, 'predict_s': t2 - t1}
+        if grade > level and grade >= min_grade:
+            results = list(rig.dispatcher.dispatch(targets, obs['name'], obs['pres'], GRADE_LABELS[grade]))
+            t3 = time.perf_counter()
+            level = grade
+            rec.update(sos_s=t3 - t2, e2e_s=t3 - t0)
+            alerts.append({'time': times[i], 'grade': grade, 'pres': pres,
+                           'delivered': sum(r['status'] == 'SUCCESS' for r in results),
+                           'failovers': sum(r['attempts'] - 1 for r in results)})
+        records.append(rec)
+
+    received = len(rig.twilio.sent()) - sent_before[0], len(rig.twilio.sent('Calls')) - sent_before[1]
+    return records, alerts, received
+
+
+def _pcts(values):
+    if not values:
+        return None
+    v = np.asarray(values) * 1e3
+    return {'p50_ms': float(np.percentile(v, 50)), 'p95_ms': float(np.percentile(v, 95)), 'max_ms': float(v.max())}
+
+
+def summarize(spec, track, records, alerts, received, targets=TARGETS):
+    busy = sum(r['weather_s'] + r['predict_s'] + r.get('sos_s', 0.0) for r in records)
+    known = [r for r in records if r['observed'] >= 0]
+    land = landfall(track)
+    out = {
+        'storm': spec, 'sid': str(track['SID'].iloc[0]), 'points': len(records),
+        'stages': {stage: _pcts([r[f'{stage}_s'] for r in records if f'{stage}_s' in r])
+                   for stage in ('weather', 'predict', 'sos', 'e2e')},
+        'busy_s': busy, 'points_per_s': len(records) / busy if busy else 0.0,
+        'alerts': [{'time': str(a['time']), 'grade': a['grade'], 'pres': a['pres'], 'delivered': a['delivered'],
+                    'failovers': a['failovers']} for a in alerts],
+        'sms_expected': len(alerts) * len(targets), 'sms_received': received[0], 'calls_received': received[1],
+        'grade_match': sum(r['observed'] == r['predicted'] for r in known) / len(known) if known else None,
+        'min_pres': float(track['PRES_WMO'].min()),
+        'landfall': None, 'lead_h': None,
+    }
+    if land:
+        out['landfall'] = {'time': str(land[0]), 'lat': float(land[1]), 'lon': float(land[2])}
+        if alerts:
+            out['lead_h'] = (land[0] - alerts[0]['time']) / np.timedelta64(1, 'h')
+    return out
+
+
+def report(s):
+    print(f"\n🌀 {s['storm']} ({s['sid']}): {s['points']} points, lowest {s['min_pres']:.0f} hPa")
+    for stage, p in s['stages'].items():
+        if p:
+            print(f"   {stage:<8} p50 {p['p50_ms']:8.2f}ms  p95 {p['p95_ms']:8.2f}ms  max {p['max_ms']:8.2f}ms")
+    print(f"   throughput {s['points_per_s']:,.0f} points/s over {s['busy_s'] * 1e3:.0f} ms busy time")
+    for a in s['alerts']:
+        print(f"   🚨 {a['time']}  grade {a['grade']} at {a['pres']:.0f} hPa, "
+              f"delivered {a['delivered']} ({a['failovers']} failovers)")
+    print(f"   Twilio stub got {s['sms_received']} SMS + {s['calls_received']} calls "
+          f"(expected {s['sms_expected']} of each)")
+    if s['grade_match'] is not None:
+        print(f"   predicted grade matches IBTrACS wind grade at {s['grade_match']:.0%} of points")
+    if not s['landfall']:
+        print("   no landfall in the track")
+    elif s['lead_h'] is None:
+        print(f"   ❌ landfall {s['landfall']['time']} with no alert")
+    else:
+        icon = '✅' if s['lead_h'] > 0 else '⚠️'
+        print(f"   {icon} first alert {s['lead_h']:+.0f} h before landfall ({s['landfall']['time']})")
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Replay historical storms through weather -> model -> SOS.')
+    ap.add_argument('storms', nargs='*', default=DEFAULT_STORMS, help='NAME or NAME:YEAR (default: %(default)s)')
+    ap.add_argument('--speed', type=float, default=0.0, help='x real time (0 = as fast as possible)')
+    ap.add_argument('--weather-latency', type=float, default=0.0, help='seconds added per weather request')
+    ap.add_argument('--twilio-latency', type=float, default=0.0, help='seconds added per Twilio request')
+    ap.add_argument('--fail-primary', action='store_true', help='primary Twilio account returns 401s')
+    ap.add_argument('--min-grade', type=int, default=MIN_GRADE)
+    ap.add_argument('--json', help='write the summaries here')
+    args = ap.parse_args()
+
+    if not os.path.exists(MODEL_FILE):
+        print(f"❌ Error: '{MODEL_FILE}' not found! Run model.py first.")
+        sys.exit(1)
+    from model_server import get_model
+    model = get_model(MODEL_FILE, flat=True)
+
+    summaries, failed = [], False
+    with ReplayRig(args.weather_latency, args.twilio_latency, args.fail_primary) as rig:
+        for spec in args.storms:
+            try:
+                track = load_storm(spec)
+            except ValueError as e:
+                print(f"❌ {e}")
+                failed = True
+                continue
+            records, alerts, received = replay(track, model, rig, speed=args.speed, min_grade=args.min_grade)
+            s = summarize(spec, track, records, alerts, received)
+            report(s)
+            summaries.append(s)
+            # Every alert must reach every target, as an SMS and a call
+            failed |= s['sms_received'] != s['sms_expected'] or s['calls_received'] != s['sms_expected'] or \
+                any(a['delivered'] != len(TARGETS) for a in s['alerts'])
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summaries, f, indent=2)
+    sys.exit(1 if failed else 0)
@@ -1,5 +1,3 @@
-import joblib
-import numpy as np
 import os
 
 print("="*60)
@@ -14,8 +12,14 @@ if not os.path.exists(model_filename):
     print("   Run model.py first to train and save the model.")
     exit()
 
+# Imported only once we know there is a model to load
+import numpy as np
+from forest_artifact import load_forest
+
 print("Loading model...", end="")
-model = joblib.load(model_filename)
+# Flat node arrays (from the compact .forest file when it's current, so no
+# sklearn import): same answers as sklearn, far less per-call overhead
+model = load_forest(model_filename)
 print(" Done! ✅")
 
 # 2. Define the Grade Names (Must match your training script)
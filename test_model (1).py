@@ -1,10 +1,8 @@
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.metrics import accuracy_score
 import joblib
 import warnings
+from forest_artifact import artifact_path, export
+from train_pipeline import build_dataset, train
 
 warnings.filterwarnings('ignore')
 
@@ -16,24 +14,14 @@ print("="*80)
 # 1. LOAD IBTRACS DATA (STORM DATA)
 # ============================================================================
 print("\n[1] Loading Cyclone Data...")
-file_path = 'ibtracs.NI.list.v04r01.csv'
+file_path = 'ibtracs.NI.list.v04r01.zip'
 
 try:
-    df = pd.read_csv(
-        file_path, header=None, usecols=[1, 8, 9, 10, 11], 
-        names=['SEASON', 'LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO'], 
-        low_memory=False
-    )
+    # Storm points (>= 17 knots) + 1000 synthetic calm-ocean points, graded.
+    # Cached on disk until the zip (or these options) change.
+    X, y = build_dataset('with-safe', min_season=2000, n_safe=1000, path=file_path)
     
-    # Cleanup
-    for col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce')
-    df = df.dropna()
-    df = df[df['SEASON'] >= 2000]
-    
-    # We keep everything >= 17 knots as "Storm Data"
-    storm_df = df[df['WIND_WMO'] >= 17].copy()
-    
-    print(f"   Storm Records Found: {len(storm_df):,}")
+    print(f"   Storm Records Found: {int(np.sum(y > 0)):,}")
 
 except FileNotFoundError:
     print(f"\n❌ Error: '{file_path}' not found.")
@@ -43,45 +31,19 @@ except FileNotFoundError:
 # 2. GENERATE SYNTHETIC "SAFE" DATA (CRITICAL STEP)
 # ============================================================================
 # The model needs to know what "Normal Weather" looks like to predict "Safe".
-# We create 1000 random points representing calm ocean days.
+# train_pipeline.synthetic_safe adds 1000 seeded random calm ocean days
+# (5-15 kt wind, 1008-1016 hPa) to the storm data above.
 print("\n[2] Generating 'Safe' Weather Patterns...")
-
-safe_data = {
-    'SEASON': np.random.randint(2000, 2024, 1000),
-    'LATITUDE': np.random.uniform(5, 25, 1000),     # Random spots in ocean
-    'LONGITUDE': np.random.uniform(60, 100, 1000),
-    'WIND_WMO': np.random.uniform(5, 15, 1000),     # Low wind (5-15 kt)
-    'PRES_WMO': np.random.uniform(1008, 1016, 1000) # High pressure (Normal)
-}
-safe_df = pd.DataFrame(safe_data)
-
-# Combine Real Storms + Synthetic Safe Data
-final_df = pd.concat([storm_df, safe_df], ignore_index=True)
+print(f"   Safe Records Added: {int(np.sum(y == 0)):,}")
 
 # ============================================================================
 # 3. DEFINE GRADES AND TRAIN
 # ============================================================================
 print("\n[3] Training Model...")
 
-def cyclone_grade(wind):
-    if wind < 17: return 0      # 🟢 SAFE
-    elif wind <= 27: return 1   # 🟡 DEPRESSION
-    elif wind <= 61: return 2   # 🟠 DEEP DEPRESSION/STORM
-    else: return 3              # 🔴 SEVERE CYCLONE
-
-final_df['GRADE'] = final_df['WIND_WMO'].apply(cyclone_grade)
-
-X = final_df[['LATITUDE', 'LONGITUDE', 'PRES_WMO']].values
-y = final_df['GRADE'].values
-
-# Train
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-model = RandomForestClassifier(n_estimators=100, max_depth=12, random_state=42)
-model.fit(X_train, y_train)
-
-# Accuracy
-y_pred = model.predict(X_test)
-print(f"   Accuracy: {accuracy_score(y_test, y_pred)*100:.2f}%")
+model, acc = train(X, y, {'n_estimators': 100, 'max_depth': 12})
+# Random split (optimistic); see python evaluation.py --dataset with-safe
+print(f"   Accuracy: {acc*100:.2f}%")
 
 # Vizag Test Inside Training
 print("\n[4] Sanity Check (Vizag Test):")
@@ -92,9 +54,8 @@ print(f"   Input: 1012 mb -> Prediction: {grade_map[pred]} (Should be SAFE)")
 
 # Save
 joblib.dump(model, 'cyclone_model.joblib')
+export(model, artifact_path('cyclone_model.joblib'), source_path='cyclone_model.joblib')
 print("\n✅ Model Saved! Now run test_model.py")
-import joblib
-import numpy as np
 import os
 
 print("="*60)
@@ -110,8 +71,17 @@ if not os.path.exists(model_filename):
     print("   Please run 'model.py' once to train and save the model.")
     exit()
 
+# Imported only once we know there is a model to load
+import numpy as np
+from forest_artifact import load_forest
+from uncertainty import COORD_SD, PRES_SD, UncertaintyEstimator
+
 print("Loading model...", end="")
-model = joblib.load(model_filename)
+# Flat node arrays (from the compact .forest file when it's current, so no
+# sklearn import): same answers as sklearn, far less per-call overhead
+model = load_forest(model_filename)
+# Re-scores each input under observation noise (one batched call per input)
+uncertainty = UncertaintyEstimator(model)
 print(" Done! ✅")
 
 # 2. Define the Grade Names
@@ -148,8 +118,15 @@ while True:
         # We grab the highest probability in the list to show confidence
         confidence = np.max(all_probs) * 100
         
+        # 3. How much of that survives a small error in the reading / position
+        unc = uncertainty.estimate(lat, lon, pres)
+        
         print(f"\n📢 PREDICTION: {result}")
-        print(f"📊 CONFIDENCE: {confidence:.1f}%")
+        print(f"📊 CONFIDENCE: {confidence:.1f}% ({unc['agreement'] * 100:.0f}% of trees agree)")
+        print(f"🎲 WITH ±{PRES_SD:g} hPa / ±{COORD_SD:g}° OBSERVATION ERROR:")
+        for grade, share in unc['mc_share'].items():
+            lo, hi = unc['mc_interval'][grade]
+            print(f"   {grade:<12} {share * 100:5.1f}% of samples, probability {lo * 100:.0f}-{hi * 100:.0f}%")
 
     except ValueError:
         print("❌ Invalid input! Please enter numbers only.")
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+import track_forecast
+from track_forecast import CHANNELS, HISTORY, LEADS_H, STEP_H, TrackForecaster, encode, encode_targets
+
+HERE = os.path.dirname(os.path.abspath(track_forecast.__file__))
+
+
+def _tiny_model():
+    """A forecaster fitted for a couple of epochs on synthetic straight-line storms."""
+    rng = np.random.default_rng(0)
+    n, length = 64, HISTORY + len(LEADS_H)
+    steps = np.arange(length)[None, :]
+    w = np.empty((n, length, 4), dtype=np.float32)
+    w[:, :, 0] = rng.uniform(8, 20, (n, 1)) + 0.2 * steps
+    w[:, :, 1] = rng.uniform(80, 95, (n, 1)) - 0.1 * steps
+    w[:, :, 2] = rng.uniform(30, 90, (n, 1))
+    w[:, :, 3] = rng.uniform(960, 1000, (n, 1))
+    hist, future = w[:, :HISTORY], w[:, HISTORY:]
+    model = TrackForecaster(hidden=(8,)).fit_stream(encode(hist), encode_targets(hist, future), np.arange(n),
+                                                    epochs=2, batch_size=32)
+    return model, hist
+
+
+def test_save_load_from_another_module(tmp_path):
+    model, hist = _tiny_model()
+    path = str(tmp_path / 'tf.joblib')
+    model.save(path)
+    np.save(tmp_path / 'hist.npy', hist)
+
+    # A fresh interpreter that never ran track_forecast as __main__
+    code = ('import sys, numpy as np; from track_forecast import TrackForecaster; '
+            'm = TrackForecaster.load(sys.argv[1]); np.save(sys.argv[3], m.forecast(np.load(sys.argv[2])))')
+    subprocess.run([sys.executable, '-c', code, path, str(tmp_path / 'hist.npy'), str(tmp_path / 'out.npy')],
+                   cwd=HERE, check=True)
+    np.testing.assert_allclose(np.load(tmp_path / 'out.npy'), model.forecast(hist), rtol=1e-5)
+
+
+def test_load_rejects_other_settings(tmp_path):
+    model, _ = _tiny_model()
+    path = str(tmp_path / 'tf.joblib')
+    model.save(path)
+    blob = joblib.load(path)
+    blob['history'] = HISTORY + 2
+    joblib.dump(blob, path)
+    with pytest.raises(ValueError, match='retrain'):
+        TrackForecaster.load(path)
+
+
+def test_forecast_active_partial_and_empty():
+    model, _ = _tiny_model()
+    times = pd.date_range('2023-05-10', periods=HISTORY + 2, freq=f'{STEP_H}h')
+    df = pd.DataFrame({'SID': 'A', 'ISO_TIME': times, 'LATITUDE': np.linspace(12, 14, len(times)),
+                       'LONGITUDE': np.linspace(88, 87, len(times)), 'WIND_WMO': 50.0, 'PRES_WMO': 980.0})
+    df.loc[df.index[-1], ['WIND_WMO', 'PRES_WMO']] = np.nan  # the latest report has no intensity yet
+
+    fc = model.forecast_active(df)
+    assert len(fc) == len(LEADS_H)
+    assert fc['BASE_TIME'].iloc[0] == times[-2]
+
+    assert model.forecast_active(df.iloc[:HISTORY - 1]).empty
+    df[CHANNELS[2:]] = np.nan
+    assert model.forecast_active(df).empty
@@ -0,0 +1,364 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# ==========================================
+# 🧭 TRACK & INTENSITY FORECASTING (SEQUENCES)
+# ==========================================
+# model.py grades single (lat, lon, pressure) snapshots. This module looks at
+# each storm as a time series instead and forecasts where it will be, and
+# how strong, 6 to 72 h ahead.
+#
+#   * every storm is put on a regular 6-hourly grid (IBTrACS synoptic
+#     times); short wind/pressure gaps are interpolated within the storm
+#   * windows of HISTORY past fixes + every lead are cut out of all storms
+#     at once with sliding_window_view and written to .npy files on disk
+#   * a small MLP (sklearn, CPU) is trained with partial_fit on shuffled
+#     mini-batches read back from those memory-mapped files
+#   * inputs and targets are relative to the latest fix, so the network
+#     learns motion rather than absolute positions
+#
+#   python track_forecast.py                 # build windows, train, evaluate
+#   python track_forecast.py --bench 200     # inference time for 200 storms
+#   python track_forecast.py --active        # forecast the latest season's storms
+
+MODEL_FILE = 'track_forecaster.joblib'
+WINDOW_DIR = os.path.join('.train_cache', 'track_windows')
+STEP_H = 6
+HISTORY = 4                           # fixes fed to the model (now and 18 h back)
+LEADS_H = tuple(range(6, 73, 6))      # 6, 12, ..., 72 h
+MAX_GAP_H = 12                        # interpolate wind/pressure across gaps this short
+CHANNELS = ['LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO']
+
+
+# ---------- series ----------
+def _fill_gaps(values, sid, t_h, max_gap_h=MAX_GAP_H):
+    """Linear interpolation of NaNs between two fixes of the same storm."""
+    n = len(values)
+    valid = ~np.isnan(values)
+    idx = np.arange(n)
+    prev = np.maximum.accumulate(np.where(valid, idx, -1))
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[::-1])[::-1]
+    gap = ~valid & (prev >= 0) & (nxt < n)
+    p, q = prev[gap], nxt[gap]
+    ok = (sid[p] == sid[q]) & (t_h[q] - t_h[p] <= max_gap_h)
+    frac = (t_h[gap] - t_h[p]) / np.maximum(t_h[q] - t_h[p], 1e-9)
+    out = values.copy()
+    rows = np.flatnonzero(gap)[ok]
+    out[rows] = values[p[ok]] + (values[q[ok]] - values[p[ok]]) * frac[ok]
+    return out
+
+
+def regular_series(df):
+    """6-hourly fixes sorted by (SID, ISO_TIME) as (sid codes, hours, values (n, 4))."""
+    df = df.sort_values(['SID', 'ISO_TIME'], kind='stable', ignore_index=True)
+    sid = pd.factorize(df['SID'])[0]
+    t_h = df['ISO_TIME'].to_numpy().astype('datetime64[h]').astype(np.int64)
+    values = np.column_stack([_fill_gaps(df[c].to_numpy(dtype=np.float64), sid, t_h) for c in CHANNELS])
+    keep = t_h % STEP_H == 0
+    return sid[keep], t_h[keep], values[keep], df['SID'].to_numpy()[keep]
+
+
+def _complete(sid, t_h, values, length):
+    """Every window of `length` fixes (n, length, 4) and which of them are complete and gap-free."""
+    if len(sid) < length:
+        return np.empty((0, length, values.shape[1])), np.zeros(0, dtype=bool)
+    w = sliding_window_view(values, length, axis=0).transpose(0, 2, 1)
+    s = sliding_window_view(sid, length)
+    t = sliding_window_view(t_h, length)
+    ok = ((s[:, 0] == s[:, -1]) & (t[:, -1] - t[:, 0] == (length - 1) * STEP_H)
+          & ~np.isnan(w).any(axis=(1, 2)))
+    return w, ok
+
+
+def windows(sid, t_h, values, length):
+    """All complete, gap-free windows of `length` consecutive fixes: (n, length, 4)."""
+    w, ok = _complete(sid, t_h, values, length)
+    return w[ok], sid[:len(ok)][ok]
+
+
+def encode(hist):
+    """Model inputs from (n, HISTORY, 4) histories."""
+    cur = hist[:, -1]
+    return np.column_stack([
+        (hist[:, :-1, :2] - cur[:, None, :2]).reshape(len(hist), -1),  # past displacement
+        hist[:, :, 2:].reshape(len(hist), -1),                          # wind & pressure history
+        cur[:, :2],                                                     # where it is now
+    ]).astype(np.float32)
+
+
+def encode_targets(hist, future):
+    cur = hist[:, -1]
+    return np.column_stack([
+        (future[:, :, :2] - cur[:, None, :2]).reshape(len(hist), -1),
+        future[:, :, 2:].reshape(len(hist), -1),
+    ]).astype(np.float32)
+
+
+def decode(hist, y):
+    """(n, leads, 4) absolute lat, lon, wind, pressure from model outputs."""
+    n, k = len(hist), len(LEADS_H)
+    track = y[:, :2 * k].reshape(n, k, 2) + hist[:, -1, None, :2]
+    return np.concatenate([track, y[:, 2 * k:].reshape(n, k, 2)], axis=2)
+
+
+# ---------- windows on disk ----------
+def build_windows(min_season=1980, out_dir=WINDOW_DIR, store=None):
+    """Write X / Y / storm id arrays for training; reused while the store is unchanged."""
+    from ibtracs_store import STORE_ROOT, ingest, load_seasons, read_manifest
+
+    store = store or STORE_ROOT
+    ingest(store=store)  # picks up a new release, if any
+    key = {'store': read_manifest(store)['version'], 'min_season': min_season,
+           'history': HISTORY, 'leads': list(LEADS_H), 'step_h': STEP_H}
+    meta_path = os.path.join(out_dir, 'meta.json')
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f).get('key') == key:
+                return out_dir
+
+    df = load_seasons(['SID', 'ISO_TIME'] + CHANNELS, min_season=min_season, store=store, path=None)
+    sid, t_h, values, _ = regular_series(df)
+    w, storm = windows(sid, t_h, values, HISTORY + len(LEADS_H))
+    hist, future = w[:, :HISTORY], w[:, HISTORY:]
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, arr in (('X', encode(hist)), ('Y', encode_targets(hist, future)),
+                      ('H', hist.astype(np.float32)), ('storm', storm)):
+        out = np.lib.format.open_memmap(os.path.join(out_dir, f'{name}.npy'), mode='w+',
+                                        dtype=arr.dtype, shape=arr.shape)
+        out[:] = arr
+        out.flush()
+        del out
+    with open(meta_path, 'w') as f:
+        json.dump({'key': key, 'windows': int(len(storm)), 'storms': int(len(np.unique(storm)))}, f, indent=2)
+    return out_dir
+
+
+def load_windows(out_dir=WINDOW_DIR):
+    return {name: np.load(os.path.join(out_dir, f'{name}.npy'), mmap_mode='r')
+            for name in ('X', 'Y', 'H', 'storm')}
+
+
+def iter_batches(rows, batch_size, rng):
+    """Shuffled mini-batches of row indices (sorted, for sequential memmap reads)."""
+    rows = rng.permutation(rows)
+    for start in range(0, len(rows), batch_size):
+        yield np.sort(rows[start:start + batch_size])
+
+
+# ---------- model ----------
+class TrackForecaster:
+    def __init__(self, hidden=(128, 128), learning_rate=1e-3, alpha=1e-4, seed=42):
+        from sklearn.neural_network import MLPRegressor
+        from sklearn.preprocessing import StandardScaler
+
+        self.x_scaler = StandardScaler()
+        self.y_scaler = StandardScaler()
+        self.mlp = MLPRegressor(hidden_layer_sizes=hidden, learning_rate_init=learning_rate,
+                                alpha=alpha, random_state=seed)
+        self.seed = seed
+        self.leads_h = LEADS_H
+        self.history = HISTORY
+
+    def fit_stream(self, X, Y, rows, epochs=60, batch_size=256, progress=None):
+        """Train on X[rows], Y[rows] with mini-batches streamed from (memmapped) arrays."""
+        rng = np.random.default_rng(self.seed)
+        for batch in iter_batches(rows, 4096, rng):
+            self.x_scaler.partial_fit(X[batch])
+            self.y_scaler.partial_fit(Y[batch])
+        for epoch in range(epochs):
+            for batch in iter_batches(rows, batch_size, rng):
+                self.mlp.partial_fit(self.x_scaler.transform(X[batch]), self.y_scaler.transform(Y[batch]))
+            if progress:
+                progress(epoch + 1, self.mlp.loss_)
+        return self
+
+    def predict(self, X):
+        return self.y_scaler.inverse_transform(self.mlp.predict(self.x_scaler.transform(X)))
+
+    def forecast(self, hist):
+        """(n, HISTORY, 4) histories -> (n, leads, 4) lat, lon, wind, pressure."""
+        hist = np.asarray(hist, dtype=np.float32)
+        return decode(hist, self.predict(encode(hist)))
+
+    def forecast_active(self, df):
+        """Forecast every storm in `df` from its latest HISTORY complete regular fixes.
+
+        `df` holds SID, ISO_TIME and the CHANNELS columns (e.g. the current
+        season from ibtracs_store). Recent reports often lack wind/pressure,
+        so a storm is forecast from BASE_TIME, the end of its latest complete
+        window, rather than dropped. Returns one row per storm and lead
+        (empty if no storm has a complete window).
+        """
+        sid, t_h, values, names = regular_series(df)
+        w, ok = _complete(sid, t_h, values, HISTORY)
+        start = np.flatnonzero(ok)
+        latest = np.ones(len(start), dtype=bool)                     # latest complete window per storm
+        latest[:-1] = sid[start[1:]] != sid[start[:-1]]
+        start = start[latest]
+        hist, last = w[start], start + HISTORY - 1
+
+        k = len(self.leads_h)
+        fc = self.forecast(hist) if len(hist) else np.empty((0, k, 4), dtype=np.float32)
+        base = t_h[last].astype('datetime64[h]')
+        return pd.DataFrame({
+            'SID': np.repeat(names[last], k),
+            'BASE_TIME': np.repeat(base, k),
+            'LEAD_H': np.tile(self.leads_h, len(last)),
+            'VALID_TIME': (base[:, None] + np.array(self.leads_h, dtype='timedelta64[h]')).ravel(),
+            'LATITUDE': fc[:, :, 0].ravel(),
+            'LONGITUDE': fc[:, :, 1].ravel(),
+            'WIND_WMO': fc[:, :, 2].ravel(),
+            'PRES_WMO': fc[:, :, 3].ravel(),
+        })
+
+    # Saved as a plain dict of sklearn objects and settings, like
+    # AnalogueIndex: pickling the instance would tie the file to the module
+    # it was trained from (__main__ when run as a script)
+    def save(self, path=MODEL_FILE):
+        import joblib
+        tmp = path + '.tmp'
+        joblib.dump({'x_scaler': self.x_scaler, 'y_scaler': self.y_scaler, 'mlp': self.mlp,
+                     'seed': self.seed, 'leads_h': list(self.leads_h), 'history': self.history}, tmp)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=MODEL_FILE):
+        import joblib
+        blob = joblib.load(path)
+        # encode/decode follow this module's HISTORY and LEADS_H
+        if blob['history'] != HISTORY or tuple(blob['leads_h']) != LEADS_H:
+            raise ValueError(f"{path} was trained with {blob['history']} fixes and leads {blob['leads_h']} h, "
+                             f"this module uses {HISTORY} and {list(LEADS_H)}: retrain it")
+        model = cls(seed=blob['seed'])
+        model.x_scaler, model.y_scaler, model.mlp = blob['x_scaler'], blob['y_scaler'], blob['mlp']
+        model.leads_h, model.history = tuple(blob['leads_h']), blob['history']
+        return model
+
+
+# ---------- evaluation ----------
+def track_error_km(pred, true):
+    lat1, lon1, lat2, lon2 = map(np.radians, (pred[..., 0], pred[..., 1], true[..., 0], true[..., 1]))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * np.arcsin(np.sqrt(a))
+
+
+def persistence(hist):
+    """Baseline: keep the last 6 h motion and the current intensity."""
+    step = hist[:, -1, :2] - hist[:, -2, :2]
+    k = np.arange(1, len(LEADS_H) + 1)[None, :, None]
+    track = hist[:, -1, None, :2] + step[:, None, :] * k
+    inten = np.repeat(hist[:, -1, None, 2:], len(LEADS_H), axis=1)
+    return np.concatenate([track, inten], axis=2)
+
+
+def evaluate(model, data, rows):
+    hist = np.asarray(data['H'][rows])
+    true = decode(hist, np.asarray(data['Y'][rows]))
+    report = {}
+    for name, pred in (('model', model.forecast(hist)), ('persistence', persistence(hist))):
+        report[name] = {
+            'track_km': track_error_km(pred, true).mean(axis=0),
+            'wind_mae': np.abs(pred[..., 2] - true[..., 2]).mean(axis=0),
+            'pres_mae': np.abs(pred[..., 3] - true[..., 3]).mean(axis=0),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"   {'lead':>5} | {'track km':>17} | {'wind kt MAE':>17} | {'pres hPa MAE':>17}")
+    print(f"   {'':>5} | {'model':>8} {'persist':>8} | {'model':>8} {'persist':>8} | {'model':>8} {'persist':>8}")
+    m, p = report['model'], report['persistence']
+    for i, lead in enumerate(LEADS_H):
+        if lead % 12:
+            continue
+        print(f"   {lead:>4}h | {m['track_km'][i]:8.0f} {p['track_km'][i]:8.0f} | "
+              f"{m['wind_mae'][i]:8.1f} {p['wind_mae'][i]:8.1f} | {m['pres_mae'][i]:8.1f} {p['pres_mae'][i]:8.1f}")
+
+
+def bench(model, n_storms=200, repeat=20):
+    """Median time (ms) of one batched forecast over n_storms histories."""
+    rng = np.random.default_rng(0)
+    hist = np.empty((n_storms, HISTORY, 4), dtype=np.float32)
+    hist[:, :, 0] = rng.uniform(8, 22, (n_storms, 1)) + np.arange(HISTORY) * 0.3
+    hist[:, :, 1] = rng.uniform(80, 95, (n_storms, 1)) - np.arange(HISTORY) * 0.2
+    hist[:, :, 2] = rng.uniform(25, 100, (n_storms, 1))
+    hist[:, :, 3] = rng.uniform(950, 1000, (n_storms, 1))
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        model.forecast(hist)
+        times.append(time.perf_counter() - t)
+    return float(np.median(times) * 1e3)
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Train / evaluate the 6-72 h track and intensity forecaster.')
+    ap.add_argument('--min-season', type=int, default=1980)
+    ap.add_argument('--epochs', type=int, default=60)
+    ap.add_argument('--batch-size', type=int, default=256)
+    ap.add_argument('--out', default=MODEL_FILE)
+    ap.add_argument('--bench', type=int, metavar='N', help='only time a batched forecast of N storms')
+    ap.add_argument('--active', type=int, nargs='?', const=0, metavar='SEASON',
+                    help="only forecast every storm of SEASON (default: the latest in the store)")
+    args = ap.parse_args()
+
+    if args.bench or args.active is not None:
+        if not os.path.exists(args.out):
+            print(f"❌ Error: '{args.out}' not found! Run track_forecast.py first.")
+            sys.exit(1)
+        model = TrackForecaster.load(args.out)
+    if args.bench:
+        print(f"⏱️ {args.bench} storms: {bench(model, args.bench):.2f} ms per batch")
+        sys.exit(0)
+    if args.active is not None:
+        from ibtracs_store import load_seasons, seasons
+        season = args.active or max(seasons() or [0])
+        df = load_seasons(['SID', 'NAME', 'ISO_TIME'] + CHANNELS, min_season=season, max_season=season)
+        fc = model.forecast_active(df)
+        names = df.groupby('SID')['NAME'].first()
+        print(f"🧭 {fc['SID'].nunique()} of {df['SID'].nunique()} storms in {season} have "
+              f"{HISTORY} complete fixes to forecast from")
+        for sid, rows in fc[fc['LEAD_H'] % 24 == 0].groupby('SID', sort=False):
+            print(f"\n🌀 {names[sid].title()} ({sid}) from {rows['BASE_TIME'].iloc[0]:%Y-%m-%d %H:%M}")
+            for r in rows.itertuples(index=False):
+                print(f"   +{r.LEAD_H:>2}h  {r.LATITUDE:5.1f}N {r.LONGITUDE:5.1f}E  "
+                      f"{r.WIND_WMO:4.0f} kt  {r.PRES_WMO:5.0f} hPa")
+        sys.exit(0)
+
+    print("[STEP 1] Building storm windows...")
+    t = time.perf_counter()
+    data = load_windows(build_windows(args.min_season))
+    print(f"   {len(data['X']):,} windows from {len(np.unique(data['storm']))} storms "
+          f"({time.perf_counter() - t:.1f}s)")
+
+    # Hold out whole storms, so no test window overlaps a training one
+    storms = np.unique(data['storm'])
+    test_storms = np.random.default_rng(42).choice(storms, size=max(1, len(storms) // 5), replace=False)
+    is_test = np.isin(data['storm'], test_storms)
+    train_rows, test_rows = np.flatnonzero(~is_test), np.flatnonzero(is_test)
+
+    print(f"[STEP 2] Training on {len(train_rows):,} windows ({args.epochs} epochs)...")
+    t = time.perf_counter()
+
+    def progress(epoch, loss):
+        if epoch % 10 == 0 or epoch == args.epochs:
+            print(f"   epoch {epoch:>3}  loss {loss:.4f}")
+
+    model = TrackForecaster().fit_stream(data['X'], data['Y'], train_rows, args.epochs,
+                                         args.batch_size, progress)
+    print(f"   trained in {time.perf_counter() - t:.1f}s")
+
+    print(f"[STEP 3] Held-out storms ({len(test_rows):,} windows):")
+    print_report(evaluate(model, data, test_rows))
+
+    print(f"[STEP 4] Batched inference: {bench(model, 200):.2f} ms for 200 storms")
+    model.save(args.out)
+    print(f"   Saved {args.out}")
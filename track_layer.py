@@ -0,0 +1,199 @@
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from features import cyclone_grade
+from watch_mode import GRADE_COLORS
+
+# ==========================================
+# 🌀 HISTORICAL TRACK LAYER (LEVEL OF DETAIL)
+# ==========================================
+# Past NI storm tracks for the dashboard map, colored by grade. Pushing every
+# track point through st_folium makes the page unusable, so tracks are
+# simplified with Douglas-Peucker at a tolerance of ~1.5 screen pixels for
+# the map's zoom level:
+#
+#   * zoomed out (< SPLIT_ZOOM)  one line per storm, colored by its peak grade
+#   * zoomed in                  each track cut into same-grade pieces
+#
+# Zoom levels are snapped to a few tiers, and the GeoJSON is cached per
+# (filter, tier, store version); genesis points go in a MarkerCluster.
+#
+#   python track_layer.py --min-season 2000          # size per zoom tier
+
+ZOOM_TIERS = (3, 5, 7, 9)
+SPLIT_ZOOM = 7
+TOLERANCE_PX = 1.5
+UNKNOWN_COLOR = "#888888"  # fixes without a WMO wind
+COLUMNS = ["SID", "NAME", "SEASON", "ISO_TIME", "LATITUDE", "LONGITUDE", "WIND_WMO"]
+
+_memo = {}
+_memo_lock = threading.Lock()
+MEMO_SIZE = 32
+
+
+def zoom_tier(zoom):
+    return max([t for t in ZOOM_TIERS if t <= zoom] or [ZOOM_TIERS[0]])
+
+
+def tolerance_deg(zoom):
+    # Web-mercator pixel size at the equator, in degrees
+    return TOLERANCE_PX * 360.0 / (256 * 2 ** zoom)
+
+
+def douglas_peucker(xy, tol):
+    """Boolean mask of the points kept when simplifying polyline `xy` (n, 2)."""
+    n = len(xy)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = xy[b] - xy[a]
+        rel = xy[a + 1:b] - xy[a]
+        length = np.hypot(*seg)
+        if length == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(seg[0] * rel[:, 1] - seg[1] * rel[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tol:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return keep
+
+
+def load_tracks(min_season=None, max_season=None, name=None, store=None):
+    from ibtracs_store import STORE_ROOT, load_seasons
+
+    df = load_seasons(COLUMNS, min_season=min_season, max_season=max_season, store=store or STORE_ROOT)
+    df = df.dropna(subset=["LATITUDE", "LONGITUDE"])
+    if name:
+        df = df[df["NAME"].str.contains(name.strip(), case=False, regex=False)]
+    return df.sort_values(["SID", "ISO_TIME"], kind="stable", ignore_index=True)
+
+
+def _grades(df):
+    # About a third of the fixes (mostly 3-hourly interim ones) have no WMO
+    # wind. They take the grade of the previous fix of the same storm (the
+    # next one at the start of a track), so a track isn't cut into two-point
+    # pieces wherever a reading is missing; storms with no wind at all stay -1
+    by_storm = df.groupby("SID", sort=False)["WIND_WMO"]
+    wind = by_storm.ffill().fillna(by_storm.bfill()).to_numpy(dtype=np.float64)
+    grade = cyclone_grade(np.nan_to_num(wind, nan=0.0)).astype(np.int8)
+    grade[np.isnan(wind)] = -1
+    return grade
+
+
+def tracks_geojson(min_season=None, max_season=None, name=None, zoom=5, store=None):
+    """GeoJSON dict of simplified, grade-colored tracks + genesis points (cached)."""
+    from ibtracs_store import STORE_ROOT, read_manifest
+
+    store = store or STORE_ROOT
+    tier = zoom_tier(zoom)
+    key = (min_season, max_season, (name or "").strip().lower(), tier, read_manifest(store)["version"])
+    with _memo_lock:
+        if key in _memo:
+            return _memo[key]
+
+    df = load_tracks(min_season, max_season, name, store)
+    tol = tolerance_deg(tier)
+    sid = df["SID"].to_numpy()
+    xy = np.column_stack([df["LONGITUDE"].to_numpy(), df["LATITUDE"].to_numpy()])
+    grade = _grades(df)
+    names, seasons, winds = df["NAME"].to_numpy(), df["SEASON"].to_numpy(), df["WIND_WMO"].to_numpy()
+
+    new_storm = np.r_[True, sid[1:] != sid[:-1]]
+    storm_start = np.flatnonzero(new_storm)
+    storm_end = np.r_[storm_start[1:], len(df)]
+    if tier >= SPLIT_ZOOM:
+        # Same-grade runs inside each storm; each run shares the next fix
+        run_starts = np.flatnonzero(new_storm | np.r_[True, grade[1:] != grade[:-1]])
+        end_of_storm = storm_end[np.searchsorted(storm_start, run_starts, side="right") - 1]
+        run_ends = np.minimum(np.r_[run_starts[1:], len(df)] + 1, end_of_storm)
+    else:
+        # Whole storms, colored by peak grade
+        run_starts, run_ends = storm_start, storm_end
+        grade = np.maximum.reduceat(grade, storm_start) if len(df) else grade
+        grade = np.repeat(grade, storm_end - storm_start)
+
+    features, kept = [], 0
+    for a, b in zip(run_starts, run_ends):
+        if b - a < 2:
+            continue
+        piece = xy[a:b]
+        piece = piece[douglas_peucker(piece, tol)]
+        kept += len(piece)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": np.round(piece, 3).tolist()},
+            "properties": {"sid": str(sid[a]), "grade": int(grade[a])},
+        })
+
+    genesis = []
+    for start, end in zip(storm_start, storm_end):
+        peak = np.nanmax(winds[start:end]) if not np.isnan(winds[start:end]).all() else None
+        genesis.append({"sid": str(sid[start]), "name": str(names[start]), "season": int(seasons[start]),
+                        "lat": float(xy[start, 1]), "lon": float(xy[start, 0]),
+                        "peak_wind": None if peak is None else float(peak)})
+
+    result = {"type": "FeatureCollection", "features": features,
+              "genesis": genesis, "points_in": int(len(df)), "points_out": kept, "zoom_tier": tier}
+    with _memo_lock:
+        if len(_memo) >= MEMO_SIZE:
+            _memo.pop(next(iter(_memo)))
+        _memo[key] = result
+    return result
+
+
+def _style(feature):
+    grade = feature["properties"]["grade"]
+    color = GRADE_COLORS[grade] if grade >= 0 else UNKNOWN_COLOR
+    return {"color": color, "weight": 1.5 + grade if grade >= 0 else 1, "opacity": 0.8}
+
+
+def track_layer(min_season=None, max_season=None, name=None, zoom=5, store=None):
+    """folium FeatureGroup with the tracks and clustered genesis markers."""
+    import folium
+    from folium.plugins import MarkerCluster
+
+    data = tracks_geojson(min_season, max_season, name, zoom, store)
+    fg = folium.FeatureGroup(name="Historical tracks")
+    folium.GeoJson({"type": "FeatureCollection", "features": data["features"]}, style_function=_style,
+                   tooltip=folium.GeoJsonTooltip(fields=["sid"], labels=False)).add_to(fg)
+
+    cluster = MarkerCluster(name="Storm genesis").add_to(fg)
+    for g in data["genesis"]:
+        storm = g["name"].title() if g["name"] not in ("UNNAMED", "NOT_NAMED") else "Unnamed"
+        peak = "" if g["peak_wind"] is None else f", peak {g['peak_wind']:.0f} kt"
+        folium.CircleMarker([g["lat"], g["lon"]], radius=4, color="#333333", fill=True,
+                            tooltip=f"{storm} ({g['season']}){peak}").add_to(cluster)
+    return fg
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Simplified NI track GeoJSON per zoom tier.")
+    ap.add_argument("--min-season", type=int)
+    ap.add_argument("--max-season", type=int)
+    ap.add_argument("--name")
+    ap.add_argument("-o", "--out", help="write the GeoJSON for --zoom here")
+    ap.add_argument("--zoom", type=int, default=5)
+    args = ap.parse_args()
+
+    for tier in ZOOM_TIERS:
+        t = time.perf_counter()
+        data = tracks_geojson(args.min_season, args.max_season, args.name, tier)
+        size = len(json.dumps(data))
+        print(f"zoom {tier}: {data['points_in']:,} -> {data['points_out']:,} points, "
+              f"{len(data['features']):,} pieces, {size / 1024:.0f} KB ({(time.perf_counter() - t) * 1e3:.0f} ms)")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(tracks_geojson(args.min_season, args.max_season, args.name, args.zoom), f)
+        print(f"✅ Saved {args.out}")
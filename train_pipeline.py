@@ -0,0 +1,226 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import joblib
+from joblib import Memory, Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterSampler, StratifiedKFold, train_test_split
+
+from features import cyclone_grade
+from forest_artifact import artifact_path, export
+from ibtracs_data import ZIP_PATH
+from instrumentation import print_summary, span
+from ibtracs_store import STORE_ROOT, ingest, load_seasons, read_manifest
+
+warnings.filterwarnings('ignore')
+
+# ==========================================
+# 🏋️ TRAINING PIPELINE (SHARED)
+# ==========================================
+# One place for loading, cleaning, grading and training, used by model.py
+# and test_model.py instead of each carrying its own copy.
+#
+#   * data comes from the season-partitioned store (ibtracs_store.py), so
+#     only seasons >= min_season are read; the dataset stage is memoized on
+#     disk (joblib.Memory), keyed by the store version, so a retrain only
+#     re-reads data when an ingested release changed it
+#   * the hyper-parameter search is random or successive-halving search,
+#     each (candidate, resource, fold) fit runs in a process pool and its
+#     score is written to SEARCH_DIR as soon as it finishes; an interrupted
+#     or repeated search skips everything already on disk
+#
+#   python train_pipeline.py --dataset with-safe --search halving --n-iter 27
+
+MODEL_FILE = 'cyclone_model.joblib'
+CACHE_DIR = '.train_cache'
+SEARCH_DIR = os.path.join(CACHE_DIR, 'search')
+FEATURES = ['LATITUDE', 'LONGITUDE', 'PRES_WMO']
+
+SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [8, 10, 12, 16, None],
+    'min_samples_split': [2, 5, 10],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', None],
+}
+
+memory = Memory(os.path.join(CACHE_DIR, 'joblib'), verbose=0)
+
+
+def synthetic_safe(n=1000, seed=42):
+    # Calm-ocean points so the model learns what "SAFE" looks like
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'SEASON': rng.integers(2000, 2024, n),
+        'LATITUDE': rng.uniform(5, 25, n),
+        'LONGITUDE': rng.uniform(60, 100, n),
+        'WIND_WMO': rng.uniform(5, 15, n),
+        'PRES_WMO': rng.uniform(1008, 1016, n),
+    })
+
+
+@memory.cache
+def _build_dataset(kind, min_season, n_safe, seed, store_version, store):
+    df = load_seasons(['SEASON', 'LATITUDE', 'LONGITUDE', 'WIND_WMO', 'PRES_WMO'],
+                      min_season=min_season, store=store, path=None).dropna()
+
+    if kind == 'storms':
+        df = df[df['WIND_WMO'].between(17, 200)]
+    elif kind == 'with-safe':
+        df = pd.concat([df[df['WIND_WMO'] >= 17], synthetic_safe(n_safe, seed)], ignore_index=True)
+    else:
+        raise ValueError(f"unknown dataset kind: {kind}")
+
+    return df[FEATURES].to_numpy(), cyclone_grade(df['WIND_WMO'].to_numpy())
+
+
+def build_dataset(kind='storms', min_season=2000, n_safe=1000, seed=42, path=ZIP_PATH, store=STORE_ROOT):
+    """(X, y) for training; cached on disk per dataset options and store version.
+
+    kind='storms'    -> IBTrACS points with 17-200 kt winds (model.py)
+    kind='with-safe' -> storm points plus synthetic calm points (test_model.py)
+    """
+    with span('train.ingest'):
+        ingest(path, store)  # no-op once this release is in the store
+    with span('train.dataset', kind=kind):
+        return _build_dataset(kind, min_season, n_safe, seed, read_manifest(store)['version'], store)
+
+
+# ==========================================
+# 🔎 RESUMABLE SEARCH
+# ==========================================
+def _task_key(params, n_samples, fold, context):
+    blob = json.dumps([params, n_samples, fold, context], sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+
+def _fit_fold(X, y, train_idx, val_idx, params, seed):
+    model = RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    t = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - t
+    return {'score': accuracy_score(y[val_idx], model.predict(X[val_idx])), 'fit_time': fit_time}
+
+
+def _run_round(X, y, candidates, n_samples, folds, context, n_jobs, seed, search_dir):
+    # Candidate subsample = first n_samples rows of every fold's (shuffled) train part
+    pending, results = [], {}
+    for ci, params in enumerate(candidates):
+        for fi, (train_idx, val_idx) in enumerate(folds):
+            key = _task_key(params, n_samples, fi, context)
+            path = os.path.join(search_dir, f'{key}.json')
+            if os.path.exists(path):
+                with open(path) as f:
+                    results[(ci, fi)] = json.load(f)
+            else:
+                pending.append((ci, fi, path, train_idx[:n_samples], val_idx))
+
+    if pending:
+        done = Parallel(n_jobs=n_jobs, backend='loky', return_as='generator')(
+            delayed(_fit_fold)(X, y, tr, va, candidates[ci], seed) for ci, fi, _, tr, va in pending
+        )
+        for (ci, fi, path, _, _), res in zip(pending, done):
+            res.update({'params': candidates[ci], 'n_samples': n_samples, 'fold': fi})
+            with open(path + '.tmp', 'w') as f:
+                json.dump(res, f)
+            os.replace(path + '.tmp', path)
+            results[(ci, fi)] = res
+
+    scores = np.array([[results[(ci, fi)]['score'] for fi in range(len(folds))]
+                       for ci in range(len(candidates))])
+    return scores.mean(axis=1), len(candidates) * len(folds) - len(pending)
+
+
+def search(X, y, strategy='halving', n_iter=27, cv=3, eta=3, min_samples=500,
+           space=SEARCH_SPACE, n_jobs=-1, seed=42, search_dir=SEARCH_DIR, log=print):
+    """Random or successive-halving search. Returns (best_params, leaderboard)."""
+    os.makedirs(search_dir, exist_ok=True)
+    candidates = list(ParameterSampler(space, n_iter, random_state=seed))
+    perm = np.random.default_rng(seed).permutation(len(X))
+    folds = [(perm[tr], perm[va]) for tr, va in
+             StratifiedKFold(cv, shuffle=True, random_state=seed).split(X[perm], y[perm])]
+    fold_size = min(len(tr) for tr, _ in folds)
+    # Results are only reusable for the same data, folds and seed
+    context = [hashlib.sha1(X.tobytes() + y.tobytes()).hexdigest(), cv, seed]
+
+    if strategy == 'random':
+        schedule = [fold_size]
+    else:
+        rounds = max(1, int(np.floor(np.log(len(candidates)) / np.log(eta))) + 1)
+        # Like sklearn's 'exhaust': the last round uses every training row
+        schedule = [max(min(min_samples, fold_size), fold_size // eta ** (rounds - 1 - r))
+                    for r in range(rounds)]
+
+    alive = list(range(len(candidates)))
+    leaderboard = []
+    for r, n_samples in enumerate(schedule):
+        t = time.perf_counter()
+        with span('train.search_round', round=r + 1):
+            means, reused = _run_round(X, y, [candidates[i] for i in alive], n_samples,
+                                       folds, context, n_jobs, seed, search_dir)
+        log(f"   round {r + 1}/{len(schedule)}: {len(alive)} candidates x {cv} folds on "
+            f"{n_samples:,} rows ({reused} cached) in {time.perf_counter() - t:.1f}s")
+        order = np.argsort(-means, kind='stable')
+        leaderboard = [(float(means[i]), candidates[alive[i]]) for i in order]
+        keep = max(1, len(alive) // eta) if r < len(schedule) - 1 else 1
+        alive = [alive[i] for i in order[:keep]]
+
+    return candidates[alive[0]], leaderboard
+
+
+def train(X, y, params, seed=42, test_size=0.2):
+    """Fit the final forest on a stratified split; returns (model, test accuracy)."""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=seed, stratify=y
+    )
+    model = RandomForestClassifier(random_state=seed, n_jobs=-1, **params)
+    with span('train.fit'):
+        model.fit(X_train, y_train)
+    with span('train.evaluate'):
+        acc = accuracy_score(y_test, model.predict(X_test))
+    return model, acc
+
+
+if __name__ == '__main__':
+    ap = argparse.ArgumentParser(description='Search hyper-parameters and train the cyclone forest.')
+    ap.add_argument('--dataset', choices=['storms', 'with-safe'], default='storms')
+    ap.add_argument('--search', choices=['halving', 'random'], default='halving')
+    ap.add_argument('--n-iter', type=int, default=27)
+    ap.add_argument('--cv', type=int, default=3)
+    ap.add_argument('--jobs', type=int, default=-1)
+    ap.add_argument('--min-season', type=int, default=2000)
+    ap.add_argument('--out', default=MODEL_FILE)
+    args = ap.parse_args()
+
+    print("=" * 80)
+    print("NORTH INDIAN OCEAN CYCLONE MODEL - TRAINING PIPELINE")
+    print("=" * 80)
+
+    t = time.perf_counter()
+    X, y = build_dataset(args.dataset, args.min_season)
+    print(f"\n[1] Dataset '{args.dataset}': {len(X):,} rows ({time.perf_counter() - t:.2f}s)")
+
+    print(f"\n[2] {args.search.title()} search over {args.n_iter} candidates...")
+    X_search, _, y_search, _ = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    best, leaderboard = search(X_search, y_search, args.search, args.n_iter, args.cv, n_jobs=args.jobs)
+    for score, params in leaderboard[:5]:
+        print(f"   {score*100:.2f}%  {params}")
+
+    print("\n[3] Training final model...")
+    model, acc = train(X, y, best)
+    print(f"   Best params: {best}")
+    print(f"   Accuracy: {acc*100:.2f}%")
+
+    with span('train.save'):
+        joblib.dump(model, args.out)
+    with span('train.export'):
+        export(model, artifact_path(args.out), source_path=args.out)
+    print(f"\n✅ Model Saved to {args.out} (+ {artifact_path(args.out)})")
+    print_summary()
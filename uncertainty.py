@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from features import GRADE_NAMES
+
+# ==========================================
+# 🎲 PREDICTION UNCERTAINTY (MONTE CARLO + TREE VOTES)
+# ==========================================
+# max(predict_proba) says how sure the forest is about ONE exact input, but
+# station pressure and a storm's position are only known to a few hPa / a
+# tenth of a degree. For every point we report:
+#
+#   * Monte Carlo: N perturbed copies of the input (gaussian noise on
+#     lat/lon and pressure) scored in ONE batched forest call; the share of
+#     samples landing in each grade, and a lo-hi interval of each grade's
+#     probability across the samples
+#   * tree votes: how the individual trees split on the unperturbed input
+#     (vote share per grade, spread of the per-tree probabilities), read
+#     straight from the flat forest's per-tree leaf values
+#
+# The noise is drawn once per estimator and reused for every point (common
+# random numbers), so results are deterministic and move smoothly with the
+# input. Results are cached in an LRU keyed on inputs rounded to
+# COORD_DECIMALS / PRES_DECIMALS, so dashboard reruns are dictionary hits.
+#
+#   python uncertainty.py 17.7 83.3 985
+#   python uncertainty.py 17.7 83.3 985 --samples 5000 --pres-sd 3 --coord-sd 0.25
+
+N_SAMPLES = 2000
+PRES_SD = 2.0          # hPa, typical station/analysis pressure error
+COORD_SD = 0.1         # degrees (~11 km) of position error
+INTERVAL = (5, 95)     # percentiles of the per-sample grade probability
+COORD_DECIMALS = 2
+PRES_DECIMALS = 1
+
+
+class UncertaintyEstimator:
+    def __init__(self, model, n_samples=N_SAMPLES, pres_sd=PRES_SD, coord_sd=COORD_SD,
+                 interval=INTERVAL, seed=0, maxsize=1024):
+        if n_samples < 1:
+            raise ValueError(f"n_samples must be >= 1, got {n_samples}")
+        self.model = model
+        self.n_samples = n_samples
+        self.interval = interval
+        self.classes = np.asarray(model.classes_)
+        # One (n_samples, 3) noise block, shared by every point
+        sd = np.array([coord_sd, coord_sd, pres_sd])
+        self.noise = np.random.default_rng(seed).standard_normal((n_samples, 3)) * sd
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def key(lat, lon, pres):
+        return round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS), round(float(pres), PRES_DECIMALS)
+
+    def estimate(self, lat, lon, pres):
+        return self.estimate_many([(lat, lon, pres)])[0]
+
+    def estimate_many(self, points):
+        """One result dict per (lat, lon, pres); cache misses are scored in one batch."""
+        keys = [self.key(*p) for p in points]
+        results, missing = {}, []
+        with self._lock:
+            for k in keys:
+                if k in self._cache:
+                    self._cache.move_to_end(k)
+                    results[k] = self._cache[k]
+                    self.stats['hits'] += 1
+                elif k not in results:
+                    results[k] = None
+                    missing.append(k)
+                    self.stats['misses'] += 1
+        if missing:
+            for k, r in zip(missing, self._compute(np.array(missing, dtype=np.float64))):
+                results[k] = r
+            with self._lock:
+                for k in missing:
+                    self._cache[k] = results[k]
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return [results[k] for k in keys]
+
+    def _compute(self, X):
+        n, k = len(X), len(self.classes)
+        # Monte Carlo: (n * n_samples, 3) rows, one forest call
+        samples = (X[:, None, :] + self.noise[None, :, :]).reshape(-1, 3)
+        probs = self.model.predict_proba(samples).reshape(n, self.n_samples, k)
+        share = np.stack([(probs.argmax(axis=2) == c).mean(axis=1) for c in range(k)], axis=1)
+        lo, hi = np.percentile(probs, self.interval, axis=1)
+
+        # Tree votes on the unperturbed inputs: (n_trees, n, k)
+        per_tree = _tree_proba(self.model, X)
+        point = per_tree.mean(axis=0)
+        votes = np.stack([(per_tree.argmax(axis=2) == c).mean(axis=0) for c in range(k)], axis=1)
+        spread = per_tree.std(axis=0)
+
+        out = []
+        for i in range(n):
+            best = int(point[i].argmax())
+            out.append({
+                'grade': int(self.classes[best]), 'confidence': float(point[i, best]),
+                'proba': dict(zip(self._labels(), point[i].round(4).tolist())),
+                'mc_share': dict(zip(self._labels(), share[i].round(4).tolist())),
+                'mc_interval': {g: (float(a), float(b)) for g, a, b in zip(self._labels(), lo[i], hi[i])},
+                'tree_votes': dict(zip(self._labels(), votes[i].round(4).tolist())),
+                'tree_std': dict(zip(self._labels(), spread[i].round(4).tolist())),
+                'agreement': float(votes[i].max()),
+            })
+        return out
+
+    def _labels(self):
+        return [GRADE_NAMES.get(int(c), str(c)) for c in self.classes]
+
+
+def _tree_proba(model, X):
+    # FlatForest exposes its per-tree leaf values directly; a fitted sklearn
+    # forest goes tree by tree through estimators_
+    if hasattr(model, 'tree_proba'):
+        return model.tree_proba(X)
+    return np.stack([est.predict_proba(X) for est in model.estimators_])
+
+
+_estimators = {}
+_estimators_lock = threading.Lock()
+
+
+def get_estimator(model, **kw):
+    """Process-wide estimator (and cache) per settings, rebuilt when the model is reloaded."""
+    # One slot per settings: a hot-reloaded model replaces the old estimator,
+    # so the previous forest and its cache can be freed
+    key = tuple(sorted(kw.items()))
+    with _estimators_lock:
+        est = _estimators.get(key)
+        if est is None or est.model is not model:
+            est = _estimators[key] = UncertaintyEstimator(model, **kw)
+        return est
+
+
+def report(point, r):
+    lat, lon, pres = point
+    print(f"\n📍 {lat}, {lon} @ {pres} hPa -> {GRADE_NAMES.get(r['grade'], r['grade'])} "
+          f"({r['confidence']:.0%}, {r['agreement']:.0%} of trees agree)")
+    print(f"   {'grade':<12} {'proba':>7} {'MC share':>9} {'MC interval':>17} {'tree votes':>11} {'tree sd':>8}")
+    for g in r['proba']:
+        lo, hi = r['mc_interval'][g]
+        print(f"   {g:<12} {r['proba'][g]:>7.1%} {r['mc_share'][g]:>9.1%} {lo:>8.1%} - {hi:<6.1%} "
+              f"{r['tree_votes'][g]:>11.1%} {r['tree_std'][g]:>8.3f}")
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import sys
+
+    ap = argparse.ArgumentParser(description='Grade probabilities with observation noise and tree dispersion.')
+    ap.add_argument('lat', type=float)
+    ap.add_argument('lon', type=float)
+    ap.add_argument('pres', type=float)
+    ap.add_argument('--model', default='cyclone_model.joblib')
+    ap.add_argument('--samples', type=int, default=N_SAMPLES)
+    ap.add_argument('--pres-sd', type=float, default=PRES_SD)
+    ap.add_argument('--coord-sd', type=float, default=COORD_SD)
+    args = ap.parse_args()
+    if args.samples < 1:
+        ap.error('--samples must be at least 1')
+
+    if not os.path.exists(args.model):
+        print(f"❌ Error: '{args.model}' not found! Run model.py first.")
+        sys.exit(1)
+    from forest_artifact import load_forest
+    est = UncertaintyEstimator(load_forest(args.model), args.samples, args.pres_sd, args.coord_sd)
+
+    point = (args.lat, args.lon, args.pres)
+    t = time.perf_counter()
+    result = est.estimate(*point)
+    cold = time.perf_counter() - t
+    t = time.perf_counter()
+    est.estimate(*point)
+    warm = time.perf_counter() - t
+    report(point, result)
+    print(f"\n⏱️ {args.samples:,} samples x {est.model.n_trees} trees: {cold * 1e3:.1f} ms, "
+          f"cached {warm * 1e6:.0f} µs")
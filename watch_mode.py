@@ -0,0 +1,95 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 🛰️ REGIONAL WATCH MODE
+# ==========================================
+# Scores a whole coastline per cycle instead of one city: observations
+# for every watched district are fetched concurrently (through the shared,
+# cached WeatherProvider), then scored with ONE predict_proba call.
+
+# District HQ / coastal town coordinates
+REGIONS = {
+    "Coastal Andhra": [
+        ("Srikakulam", 18.2949, 83.8938),
+        ("Vizianagaram", 18.1067, 83.3956),
+        ("Visakhapatnam", 17.6868, 83.2185),
+        ("Anakapalli", 17.6913, 83.0039),
+        ("Kakinada", 16.9891, 82.2475),
+        ("Amalapuram", 16.5787, 82.0061),
+        ("Rajahmundry", 17.0005, 81.8040),
+        ("Bhimavaram", 16.5449, 81.5212),
+        ("Machilipatnam", 16.1875, 81.1389),
+        ("Bapatla", 15.9044, 80.4672),
+        ("Ongole", 15.5057, 80.0499),
+        ("Nellore", 14.4426, 79.9865),
+    ],
+    "Coastal Odisha": [
+        ("Berhampur", 19.3150, 84.7941),
+        ("Puri", 19.8135, 85.8312),
+        ("Bhubaneswar", 20.2961, 85.8245),
+        ("Paradip", 20.3166, 86.6114),
+        ("Kendrapara", 20.5000, 86.4200),
+        ("Bhadrak", 21.0574, 86.4963),
+        ("Balasore", 21.4934, 86.9135),
+    ],
+}
+
+GRADE_LABELS = ["🟢 SAFE", "🟡 DEPRESSION", "🟠 STORM", "🔴 CYCLONE"]
+GRADE_COLORS = ["#00FF00", "#FFFF00", "#FFA500", "#FF0000"]
+MAX_WORKERS = 16
+
+
+def districts_for(regions):
+    return [d for r in regions for d in REGIONS[r]]
+
+
+def fetch_all(provider, districts, max_workers=MAX_WORKERS):
+    """Concurrent weather fetch; returns one observation (or None) per district."""
+    with ThreadPoolExecutor(max_workers=min(max_workers, max(1, len(districts)))) as pool:
+        return list(pool.map(lambda d: provider.by_coords(d[1], d[2]), districts))
+
+
+def score_all(model, districts, observations):
+    """One batched predict_proba over every district with a reading."""
+    rows = [(name, lat, lon, obs["pres"]) for (name, lat, lon), obs in zip(districts, observations) if obs]
+    df = pd.DataFrame(rows, columns=["district", "lat", "lon", "pres"])
+    if df.empty:
+        return df.assign(grade=pd.Series(dtype=int), confidence=pd.Series(dtype=float))
+
+    probs = model.predict_proba(df[["lat", "lon", "pres"]].to_numpy(dtype=np.float64))
+    best = np.argmax(probs, axis=1)
+    df["grade"] = np.asarray(model.classes_).take(best)
+    df["confidence"] = probs[np.arange(len(df)), best]
+    return df.sort_values(["grade", "confidence"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def watch_cycle(provider, model, districts):
+    """Fetch + score one cycle. Returns (scored DataFrame, timings dict)."""
+    t0 = time.perf_counter()
+    observations = fetch_all(provider, districts)
+    t1 = time.perf_counter()
+    scored = score_all(model, districts, observations)
+    t2 = time.perf_counter()
+    return scored, {"fetch_s": t1 - t0, "score_s": t2 - t1, "missing": sum(o is None for o in observations)}
+
+
+def watch_layer(scored, name="Regional watch"):
+    """folium FeatureGroup with one colored marker per district."""
+    import folium
+
+    fg = folium.FeatureGroup(name=name)
+    for row in scored.itertuples(index=False):
+        folium.CircleMarker(
+            location=[row.lat, row.lon],
+            radius=6 + 3 * int(row.grade),
+            color=GRADE_COLORS[int(row.grade)],
+            fill=True,
+            fill_opacity=0.7,
+            tooltip=f"{row.district}: {GRADE_LABELS[int(row.grade)]} "
+                    f"({row.confidence * 100:.0f}%, {row.pres} hPa)",
+        ).add_to(fg)
+    return fg
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from instrumentation import count, span
+
+# ==========================================
+# 🌦️ WEATHER PROVIDER (OPENWEATHERMAP)
+# ==========================================
+# One pooled requests.Session with strict timeouts, plus an LRU + TTL cache
+# keyed by city name or by rounded coordinates:
+#
+#   * fresh entry (< ttl)         -> served from memory, no request
+#   * stale entry (< stale_ttl)   -> served immediately, refreshed in a
+#                                    background thread (one per key)
+#   * missing / too old           -> fetched synchronously
+#
+# If a fetch fails we fall back to whatever stale data we still have.
+# base_url can point at local_stubs.FakeOpenWeather for tests/benchmarks.
+
+OWM_URL = "https://api.openweathermap.org"
+TTL = 600            # 10 min: OWM updates current weather about that often
+STALE_TTL = 3600     # serve data up to 1 h old while refreshing
+NEGATIVE_TTL = 60    # remember "city not found" briefly
+TIMEOUT = (3.05, 5)  # connect, read (seconds)
+COORD_DECIMALS = 1   # ~11 km cells share one cache entry
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at")
+
+    def __init__(self, value, fetched_at):
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class WeatherProvider:
+    def __init__(self, api_key, base_url=OWM_URL, ttl=TTL, stale_ttl=STALE_TTL,
+                 timeout=TIMEOUT, maxsize=512, pool_size=16, coord_decimals=COORD_DECIMALS):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self.coord_decimals = coord_decimals
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                              max_retries=Retry(total=1, backoff_factor=0.2,
+                                                status_forcelist=(502, 503, 504)))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "errors": 0, "requests": 0}
+
+    # ---------- public ----------
+    def by_city(self, city):
+        city = city.strip()
+        return self._get(("city", city.lower()), {"q": city})
+
+    def by_coords(self, lat, lon):
+        lat, lon = round(float(lat), self.coord_decimals), round(float(lon), self.coord_decimals)
+        return self._get(("coord", lat, lon), {"lat": lat, "lon": lon})
+
+    # ---------- cache ----------
+    def _get(self, key, params):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                age = now - entry.fetched_at
+                ttl = self.ttl if entry.value is not None else NEGATIVE_TTL
+                if age < ttl:
+                    self.stats["hits"] += 1
+                    return entry.value
+                if age < self.stale_ttl and entry.value is not None:
+                    self.stats["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, params), daemon=True).start()
+                    return entry.value
+            self.stats["misses"] += 1
+
+        try:
+            return self._store(key, self._fetch(params))
+        except requests.RequestException as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            count("weather_api_errors", kind=type(e).__name__)
+            # Better an old reading than none at all
+            return entry.value if entry is not None else None
+
+    def _store(self, key, value):
+        with self._lock:
+            self._cache[key] = _Entry(value, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def _refresh(self, key, params):
+        try:
+            self._store(key, self._fetch(params))
+        except requests.RequestException as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            count("weather_api_errors", kind=type(e).__name__)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    # ---------- HTTP ----------
+    def _fetch(self, params):
+        with self._lock:
+            self.stats["requests"] += 1
+        with span("weather.fetch"):
+            res = self.session.get(f"{self.base_url}/data/2.5/weather",
+                                   params=dict(params, appid=self.api_key), timeout=self.timeout)
+        data = res.json()
+        if str(data.get("cod")) != "200":
+            if res.status_code >= 500 or res.status_code == 429:
+                raise requests.HTTPError(f"{res.status_code}: {data.get('message')}", response=res)
+            return None  # unknown city etc.
+        return {
+            "lat": data["coord"]["lat"],
+            "lon": data["coord"]["lon"],
+            "pres": data["main"]["pressure"],
+            "name": data.get("name") or params.get("q", ""),
+        }
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(api_key, base_url=OWM_URL):
+    """Process-wide provider, so the cache and connection pool survive reruns."""
+    with _providers_lock:
+        key = (api_key, base_url)
+        if key not in _providers:
+            _providers[key] = WeatherProvider(api_key, base_url)
+        return _providers[key]